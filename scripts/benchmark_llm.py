@@ -0,0 +1,126 @@
+# scripts/benchmark_llm.py
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from scripts.mock_llm_server import MockLLMServer
+from src import config as main_config
+from src.logger import logger
+
+def load_prompts(count: int) -> list[str]:
+    """Builds `count` distinct prompts from the test set, as the heuristic reasoner would."""
+    from src.reasoners.llm.llm_router import LLMRouter
+
+    router = LLMRouter()
+    rows = pd.read_csv(main_config.TEST_CSV_PATH)
+    prompts = []
+    for i in range(count):
+        row = rows.iloc[i % len(rows)]
+        # The suffix keeps prompts distinct, so the canned answers vary across repetitions
+        prompts.append(router.get_prompt(row['topic'], row) + f"\n<!-- request {i} -->")
+    return prompts
+
+def run_level(prompts: list[str], concurrency: int, stream: bool) -> dict:
+    """Sends every prompt through a fresh LLMFactory with `concurrency` worker threads."""
+    from src.reasoners.llm.llm_factory import LLMFactory
+    from src.reasoners.llm.response_parser import parse_llm_response
+    from src.reasoners.llm.stream_parser import IncrementalAnswerParser
+
+    factory = LLMFactory()
+
+    def one_request(prompt: str) -> tuple[float, bool]:
+        started = time.perf_counter()
+        if stream:
+            parser = IncrementalAnswerParser()
+            response_stream = factory.generate_response_stream(
+                prompt, stop=main_config.LLM_STOP_SEQUENCES, max_tokens=main_config.LLM_MAX_TOKENS
+            )
+            try:
+                for chunk in response_stream:
+                    if parser.feed(chunk):
+                        break
+            finally:
+                response_stream.close()
+            text = parser.text
+        else:
+            text = factory.generate_response(prompt, stop=main_config.LLM_STOP_SEQUENCES, max_tokens=main_config.LLM_MAX_TOKENS)
+        return time.perf_counter() - started, parse_llm_response(text) is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(one_request, prompts))
+    elapsed = time.perf_counter() - started
+
+    if factory.health_prober is not None:
+        factory.health_prober.stop()
+    latencies = np.array([latency for latency, _ in outcomes])
+    return {
+        'concurrency': concurrency,
+        'requests': len(prompts),
+        'failed': sum(1 for _, ok in outcomes if not ok),
+        'throughput_rps': len(prompts) / elapsed,
+        'p50_s': np.percentile(latencies, 50),
+        'p95_s': np.percentile(latencies, 95),
+        'p99_s': np.percentile(latencies, 99),
+        'mean_s': latencies.mean()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLMFactory throughput and latency against a mock LLM server.")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument('--concurrency', default='1,8,32', help="Comma-separated worker counts.")
+    parser.add_argument('--backend', choices=['openrouter', 'ollama'], default='openrouter', help="Primary backend to exercise.")
+    parser.add_argument('--stream', action='store_true', help="Use streaming with early stop, as the heuristic reasoner does.")
+    parser.add_argument('--url', default=None, help="Use an already running server instead of starting one in-process.")
+    parser.add_argument('--ttft', default='lognormal:-1.6,0.5', help="Mock time to first token distribution.")
+    parser.add_argument('--token-delay', type=float, default=0.005)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of mock requests answered with HTTP 429.")
+    parser.add_argument('--requests-per-second', type=float, default=None, help="Override OPENROUTER_REQUESTS_PER_SECOND.")
+    parser.add_argument('--output', default=None, help="Optional CSV file for the results table.")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server = MockLLMServer(port=0, ttft=args.ttft, token_delay=args.token_delay, error_rate=args.error_rate).start()
+        url = server.url
+
+    # Both clients read their endpoint from the environment
+    os.environ['OPENROUTER_BASE_URL'] = f"{url}/api/v1"
+    os.environ['OLLAMA_HOST'] = url
+    # The placeholder key makes LLMFactory fall back to Ollama as its primary client
+    os.environ['OPENROUTER_API_KEY'] = 'mock-key' if args.backend == 'openrouter' else 'your_api_key_here'
+
+    # Cached responses would measure the cache rather than the client
+    main_config.LLM_CACHE_ENABLED = False
+    if args.requests_per_second is not None:
+        main_config.OPENROUTER_REQUESTS_PER_SECOND = args.requests_per_second
+        main_config.OPENROUTER_BURST = max(1, int(args.requests_per_second))
+    logger.setLevel(logging.WARNING)
+
+    prompts = load_prompts(args.requests)
+    results = []
+    for concurrency in [int(level) for level in args.concurrency.split(',')]:
+        print(f"Running {args.requests} {'streamed ' if args.stream else ''}requests against '{args.backend}' with concurrency {concurrency}...")
+        results.append(run_level(prompts, concurrency, args.stream))
+
+    report = pd.DataFrame(results).set_index('concurrency')
+    print("\n" + report.round(3).to_string())
+    if args.output:
+        report.to_csv(args.output)
+    if server is not None:
+        print(f"\nMock server: {server.counters['requests']} requests, {server.counters['rate_limited']} rate limited, "
+              f"{server.counters['tokens_sent']} streamed tokens.")
+        server.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# scripts/calibrate_model_router.py
+
+import argparse
+import os
+import sys
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src import config as main_config
+from src.logger import logger
+
+def calibrate(backend: str, samples_per_topic: int, models: list[str], seed: int) -> pd.DataFrame:
+    """
+    Sends a sample of labelled training problems of every topic to each model and
+    records whether the answer was correct, how long the call took and what it
+    cost. The measurements are added to the model router's persisted statistics.
+    """
+    from src.reasoners.llm.llm_factory import LLMFactory
+    from src.reasoners.llm.llm_router import LLMRouter
+    from src.reasoners.llm.model_router import ModelRouter
+    from src.reasoners.llm.response_parser import parse_llm_response
+    from src.reasoners.llm.telemetry import LLMTelemetry, LLMCallRecord
+
+    factory = LLMFactory()
+    client = factory.openrouter_client if backend == 'openrouter' else factory.ollama_client
+    if client is None:
+        raise ValueError(f"The '{backend}' client is not available.")
+    router = LLMRouter()
+    model_router = ModelRouter(
+        catalogue=main_config.LLM_MODEL_CATALOGUE,
+        stats_path=main_config.MODEL_ROUTING_STATS_PATH,
+        min_samples=main_config.MODEL_ROUTING_MIN_SAMPLES,
+        accuracy_tolerance=main_config.MODEL_ROUTING_ACCURACY_TOLERANCE
+    )
+    # Only used to measure latency and cost the same way as the pipeline does
+    telemetry = LLMTelemetry(
+        cost_per_million_tokens=main_config.LLM_COST_PER_MILLION_TOKENS,
+        latency_buckets=main_config.LLM_LATENCY_HISTOGRAM_BUCKETS,
+        token_buckets=main_config.LLM_TOKEN_HISTOGRAM_BUCKETS
+    )
+
+    train = pd.read_csv(main_config.TRAIN_CSV_PATH)
+    for topic, rows in train.groupby('topic'):
+        sample = rows.sample(n=min(samples_per_topic, len(rows)), random_state=seed)
+        for model in models:
+            logger.info(f"Calibrating '{model}' on {len(sample)} '{topic}' problems.")
+            for _, row in sample.iterrows():
+                prompt = router.get_prompt(topic=topic, row=row)
+                record = LLMCallRecord(topic=topic, streamed=False)
+                record.backend, record.model = backend, model
+                try:
+                    response = client.generate_response(
+                        prompt, stop=main_config.LLM_STOP_SEQUENCES, max_tokens=main_config.LLM_MAX_TOKENS, model=model
+                    )
+                except Exception as e:
+                    logger.warning(f"Calibration call to '{model}' failed: {e}")
+                    continue
+                telemetry.finish(record, prompt, response)
+                if not record.success:
+                    continue
+                parsed = parse_llm_response(response)
+                correct = parsed is not None and parsed['answer'] == int(row['correct_option_number'])
+                model_router.record(backend, topic, model, record.latency, record.cost_usd, correct=correct)
+
+    model_router.save()
+    if factory.health_prober is not None:
+        factory.health_prober.stop()
+    summary = model_router.summary()
+    return summary[summary['backend'] == backend] if not summary.empty else summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure accuracy, latency and cost of each catalogued model per topic.")
+    parser.add_argument('--backend', choices=['openrouter', 'ollama'], default='openrouter')
+    parser.add_argument('--samples', type=int, default=main_config.MODEL_ROUTING_MIN_SAMPLES, help="Training problems per topic and model.")
+    parser.add_argument('--models', default=None, help="Comma-separated models; defaults to the backend's catalogue.")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    models = args.models.split(',') if args.models else main_config.LLM_MODEL_CATALOGUE[args.backend]
+    # Cached responses would hide the latency of the model
+    main_config.LLM_CACHE_ENABLED = False
+    summary = calibrate(args.backend, args.samples, models, args.seed)
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(summary.round({'accuracy': 3, 'mean_latency_s': 3, 'mean_cost_usd': 6}).to_string(index=False))
+
+if __name__ == '__main__':
+    main()
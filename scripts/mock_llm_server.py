@@ -0,0 +1,257 @@
+# scripts/mock_llm_server.py
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REPLY_TEMPLATE = """<scratchpad>
+{reasoning}
+</scratchpad>
+<answer>
+{answer}
+</answer>"""
+
+class LatencyDistribution:
+    """
+    A seeded latency distribution parsed from a spec string:
+    'fixed:S', 'uniform:LOW,HIGH', 'exponential:MEAN' or 'lognormal:MU,SIGMA'.
+    """
+    def __init__(self, spec: str, seed: int = 0):
+        self.spec = spec
+        kind, _, args = spec.partition(':')
+        self.kind = kind
+        self.args = [float(value) for value in args.split(',')] if args else []
+        if kind not in ('fixed', 'uniform', 'exponential', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution '{spec}'.")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == 'fixed':
+                return self.args[0]
+            if self.kind == 'uniform':
+                return self._rng.uniform(self.args[0], self.args[1])
+            if self.kind == 'exponential':
+                return self._rng.expovariate(1 / self.args[0])
+            return self._rng.lognormvariate(self.args[0], self.args[1])
+
+class MockLLMServer:
+    """
+    A local stand-in for the LLM backends, speaking the OpenRouter
+    `/chat/completions` and Ollama `/api/chat` wire formats (plus the endpoints
+    used by the health checks).
+
+    Every reply is a canned <scratchpad>/<answer> response (or a JSON object when a
+    response schema is requested) whose option number is derived from a hash of
+    the prompt, so runs are reproducible. Latency is the
+    time to first token plus a delay per generated token, and a fraction of the
+    requests can be rejected with HTTP 429 and a Retry-After header.
+    """
+    def __init__(self, host: str = '127.0.0.1', port: int = 8800, ttft: str = 'fixed:0.2',
+                 token_delay: float = 0.005, reply_tokens: int = 60, error_rate: float = 0.0,
+                 retry_after: float = 1.0, seed: int = 0):
+        self.ttft = LatencyDistribution(ttft, seed)
+        self.token_delay = token_delay
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed + 1)
+        self._lock = threading.Lock()
+        self.counters = {'requests': 0, 'rate_limited': 0, 'tokens_sent': 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves requests on a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-llm-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reply_for(self, prompt: str, structured: bool = False) -> str:
+        """Returns the canned reply for a prompt."""
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        words = ' '.join(f"step{i}" for i in range(max(self.reply_tokens - 8, 1)))
+        if structured:
+            return json.dumps({'reasoning': words, 'answer': digest[0] % 5 + 1})
+        return REPLY_TEMPLATE.format(reasoning=words, answer=digest[0] % 5 + 1)
+
+    def plan_reply(self, prompt: str, stop: list[str] | None, max_tokens: int | None,
+                   structured: bool = False) -> list[str]:
+        """Splits the reply into tokens, applying stop sequences and max_tokens like the real APIs."""
+        text = self.reply_for(prompt, structured)
+        for sequence in stop or []:
+            position = text.find(sequence)
+            if position != -1:
+                text = text[:position]
+        tokens = [token + ' ' for token in text.split(' ')]
+        return tokens[:max_tokens] if max_tokens else tokens
+
+    def should_rate_limit(self) -> bool:
+        with self._lock:
+            self.counters['requests'] += 1
+            limited = self._rng.random() < self.error_rate
+            if limited:
+                self.counters['rate_limited'] += 1
+            return limited
+
+    def count_token(self):
+        with self._lock:
+            self.counters['tokens_sent'] += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/models'):
+                    self._send_json({'data': [{'id': 'mock'}]})
+                elif self.path == '/api/tags':
+                    self._send_json({'models': [{'name': 'llama3', 'model': 'llama3'}]})
+                else:
+                    self._send_json({'error': 'not found'}, status=404)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path == '/api/show':
+                    self._send_json({'modelfile': '', 'parameters': '', 'template': '', 'details': {}, 'model_info': {}})
+                elif self.path.endswith('/chat/completions'):
+                    self._openrouter_chat(body)
+                elif self.path == '/api/chat':
+                    self._ollama_chat(body)
+                else:
+                    self._send_json({'error': 'not found'}, status=404)
+
+            def log_message(self, format, *args):
+                pass
+
+            def _openrouter_chat(self, body: dict):
+                if server.should_rate_limit():
+                    self._send_json({'error': {'message': 'Rate limit exceeded'}}, status=429,
+                                    headers={'Retry-After': str(server.retry_after)})
+                    return
+                prompt = body['messages'][-1]['content']
+                tokens = server.plan_reply(prompt, body.get('stop'), body.get('max_tokens'), bool(body.get('response_format')))
+                time.sleep(server.ttft.sample())
+
+                if not body.get('stream'):
+                    time.sleep(server.token_delay * len(tokens))
+                    self._send_json({
+                        'id': 'mock', 'model': body.get('model'),
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(tokens)}, 'finish_reason': 'stop'}],
+                        'usage': {'prompt_tokens': len(prompt.split()), 'completion_tokens': len(tokens)}
+                    })
+                    return
+
+                self._start_stream('text/event-stream')
+                self._write(b": OPENROUTER PROCESSING\n\n")
+                for token in tokens:
+                    event = {'choices': [{'index': 0, 'delta': {'content': token}}]}
+                    if not self._write(f"data: {json.dumps(event)}\n\n".encode()):
+                        return
+                    server.count_token()
+                    time.sleep(server.token_delay)
+                self._write(b"data: [DONE]\n\n")
+
+            def _ollama_chat(self, body: dict):
+                if server.should_rate_limit():
+                    self._send_json({'error': 'server busy'}, status=429, headers={'Retry-After': str(server.retry_after)})
+                    return
+                prompt = body['messages'][-1]['content']
+                options = body.get('options') or {}
+                tokens = server.plan_reply(prompt, options.get('stop'), options.get('num_predict'), bool(body.get('format')))
+                time.sleep(server.ttft.sample())
+                model = body.get('model')
+                final = {
+                    'model': model, 'created_at': '', 'done': True, 'done_reason': 'stop',
+                    'prompt_eval_count': len(prompt.split()), 'eval_count': len(tokens)
+                }
+
+                if not body.get('stream', True):
+                    time.sleep(server.token_delay * len(tokens))
+                    self._send_json({**final, 'message': {'role': 'assistant', 'content': ''.join(tokens)}})
+                    return
+
+                self._start_stream('application/x-ndjson')
+                for token in tokens:
+                    chunk = {'model': model, 'created_at': '', 'message': {'role': 'assistant', 'content': token}, 'done': False}
+                    if not self._write((json.dumps(chunk) + "\n").encode()):
+                        return
+                    server.count_token()
+                    time.sleep(server.token_delay)
+                self._write((json.dumps({**final, 'message': {'role': 'assistant', 'content': ''}}) + "\n").encode())
+
+            def _send_json(self, payload: dict, status: int = 200, headers: dict | None = None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _start_stream(self, content_type: str):
+                # Streams end when the connection closes, like a chunked response without the framing
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Connection', 'close')
+                self.end_headers()
+                self.close_connection = True
+
+            def _write(self, data: bytes) -> bool:
+                """Writes to a stream; returns False once the client has hung up."""
+                try:
+                    self.wfile.write(data)
+                    self.wfile.flush()
+                    return True
+                except (BrokenPipeError, ConnectionResetError):
+                    return False
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a deterministic mock of the OpenRouter and Ollama chat APIs.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--ttft', default='fixed:0.2', help="Time to first token: fixed:S, uniform:LOW,HIGH, exponential:MEAN or lognormal:MU,SIGMA.")
+    parser.add_argument('--token-delay', type=float, default=0.005, help="Seconds between generated tokens.")
+    parser.add_argument('--reply-tokens', type=int, default=60, help="Approximate length of each canned reply.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests rejected with HTTP 429.")
+    parser.add_argument('--retry-after', type=float, default=1.0, help="Retry-After seconds sent with injected 429s.")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        host=args.host, port=args.port, ttft=args.ttft, token_delay=args.token_delay,
+        reply_tokens=args.reply_tokens, error_rate=args.error_rate, retry_after=args.retry_after, seed=args.seed
+    )
+    print(f"Mock LLM server listening on {server.url}")
+    print(f"  OpenRouter: OPENROUTER_BASE_URL={server.url}/api/v1")
+    print(f"  Ollama:     OLLAMA_HOST={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Served {server.counters['requests']} requests ({server.counters['rate_limited']} rate limited).")
+
+if __name__ == '__main__':
+    main()
@@ -1,46 +1,104 @@
+import json
 import os
 import sys
+import pandas as pd
 
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from src.data_pipeline import load_data, process_data, create_embeddings
+from src.data_pipeline import stream_processed_rows, write_embeddings, store_embeddings
+from src.data_pipeline.schemas import TrainDataRow, TestDataRow
+from src.core.checkpoint import file_fingerprint
 from src import config
 from src.logger import logger
 
+def build_fingerprint() -> dict:
+    """Identifies the inputs of the build: the raw CSV contents, the embedding model and its storage dtype."""
+    return {
+        'train_csv': file_fingerprint(config.TRAIN_CSV_PATH),
+        'test_csv': file_fingerprint(config.TEST_CSV_PATH),
+        'embedding_model': config.EMBEDDING_MODEL_NAME,
+        'embedding_dtype': config.EMBEDDING_FILE_DTYPE
+    }
+
+def build_is_current(fingerprint: dict) -> bool:
+    """True if the manifest of the existing build matches the current inputs."""
+    if not os.path.exists(config.BUILD_MANIFEST_PATH):
+        return False
+    try:
+        with open(config.BUILD_MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f) == fingerprint
+    except (OSError, json.JSONDecodeError):
+        return False
+
 def run_pipeline():
     
     logger.info("Starting the data processing pipeline script...")
     
     train_json_path = os.path.join(config.PROCESSED_DATA_DIR, 'train_processed.json')
     test_json_path = os.path.join(config.PROCESSED_DATA_DIR, 'test_processed.json')
-    embeddings_path = os.path.join(config.PROCESSED_DATA_DIR, 'problem_embeddings.pkl')
+    embeddings_path = config.EMBEDDINGS_PATH
+
+    try:
+        fingerprint = build_fingerprint()
+    except FileNotFoundError as e:
+        logger.error(f"Raw data file not found: {e}. Cannot proceed.")
+        return
 
-    if all(os.path.exists(p) for p in [train_json_path, test_json_path, embeddings_path]):
-        logger.info("Processed data and embeddings already exist. Skipping pipeline run.")
+    if all(os.path.exists(p) for p in [train_json_path, test_json_path, embeddings_path]) and build_is_current(fingerprint):
+        logger.info("Processed data and embeddings are up to date with the raw data. Skipping pipeline run.")
         logger.info("Pipeline script finished successfully!")
         return
     
-    logger.info("Processed data not found. Running the full data pipeline...")
+    logger.info("Processed data is missing or out of date. Running the data pipeline...")
     
     os.makedirs(config.PROCESSED_DATA_DIR, exist_ok=True)
     
-    train_df, test_df = load_data(
-        train_path=config.TRAIN_CSV_PATH, 
-        test_path=config.TEST_CSV_PATH
-    )
-    
-    if train_df.empty or test_df.empty:
-        logger.error("Pipeline stopped due to data loading errors.")
+    # The raw CSVs are read, validated, written and embedded one chunk at a time,
+    # so peak memory does not depend on the size of the dataset. With the
+    # embedding store, only new or edited statements are encoded.
+    store_path = config.EMBEDDING_STORE_PATH if config.EMBEDDING_STORE_ENABLED else None
+    train_rows = stream_processed_rows(config.TRAIN_CSV_PATH, TrainDataRow, train_json_path, config.BUILD_CHUNK_ROWS)
+    test_rows = stream_processed_rows(config.TEST_CSV_PATH, TestDataRow, test_json_path, config.BUILD_CHUNK_ROWS)
+    try:
+        saved_path = write_embeddings(
+            train_rows,
+            output_path=embeddings_path,
+            model_name=config.EMBEDDING_MODEL_NAME,
+            store_path=store_path,
+            dtype=config.EMBEDDING_FILE_DTYPE,
+            recall_k=config.EMBEDDING_RECALL_K,
+            workers=config.EMBEDDING_BUILD_WORKERS,
+            threads_per_worker=config.EMBEDDING_BUILD_THREADS_PER_WORKER
+        )
+        if saved_path is None:
+            logger.error("Pipeline stopped due to data loading or embedding errors.")
+            return
+        if store_path is not None:
+            stored = store_embeddings(
+                test_rows,
+                model_name=config.EMBEDDING_MODEL_NAME,
+                store_path=store_path,
+                workers=config.EMBEDDING_BUILD_WORKERS,
+                threads_per_worker=config.EMBEDDING_BUILD_THREADS_PER_WORKER
+            )
+            if stored is None:
+                logger.error("Pipeline stopped due to data loading or embedding errors.")
+                return
+        else:
+            for _ in test_rows:
+                pass
+    except pd.errors.ParserError as e:
+        logger.error(f"Error parsing CSV file: {e}. Check file for corruption.")
         return
-        
-    process_data(train_df, test_df, output_dir=config.PROCESSED_DATA_DIR)
-    
-    create_embeddings(
-        train_df, 
-        output_dir=config.PROCESSED_DATA_DIR,
-        model_name=config.EMBEDDING_MODEL_NAME
-    )
+    finally:
+        # Discards a processed file that was not read to the end
+        train_rows.close()
+        test_rows.close()
+
+    if saved_path is not None:
+        with open(config.BUILD_MANIFEST_PATH, 'w', encoding='utf-8') as f:
+            json.dump(fingerprint, f, indent=4)
     
     logger.info("🎉 Pipeline script finished successfully!")
 
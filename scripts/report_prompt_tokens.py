@@ -0,0 +1,29 @@
+# scripts/report_prompt_tokens.py
+
+import os
+import sys
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from src.reasoners.llm.token_counter import prompt_token_report
+from src import config as main_config
+from src.logger import logger
+
+def report_prompt_tokens():
+    """
+    Prints, per topic, the approximate number of static prefix tokens that a
+    backend can serve from its prompt cache versus the per-problem suffix tokens,
+    measured on the test set.
+    """
+    rows = pd.read_csv(main_config.TEST_CSV_PATH) if os.path.exists(main_config.TEST_CSV_PATH) else None
+    if rows is None:
+        logger.warning(f"{main_config.TEST_CSV_PATH} not found. Measuring suffixes without problem data.")
+
+    report = prompt_token_report(rows)
+    with pd.option_context('display.width', 120, 'display.max_columns', None):
+        print(report.round({'suffix_tokens': 1, 'cacheable_share': 3}))
+
+if __name__ == '__main__':
+    report_prompt_tokens()
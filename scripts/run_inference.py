@@ -9,13 +9,23 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
 from src.core_pipeline import CorePipeline
+from src.core.checkpoint import InferenceCheckpoint
+from src.core.output_writers import OUTPUT_COLUMNS, to_output_record, JsonlResultWriter, CsvResultWriter, jsonl_to_json_array
 from src.logger import logger
 from src import config as main_config
 
-def run_inference():
+def run_inference(streaming: bool | None = None, resume: bool | None = None):
     """
     Initializes and runs the main inference pipeline, then saves the results.
     Skips the run if output files already exist.
+
+    Args:
+        streaming (bool | None): Append each finished row to output.jsonl and output.csv
+            as it completes instead of writing everything at the end. Defaults to
+            `STREAMING_OUTPUT_ENABLED` in the config.
+        resume (bool | None): Record every finished row in a durable checkpoint and, on
+            restart, process only the rows that are not in it yet. Defaults to
+            `CHECKPOINT_ENABLED` in the config.
     """
     logger.info("--- Starting Inference Run Script ---")
     
@@ -25,8 +35,24 @@ def run_inference():
         logger.info("--- Inference Run Finished ---")
         return
 
+    if streaming is None:
+        streaming = main_config.STREAMING_OUTPUT_ENABLED
+    if resume is None:
+        resume = main_config.CHECKPOINT_ENABLED
+
     try:
         pipeline = CorePipeline()
+        
+        if resume:
+            _run_checkpointed(pipeline)
+            logger.info("--- Inference Run Finished Successfully ---")
+            return
+
+        if streaming:
+            _run_streaming(pipeline)
+            logger.info("--- Inference Run Finished Successfully ---")
+            return
+
         # The run method now returns the results DataFrame
         results_df = pipeline.run()
 
@@ -35,16 +61,7 @@ def run_inference():
             logger.info("Preparing final output files...")
             
             # Select and rename columns as per requirements
-            output_df = results_df[[
-                'predicted_topic', 
-                'problem_statement', 
-                'heuristic_solution', 
-                'heuristic_answer'
-            ]].rename(columns={
-                'predicted_topic': 'topic',
-                'heuristic_solution': 'solution',
-                'heuristic_answer': 'correct_option'
-            })
+            output_df = results_df[list(OUTPUT_COLUMNS)].rename(columns=OUTPUT_COLUMNS)
 
             # Save to CSV
             output_df.to_csv(main_config.OUTPUT_CSV_PATH, index=False)
@@ -61,5 +78,63 @@ def run_inference():
     except Exception as e:
         logger.error(f"A critical error occurred during the inference run: {e}", exc_info=True)
 
+def _run_streaming(pipeline: CorePipeline):
+    """
+    Writes every finished row to output.jsonl and output.csv as soon as it is ready,
+    then converts the JSONL file into the final output.json array.
+    """
+    row_count = 0
+    with JsonlResultWriter(main_config.OUTPUT_JSONL_PATH) as jsonl_writer, \
+         CsvResultWriter(main_config.OUTPUT_CSV_PATH, fieldnames=list(OUTPUT_COLUMNS.values())) as csv_writer:
+        for _, result in pipeline.iter_results():
+            record = to_output_record(result)
+            jsonl_writer.write(record)
+            csv_writer.write(record)
+            row_count += 1
+
+    if row_count == 0:
+        logger.error("Pipeline run did not produce any results to save.")
+        return
+
+    logger.info(f"Streamed {row_count} rows to {main_config.OUTPUT_JSONL_PATH} and {main_config.OUTPUT_CSV_PATH}")
+    jsonl_to_json_array(main_config.OUTPUT_JSONL_PATH, main_config.OUTPUT_JSON_PATH)
+
+def _run_checkpointed(pipeline: CorePipeline):
+    """
+    Runs only the rows missing from the checkpoint, recording each one as it finishes,
+    then exports the complete result set in input order.
+    """
+    if pipeline.test_data is None or pipeline.test_data.empty:
+        logger.error("Pipeline run did not produce any results to save.")
+        return
+
+    checkpoint = InferenceCheckpoint(
+        checkpoint_dir=main_config.CHECKPOINT_DIR,
+        input_path=main_config.TEST_PROCESSED_PATH,
+        fsync_interval=main_config.CHECKPOINT_FSYNC_INTERVAL
+    )
+    completed = checkpoint.open()
+    try:
+        for index, result in pipeline.iter_results(skip_rows=set(completed)):
+            checkpoint.record(int(index), to_output_record(result))
+    finally:
+        checkpoint.close()
+
+    missing = [index for index in pipeline.test_data.index if int(index) not in completed]
+    if missing:
+        logger.error(f"{len(missing)} rows are still missing from the checkpoint. Rerun to resume.")
+        return
+
+    with JsonlResultWriter(main_config.OUTPUT_JSONL_PATH) as jsonl_writer, \
+         CsvResultWriter(main_config.OUTPUT_CSV_PATH, fieldnames=list(OUTPUT_COLUMNS.values())) as csv_writer:
+        for index in pipeline.test_data.index:
+            record = completed[int(index)]
+            jsonl_writer.write(record)
+            csv_writer.write(record)
+    jsonl_to_json_array(main_config.OUTPUT_JSONL_PATH, main_config.OUTPUT_JSON_PATH)
+    logger.info(f"Exported {len(completed)} checkpointed rows to {main_config.OUTPUT_CSV_PATH} and {main_config.OUTPUT_JSON_PATH}")
+    
+    checkpoint.clear()
+
 if __name__ == '__main__':
     run_inference()
\ No newline at end of file
@@ -11,18 +11,191 @@ MODELS_DIR = os.path.join(ROOT_DIR, 'models')
 OUTPUT_DIR = os.path.join(ROOT_DIR, 'outputs')
 OUTPUT_JSON_DIR = os.path.join(OUTPUT_DIR, 'json')
 OUTPUT_CSV_DIR = os.path.join(OUTPUT_DIR, 'csv')
+CACHE_DIR = os.path.join(ROOT_DIR, 'cache')
 
 # --- Input Data Paths ---
 RAW_DATA_DIR = os.path.join(DATA_DIR, 'raw')
 PROCESSED_DATA_DIR = os.path.join(DATA_DIR, 'processed')
 TRAIN_CSV_PATH = os.path.join(RAW_DATA_DIR, 'train.csv')
 TEST_CSV_PATH = os.path.join(RAW_DATA_DIR, 'test.csv')
+TEST_PROCESSED_PATH = os.path.join(PROCESSED_DATA_DIR, 'test_processed.json')
+EMBEDDINGS_PATH = os.path.join(PROCESSED_DATA_DIR, 'problem_embeddings.emb')
+# Fingerprints of the raw inputs the processed files were built from.
+BUILD_MANIFEST_PATH = os.path.join(PROCESSED_DATA_DIR, 'build_manifest.json')
 
 # --- Output File Paths ---
 OUTPUT_JSON_PATH = os.path.join(OUTPUT_JSON_DIR, 'output.json')
+OUTPUT_JSONL_PATH = os.path.join(OUTPUT_JSON_DIR, 'output.jsonl')
 OUTPUT_JSON_CONFIDENCE_PATH = os.path.join(OUTPUT_JSON_DIR, 'output_with_confidence.json')
 OUTPUT_CSV_PATH = os.path.join(OUTPUT_CSV_DIR, 'output.csv')
 OUTPUT_CSV_CONFIDENCE_PATH = os.path.join(OUTPUT_CSV_DIR, 'output_with_confidence.csv')
+CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, 'checkpoint')
+TELEMETRY_DIR = os.path.join(OUTPUT_DIR, 'telemetry')
 
 # --- Model Configuration ---
-EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
\ No newline at end of file
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# --- Embedding Store ---
+# Content-addressed store of embeddings keyed by hash(model name + normalized text),
+# shared by the build stage and inference so each statement is encoded only once.
+EMBEDDING_STORE_ENABLED = True
+EMBEDDING_STORE_PATH = os.path.join(CACHE_DIR, 'embeddings.sqlite3')
+
+# --- Embedding File ---
+# Storage dtype of EMBEDDINGS_PATH: 'float32', 'float16' or 'int8' (per-row scalar
+# quantization). The neighbour recall of a quantized file is measured at build time.
+EMBEDDING_FILE_DTYPE = 'float32'
+EMBEDDING_RECALL_K = 10
+
+# --- Embedding Build ---
+# Encoding processes used by scripts/process_data.py; 1 encodes in the main process.
+EMBEDDING_BUILD_WORKERS = 1
+# Intra-op threads of each encoding process (workers x threads should not exceed the cores).
+EMBEDDING_BUILD_THREADS_PER_WORKER = 1
+# Raw CSV rows read, validated, written to the processed JSON and embedded at a time.
+BUILD_CHUNK_ROWS = 10_000
+
+# --- Inference Configuration ---
+# Number of problem statements encoded per forward pass of the embedding model.
+EMBEDDING_BATCH_SIZE = 64
+# Number of test rows embedded together before handing vectors to the classifier.
+EMBEDDING_CHUNK_SIZE = 4096
+# Run the symbolic solver on a background thread while the LLM request is in flight.
+CONCURRENT_REASONING_ENABLED = False
+# Append each finished row to output.jsonl/output.csv as it completes.
+STREAMING_OUTPUT_ENABLED = False
+# Record finished rows in CHECKPOINT_DIR and resume only unfinished rows on restart.
+CHECKPOINT_ENABLED = False
+# Rows appended to the checkpoint between fsync calls.
+CHECKPOINT_FSYNC_INTERVAL = 1
+
+# --- Cascade Configuration ---
+# Skip the LLM for rows whose symbolic answer is trusted, using the trained
+# confidence calibrator and meta-reasoner weights.
+CASCADE_ENABLED = False
+CASCADE_CONFIDENCE_THRESHOLD = 0.9
+
+# --- LLM Generation ---
+# Stream LLM responses and stop as soon as the <answer> option number is complete.
+LLM_STREAMING_ENABLED = False
+# Passed to both backends so generation ends at the answer even without streaming.
+LLM_STOP_SEQUENCES = ["</answer>"]
+# Optional cap on generated tokens. Unset by default, since a cap that is too
+# low cuts long reasoning off before its <answer> tag.
+LLM_MAX_TOKENS = None
+# How long Ollama keeps the model (and the cached prompt prefix) loaded between requests.
+OLLAMA_KEEP_ALIVE = "30m"
+
+# --- Structured Output ---
+# Ask for a {"reasoning": ..., "answer": 1-5} JSON object using the backends' JSON
+# schema support instead of parsing tags. Takes precedence over LLM_STREAMING_ENABLED.
+STRUCTURED_OUTPUT_ENABLED = False
+# When a reply still has no parsable answer, ask only for the option number
+# instead of discarding the whole generation.
+ANSWER_FOLLOW_UP_ENABLED = True
+ANSWER_FOLLOW_UP_MAX_TOKENS = 4
+# Only the tail of the failed reply is sent back, which holds its conclusion.
+ANSWER_FOLLOW_UP_MAX_REASONING_CHARS = 2000
+
+# --- OpenRouter Rate Limiting ---
+# Client-side token bucket shared by every worker.
+OPENROUTER_REQUESTS_PER_SECOND = 5.0
+OPENROUTER_BURST = 10
+OPENROUTER_MAX_RETRIES = 3
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 30.0
+# A longer Retry-After is not waited out; the call goes to Ollama instead.
+OPENROUTER_MAX_RETRY_WAIT_SECONDS = 10.0
+# AIMD concurrency limit for OpenRouter requests in flight.
+AIMD_INITIAL_CONCURRENCY = 8
+AIMD_MIN_CONCURRENCY = 1
+AIMD_MAX_CONCURRENCY = 64
+AIMD_LATENCY_TARGET_SECONDS = 30.0
+
+# --- LLM Circuit Breakers ---
+# Consecutive failures after which a backend is skipped until it recovers.
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3
+CIRCUIT_BREAKER_RECOVERY_SECONDS = 60.0
+CIRCUIT_BREAKER_HALF_OPEN_CALLS = 1
+LLM_HEALTH_PROBES_ENABLED = True
+LLM_HEALTH_PROBE_INTERVAL_SECONDS = 30.0
+
+# --- LLM Load Balancing ---
+# Spreads requests across OpenRouter and Ollama by expected completion time
+# instead of using Ollama only as a failover target.
+LLM_LOAD_BALANCING_ENABLED = False
+LLM_LATENCY_EWMA_ALPHA = 0.2
+
+# --- LLM Request Hedging ---
+# A request still running after the given percentile of recent latencies is
+# duplicated to the other backend; the first answer wins and the other is cancelled.
+LLM_HEDGING_ENABLED = False
+LLM_HEDGE_PERCENTILE = 95
+LLM_HEDGE_WINDOW = 200
+LLM_HEDGE_MIN_SAMPLES = 20
+# At most this fraction of requests may be hedged.
+LLM_HEDGE_BUDGET_RATIO = 0.05
+LLM_HEDGE_MAX_WORKERS = 64
+
+# --- Packed Prompts ---
+# Rows of these short topics are answered several at a time, with one
+# <answer id=N> block per problem. Used by the sequential pipeline.
+PACKED_PROMPTS_ENABLED = False
+PACKED_PROMPT_SIZE = 4
+PACKED_PROMPT_TOPICS = ["classic riddles", "lateral thinking"]
+# Token cap of a whole packed reply. Problems whose <answer id=N> block is cut
+# off or missing are re-asked on their own.
+PACKED_PROMPT_MAX_TOKENS = 1024
+
+# --- LLM Telemetry ---
+# Per-call records and per-topic summaries are written to TELEMETRY_DIR after each run.
+LLM_TELEMETRY_ENABLED = True
+# (prompt, completion) USD per million tokens, used when the backend reports no cost.
+# Check these against the provider's current price list.
+LLM_COST_PER_MILLION_TOKENS = {
+    "meta-llama/llama-3.2-3b-instruct": (0.015, 0.025),
+    "meta-llama/llama-3-8b-instruct": (0.03, 0.06),
+    "meta-llama/llama-3-70b-instruct": (0.3, 0.4),
+    "llama3.2:3b": (0.0, 0.0),
+    "llama3": (0.0, 0.0)
+}
+LLM_LATENCY_HISTOGRAM_BUCKETS = [0.5, 1, 2, 5, 10, 20, 30, 60]
+LLM_TOKEN_HISTOGRAM_BUCKETS = [64, 128, 256, 512, 768, 1024, 2048]
+
+# --- LLM Model Routing ---
+# Pick the model per topic from the catalogue, using the accuracy and latency measured
+# by scripts/calibrate_model_router.py. Topics without calibration data keep the
+# client's default model.
+MODEL_ROUTING_ENABLED = False
+# Candidate models per backend, from smallest to largest.
+LLM_MODEL_CATALOGUE = {
+    "openrouter": [
+        "meta-llama/llama-3.2-3b-instruct",
+        "meta-llama/llama-3-8b-instruct",
+        "meta-llama/llama-3-70b-instruct"
+    ],
+    "ollama": ["llama3.2:3b", "llama3"]
+}
+MODEL_ROUTING_STATS_PATH = os.path.join(CACHE_DIR, 'model_routing_stats.json')
+# Graded calls a model needs on a topic before it can be chosen for it.
+MODEL_ROUTING_MIN_SAMPLES = 20
+# Accuracy a model may give up against the best one on a topic in exchange for speed.
+MODEL_ROUTING_ACCURACY_TOLERANCE = 0.02
+
+# --- LLM Response Cache ---
+# Persistent SQLite cache of LLM responses keyed by backend, model, prompt and sampling parameters.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, 'llm_responses.sqlite3')
+LLM_CACHE_MAX_ENTRIES = 100000
+LLM_CACHE_MAX_AGE_SECONDS = 30 * 24 * 3600
+
+# --- Staged Pipeline Configuration ---
+# Run embed/classify, symbolic and LLM stages concurrently with bounded queues.
+STAGED_PIPELINE_ENABLED = False
+STAGED_CHUNK_SIZE = 256
+STAGED_QUEUE_SIZE = 512
+STAGED_MAX_IN_FLIGHT = 2048
+STAGED_EMBED_WORKERS = 1
+# z3's global context is not thread-safe, so the symbolic stage must stay single-threaded.
+STAGED_SYMBOLIC_WORKERS = 1
+STAGED_LLM_WORKERS = 32
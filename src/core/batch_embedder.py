@@ -0,0 +1,37 @@
+# src/core/batch_embedder.py
+
+import torch
+from src.logger import logger
+
+def encode_batched(model, texts: list[str], batch_size: int, chunk_size: int) -> torch.Tensor:
+    """
+    Encodes a list of problem statements with as few forward passes as possible.
+
+    The texts are processed in chunks of `chunk_size`. `model.encode` already
+    sorts each chunk by length so that every batch pads to a similar length, and
+    returns the vectors in input order.
+
+    Args:
+        model: A loaded SentenceTransformer model.
+        texts (list[str]): The problem statements to encode.
+        batch_size (int): Number of texts per forward pass.
+        chunk_size (int): Number of texts encoded per call to `model.encode`.
+
+    Returns:
+        torch.Tensor: An (N, dim) tensor whose i-th row is the embedding of texts[i].
+    """
+    if not texts:
+        return torch.empty((0, model.get_sentence_embedding_dimension()))
+
+    chunks = []
+    for start in range(0, len(texts), chunk_size):
+        chunk = texts[start:start + chunk_size]
+        logger.info(f"Encoding rows {start+1}-{start+len(chunk)} of {len(texts)} (batch size {batch_size})...")
+        chunks.append(model.encode(
+            chunk,
+            batch_size=batch_size,
+            convert_to_tensor=True,
+            show_progress_bar=False
+        ))
+
+    return torch.cat(chunks, dim=0)
@@ -0,0 +1,83 @@
+# src/core/cascade_gate.py
+
+import threading
+import joblib
+import numpy as np
+from src.logger import logger
+
+class CascadeGate:
+    """
+    Decides per row whether the symbolic answer is trusted enough to skip the LLM.
+
+    The trust score combines three signals:
+      - the confidence calibrator's probability that the predicted topic is correct
+        (rows whose topic was given are trusted fully),
+      - the confidence reported by the symbolic solver, and
+      - the meta-reasoner's weight for the symbolic path relative to the LLM on that topic.
+    """
+    def __init__(self, calibrator_path: str, meta_reasoner_path: str, threshold: float):
+        try:
+            logger.info(f"Loading cascade artifacts from {calibrator_path} and {meta_reasoner_path}...")
+            self.calibrator = joblib.load(calibrator_path)
+            self.meta_weights = joblib.load(meta_reasoner_path)
+            self._positive_column = list(self.calibrator.classes_).index(1)
+        except FileNotFoundError:
+            logger.error("Cascade artifacts not found. Run the build stage to train them.")
+            raise
+        except Exception as e:
+            logger.error(f"An error occurred while loading the cascade artifacts: {e}")
+            raise
+
+        self.threshold = threshold
+        self.rows_seen = 0
+        self.llm_calls_avoided = 0
+        self._lock = threading.Lock()
+        logger.info(f"✅ Cascade gate loaded with trust threshold {self.threshold:.2f}.")
+
+    def trust_score(self, topic: str, topic_confidence: float | None, symbolic_result: dict | None) -> float:
+        """
+        Computes how much the symbolic answer for a row can be trusted, in [0, 1].
+        """
+        if not symbolic_result:
+            return 0.0
+
+        if topic_confidence is None or np.isnan(topic_confidence):
+            topic_trust = 1.0
+        else:
+            topic_trust = float(self.calibrator.predict_proba([[topic_confidence]])[0, self._positive_column])
+
+        weights = self.meta_weights.get(topic, {})
+        symbolic_weight = weights.get('classifier')
+        llm_weight = weights.get('llm')
+        if symbolic_weight and llm_weight:
+            path_reliability = min(1.0, symbolic_weight / llm_weight)
+        else:
+            path_reliability = 1.0
+
+        return topic_trust * float(symbolic_result['confidence']) * path_reliability
+
+    def should_skip_llm(self, topic: str, topic_confidence: float | None, symbolic_result: dict | None) -> tuple[bool, float]:
+        """
+        Returns whether the LLM call can be skipped for a row, along with its trust score.
+        """
+        score = self.trust_score(topic, topic_confidence, symbolic_result)
+        skip = score >= self.threshold
+
+        with self._lock:
+            self.rows_seen += 1
+            if skip:
+                self.llm_calls_avoided += 1
+
+        if skip:
+            logger.info(f"Cascade: symbolic answer trusted (score {score:.2f}). Skipping LLM.")
+        return skip, score
+
+    def summary(self) -> dict:
+        """Returns the number of rows gated and LLM calls avoided so far."""
+        with self._lock:
+            rate = self.llm_calls_avoided / self.rows_seen if self.rows_seen else 0.0
+            return {
+                'rows_seen': self.rows_seen,
+                'llm_calls_avoided': self.llm_calls_avoided,
+                'avoided_rate': rate
+            }
@@ -0,0 +1,121 @@
+# src/core/checkpoint.py
+
+import hashlib
+import json
+import os
+import time
+from src.logger import logger
+
+def file_fingerprint(path: str) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _atomic_write(path: str, content: str):
+    """Writes a file via a temporary file and an atomic rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+class InferenceCheckpoint:
+    """
+    Durable record of finished rows for a long inference run.
+
+    Each finished row is appended to `results.jsonl` as {"row_id": ..., "result": ...}
+    and fsynced, so a crash loses at most the row being written. A `meta.json` file
+    stores the fingerprint of the input file; if the input changes under an existing
+    checkpoint, the old checkpoint is archived and the run starts from scratch.
+    """
+    def __init__(self, checkpoint_dir: str, input_path: str, fsync_interval: int = 1):
+        self.checkpoint_dir = checkpoint_dir
+        self.input_path = input_path
+        self.fsync_interval = max(1, fsync_interval)
+        self.meta_path = os.path.join(checkpoint_dir, 'meta.json')
+        self.results_path = os.path.join(checkpoint_dir, 'results.jsonl')
+        self.completed = {}
+        self._file = None
+        self._unsynced = 0
+
+    def open(self) -> dict:
+        """
+        Loads any existing checkpoint for the current input and opens it for appending.
+
+        Returns:
+            dict: The already completed results, keyed by row ID.
+        """
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        fingerprint = file_fingerprint(self.input_path)
+
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('input_fingerprint') == fingerprint:
+                self.completed = self._load_results()
+                logger.info(f"Resuming from checkpoint: {len(self.completed)} rows already completed.")
+            else:
+                logger.warning(f"Input file {self.input_path} changed since the checkpoint was written. Starting a fresh run.")
+                self._archive()
+
+        if not os.path.exists(self.meta_path):
+            meta = {'input_path': self.input_path, 'input_fingerprint': fingerprint, 'created_at': time.time()}
+            _atomic_write(self.meta_path, json.dumps(meta, indent=4))
+
+        # Rewrite the results without any torn trailing line before appending to it
+        _atomic_write(self.results_path, "".join(
+            json.dumps({'row_id': row_id, 'result': result}, ensure_ascii=False) + "\n"
+            for row_id, result in self.completed.items()
+        ))
+        self._file = open(self.results_path, 'a', encoding='utf-8')
+        return self.completed
+
+    def record(self, row_id: int, result: dict):
+        """Durably appends one finished row."""
+        self._file.write(json.dumps({'row_id': row_id, 'result': result}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self.completed[row_id] = result
+
+    def close(self):
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def clear(self):
+        """Removes the checkpoint once its results have been exported."""
+        self.close()
+        for path in (self.results_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+        logger.info(f"Checkpoint in {self.checkpoint_dir} cleared.")
+
+    def _load_results(self) -> dict:
+        completed = {}
+        if not os.path.exists(self.results_path):
+            return completed
+        with open(self.results_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    entry = json.loads(line)
+                    completed[entry['row_id']] = entry['result']
+                except (json.JSONDecodeError, KeyError):
+                    # A crash mid-write can leave a partial last line; that row is simply redone
+                    logger.warning(f"Ignoring unreadable checkpoint line {line_number}.")
+        return completed
+
+    def _archive(self):
+        suffix = time.strftime('%Y%m%d-%H%M%S')
+        for path in (self.results_path, self.meta_path):
+            if os.path.exists(path):
+                os.replace(path, f"{path}.stale-{suffix}")
+        logger.info(f"Archived stale checkpoint files with suffix '.stale-{suffix}'.")
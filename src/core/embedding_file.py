@@ -0,0 +1,224 @@
+# src/core/embedding_file.py
+
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+from src.logger import logger
+
+MAGIC = b'EMBF1\n'
+# The header fills one page, so the vectors start page-aligned and memmap views need no copy
+HEADER_SIZE = 4096
+STORAGE_DTYPES = ('float32', 'float16', 'int8')
+
+def quantize(vectors: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Converts float vectors to the storage dtype.
+
+    int8 uses symmetric per-row scalar quantization: each row is divided by
+    max(|x|) / 127 and rounded, and the per-row scales are returned alongside.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray | None]: The stored values and the float32
+            scales (None unless `dtype` is int8).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == 'float32':
+        return vectors, None
+    if dtype == 'float16':
+        return vectors.astype(np.float16), None
+    if dtype == 'int8':
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unsupported embedding storage dtype '{dtype}'. Expected one of {STORAGE_DTYPES}.")
+
+def dequantize(values: np.ndarray, scales: np.ndarray | None) -> np.ndarray:
+    """Returns stored values as float32, undoing int8 scaling when `scales` is given."""
+    if scales is None:
+        return np.asarray(values, dtype=np.float32)
+    return values.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+def measure_recall(reference: np.ndarray, approximate: np.ndarray, k: int = 10, max_queries: int = 1000, seed: int = 0) -> float:
+    """
+    Measures how well approximate vectors preserve cosine nearest neighbours.
+
+    For a sample of rows, the top-k neighbours (excluding the row itself) are
+    found once with the reference vectors and once with the approximate ones.
+
+    Returns:
+        float: The mean fraction of reference neighbours also found with the
+            approximate vectors (1.0 means no loss).
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    approximate = np.asarray(approximate, dtype=np.float32)
+    rows = reference.shape[0]
+    k = min(k, rows - 1)
+    if k <= 0:
+        return 1.0
+
+    def normalized(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    queries = np.random.default_rng(seed).choice(rows, size=min(max_queries, rows), replace=False)
+    ref, approx = normalized(reference), normalized(approximate)
+    overlap = 0
+    for start in range(0, len(queries), 256):
+        batch = queries[start:start + 256]
+        ref_scores = ref[batch] @ ref.T
+        approx_scores = approx[batch] @ approx.T
+        ref_scores[np.arange(len(batch)), batch] = -np.inf
+        approx_scores[np.arange(len(batch)), batch] = -np.inf
+        ref_top = np.argpartition(-ref_scores, k, axis=1)[:, :k]
+        approx_top = np.argpartition(-approx_scores, k, axis=1)[:, :k]
+        overlap += sum(len(set(a) & set(b)) for a, b in zip(ref_top, approx_top))
+    return overlap / (len(queries) * k)
+
+class EmbeddingFileWriter:
+    """
+    Writes an embedding file: a one-page JSON header followed by the raw
+    row-major vectors and, for int8, one float32 scale per row.
+
+    Vectors are appended in batches and quantized on the way. The file is built
+    under a temporary name and only renamed into place by `finalize`, which also
+    writes the header with the row count and the SHA-256 of the payload, so
+    readers never see a partial file.
+    """
+    def __init__(self, path: str, model_name: str, dim: int, dtype: str = 'float32'):
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported embedding storage dtype '{dtype}'. Expected one of {STORAGE_DTYPES}.")
+        self.path = path
+        self.model_name = model_name
+        self.dim = dim
+        self.dtype = dtype
+        self.rows = 0
+        self._scales = []
+        self._digest = hashlib.sha256()
+        self._tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(b'\0' * HEADER_SIZE)
+
+    def append(self, vectors: np.ndarray):
+        """Quantizes and appends an (N, dim) batch of float vectors."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of shape (N, {self.dim}), got {vectors.shape}.")
+        values, scales = quantize(vectors, self.dtype)
+        payload = np.ascontiguousarray(values).tobytes()
+        self._file.write(payload)
+        self._digest.update(payload)
+        if scales is not None:
+            self._scales.append(scales)
+        self.rows += vectors.shape[0]
+
+    def finalize(self, metadata: dict | None = None) -> dict:
+        """
+        Writes the scales and the header, then moves the file into place.
+
+        Args:
+            metadata (dict | None): Extra fields to record in the header, such as
+                the measured recall of a quantized file.
+
+        Returns:
+            dict: The header that was written.
+        """
+        data_offset = HEADER_SIZE
+        scales_offset = None
+        if self.dtype == 'int8':
+            scales_offset = data_offset + self.rows * self.dim * np.dtype(self.dtype).itemsize
+            scales = np.concatenate(self._scales) if self._scales else np.empty(0, dtype=np.float32)
+            payload = scales.astype(np.float32).tobytes()
+            self._file.write(payload)
+            self._digest.update(payload)
+
+        header = {
+            'model': self.model_name,
+            'dim': self.dim,
+            'dtype': self.dtype,
+            'rows': self.rows,
+            'data_offset': data_offset,
+            'scales_offset': scales_offset,
+            'checksum': self._digest.hexdigest(),
+            **(metadata or {})
+        }
+        encoded = MAGIC + json.dumps(header).encode('utf-8')
+        if len(encoded) > HEADER_SIZE:
+            raise ValueError(f"Embedding file header exceeds {HEADER_SIZE} bytes.")
+        self._file.seek(0)
+        self._file.write(encoded.ljust(HEADER_SIZE, b' '))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        return header
+
+    def abort(self):
+        """Discards a partially written file."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def read_header(path: str) -> dict:
+    """Reads and validates the header of an embedding file."""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if not raw.startswith(MAGIC):
+        raise ValueError(f"{path} is not an embedding file.")
+    return json.loads(raw[len(MAGIC):].rstrip(b' \0'))
+
+def open_embedding_file(path: str) -> tuple[dict, np.memmap, np.memmap | None]:
+    """
+    Maps an embedding file read-only, without copying it into memory.
+
+    Returns:
+        tuple[dict, np.memmap, np.memmap | None]: The header, an (rows, dim) view
+            of the stored values and, for int8, the per-row scales.
+    """
+    header = read_header(path)
+    rows, dim = header['rows'], header['dim']
+    values = np.memmap(path, dtype=header['dtype'], mode='r', offset=header['data_offset'], shape=(rows, dim))
+    scales = None
+    if header.get('scales_offset') is not None:
+        scales = np.memmap(path, dtype=np.float32, mode='r', offset=header['scales_offset'], shape=(rows,))
+    return header, values, scales
+
+def verify_embedding_file(path: str) -> bool:
+    """Recomputes the payload checksum and compares it with the header."""
+    header = read_header(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(header['data_offset'])
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest() == header['checksum']
+
+def load_embeddings(path: str) -> np.ndarray | None:
+    """
+    Loads the embeddings written by `EmbeddingFileWriter`.
+
+    float32 and float16 files are returned as read-only memmaps, so every
+    process reading the file shares one page-cached copy. int8 files are
+    dequantized into a float32 array. If `path` does not exist but a legacy
+    pickle with the same stem does, the pickle is loaded instead.
+
+    Returns:
+        np.ndarray | None: An (N, dim) array, or None if no file was found.
+    """
+    if not os.path.exists(path):
+        legacy_path = f"{os.path.splitext(path)[0]}.pkl"
+        if not os.path.exists(legacy_path):
+            logger.error(f"Embeddings file not found at {path}.")
+            return None
+        logger.warning(f"Loading legacy pickled embeddings from {legacy_path}. Re-run scripts/process_data.py to convert them.")
+        with open(legacy_path, 'rb') as f:
+            return pickle.load(f)
+
+    header, values, scales = open_embedding_file(path)
+    logger.info(f"Opened {header['rows']} {header['dtype']} embeddings of dim {header['dim']} from {path}.")
+    if scales is not None:
+        return dequantize(values, scales)
+    return values
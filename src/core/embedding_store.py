@@ -0,0 +1,128 @@
+# src/core/embedding_store.py
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Callable
+import numpy as np
+from src.logger import logger
+
+def normalize_text(text: str) -> str:
+    """Normalizes a statement for hashing: Unicode NFC, trimmed, with runs of whitespace collapsed."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', str(text))).strip()
+
+class EmbeddingStore:
+    """
+    A persistent, content-addressed SQLite store of sentence embeddings.
+
+    Each vector is keyed by the SHA-256 of the model name and the normalized text,
+    so a statement is encoded once per model no matter which dataset, row or run
+    it comes from, and editing a statement only re-encodes that statement. Like
+    the LLM response cache, every thread gets its own connection and the database
+    runs in WAL mode.
+    """
+    def __init__(self, db_path: str, model_name: str):
+        self.db_path = db_path
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    vector BLOB NOT NULL
+                )
+            """)
+        logger.info(f"Embedding store opened at {db_path} for model '{model_name}'.")
+
+    def make_key(self, text: str) -> str:
+        payload = f"{self.model_name}\n{normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts: list[str]) -> dict[int, np.ndarray]:
+        """Returns the stored vectors, keyed by position in `texts`. Missing texts are left out."""
+        keys = [self.make_key(text) for text in texts]
+        found = {}
+        conn = self._connection()
+        # Stays well below SQLite's limit on bound parameters per statement
+        for start in range(0, len(keys), 500):
+            batch = list(set(keys[start:start + 500]))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+            ).fetchall()
+            found.update({key: np.frombuffer(vector, dtype=np.float32) for key, vector in rows})
+        return {i: found[key] for i, key in enumerate(keys) if key in found}
+
+    def put_many(self, texts: list[str], vectors: np.ndarray):
+        """Stores one vector per text, replacing any existing entry."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                [(self.make_key(text), self.model_name, vector.shape[0], vector.tobytes()) for text, vector in zip(texts, vectors)]
+            )
+
+    def encode(self, texts: list[str], encode_fn: Callable[[list[str]], np.ndarray]) -> np.ndarray:
+        """
+        Returns the embeddings of `texts`, encoding only those not in the store yet.
+
+        Args:
+            texts (list[str]): The statements to embed.
+            encode_fn (Callable): Encodes a list of texts into an (N, dim) array.
+                It is only called when there is at least one new text.
+
+        Returns:
+            np.ndarray: An (N, dim) float32 array whose i-th row is the embedding of texts[i].
+        """
+        stored = self.get_many(texts)
+        # Each distinct new statement is encoded once, even if it repeats
+        missing = list(dict.fromkeys(texts[i] for i in range(len(texts)) if i not in stored))
+        with self._lock:
+            self.hits += len(stored)
+            self.misses += len(texts) - len(stored)
+
+        if missing:
+            logger.info(f"Embedding store: {len(stored)} of {len(texts)} embeddings found, encoding {len(missing)} new statements.")
+            encoded = np.asarray(encode_fn(missing), dtype=np.float32)
+            self.put_many(missing, encoded)
+            new_vectors = dict(zip(missing, encoded))
+            for i, text in enumerate(texts):
+                if i not in stored:
+                    stored[i] = new_vectors[text]
+
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([stored[i] for i in range(len(texts))])
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the number of stored vectors for this model."""
+        entries = self._connection().execute(
+            "SELECT COUNT(*) FROM embeddings WHERE model = ?", (self.model_name,)
+        ).fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries
+            }
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,101 @@
+# src/core/output_writers.py
+
+import csv
+import json
+import math
+import os
+import textwrap
+import numpy as np
+from src.logger import logger
+
+# Maps pipeline result columns to the column names used in the output files.
+OUTPUT_COLUMNS = {
+    'predicted_topic': 'topic',
+    'problem_statement': 'problem_statement',
+    'final_solution': 'solution',
+    'final_answer': 'correct_option'
+}
+
+def to_output_record(result: dict) -> dict:
+    """Selects and renames the fields of a pipeline result that go into the output files."""
+    return {output_name: _clean_value(result.get(column)) for column, output_name in OUTPUT_COLUMNS.items()}
+
+def _clean_value(value):
+    """Converts numpy scalars and NaN into plain JSON/CSV-friendly Python values."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+class JsonlResultWriter:
+    """
+    Appends one JSON object per line and flushes after every record, so partial
+    output is readable while the run is still going.
+    """
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        logger.info(f"Streaming JSONL results to {path}")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False, default=_clean_value) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class CsvResultWriter:
+    """
+    Appends one CSV row per record and flushes after every row. The header is
+    written only when the file is new or empty.
+    """
+    def __init__(self, path: str, fieldnames: list[str], append: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_header = not append or not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        if write_header:
+            self._writer.writeheader()
+            self._file.flush()
+        logger.info(f"Streaming CSV results to {path}")
+
+    def write(self, record: dict):
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def jsonl_to_json_array(jsonl_path: str, json_path: str):
+    """
+    Converts a JSONL file into a JSON array file one record at a time, without
+    loading the whole file into memory.
+    """
+    with open(jsonl_path, 'r', encoding='utf-8') as src, open(json_path, 'w', encoding='utf-8') as dst:
+        dst.write("[")
+        first = True
+        for line in src:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            dst.write("\n" if first else ",\n")
+            dst.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=4), "    "))
+            first = False
+        dst.write("\n]" if not first else "]")
+    logger.info(f"Converted {jsonl_path} to {json_path}")
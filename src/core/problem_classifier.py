@@ -2,6 +2,7 @@
 
 import joblib
 import torch
+import numpy as np
 import pandas as pd
 from src.logger import logger
 from train.classifier.model import SimpleClassifierNN
@@ -63,4 +64,38 @@ class ProblemClassifier:
             _, predicted_idx = torch.max(output.data, 1)
             
         predicted_topic = self.label_encoder.inverse_transform([predicted_idx.item()])
-        return predicted_topic[0]
\ No newline at end of file
+        return predicted_topic[0]
+
+    def predict_batch(self, embeddings: torch.Tensor, has_topic: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Predicts topics for a whole matrix of embeddings in a single forward pass.
+
+        Args:
+            embeddings (torch.Tensor): An (N, input_dim) matrix of pre-computed embeddings.
+            has_topic (np.ndarray | None): Boolean mask of length N marking rows that already
+                have a topic. These rows are skipped and left as None in the output.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The predicted topic names (object array) and the
+            softmax confidence of each prediction (NaN for skipped rows).
+        """
+        num_rows = embeddings.shape[0]
+        topics = np.full(num_rows, None, dtype=object)
+        confidences = np.full(num_rows, np.nan, dtype=np.float32)
+
+        if has_topic is None:
+            has_topic = np.zeros(num_rows, dtype=bool)
+        to_predict = np.flatnonzero(~np.asarray(has_topic, dtype=bool))
+
+        logger.info(f"Batch classification: {num_rows - len(to_predict)} rows have a topic, predicting {len(to_predict)}.")
+        if len(to_predict) == 0:
+            return topics, confidences
+
+        with torch.no_grad():
+            batch = torch.as_tensor(embeddings, dtype=torch.float32)[torch.from_numpy(to_predict)].to(self.device)
+            probabilities = torch.softmax(self.model(batch), dim=1)
+            max_probs, predicted_idx = torch.max(probabilities, 1)
+
+        topics[to_predict] = self.label_encoder.inverse_transform(predicted_idx.cpu().numpy())
+        confidences[to_predict] = max_probs.cpu().numpy()
+        return topics, confidences
\ No newline at end of file
@@ -1,4 +1,5 @@
 # src/core/reasoner.py
+from concurrent.futures import ThreadPoolExecutor
 from src.logger import logger
 from src.reasoners.symbolic_reasoner import SymbolicReasoner
 from src.reasoners.heuristic_reasoner import HeuristicReasoner
@@ -13,6 +14,9 @@ class Reasoner:
             logger.info("Loading reasoning components...")
             self.symbolic_reasoner = SymbolicReasoner()
             self.heuristic_reasoner = HeuristicReasoner() # <-- NEW
+            # A single worker keeps every z3 call on one thread, since z3's global
+            # context is not thread-safe.
+            self._symbolic_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="symbolic")
             logger.info("✅ Reasoning components loaded successfully.")
         except Exception as e:
             logger.error(f"An error occurred while loading the reasoners: {e}")
@@ -28,4 +32,30 @@ class Reasoner:
         """
         Attempts to find a solution using the heuristic (LLM) reasoning path.
         """
-        return self.heuristic_reasoner.solve(row, topic)
\ No newline at end of file
+        return self.heuristic_reasoner.solve(row, topic)
+
+    def solve_heuristically_packed(self, rows: list[pd.Series], topic: str) -> list[dict | None]:
+        """
+        Solves several same-topic rows with one packed LLM request.
+        """
+        return self.heuristic_reasoner.solve_packed(rows, topic)
+
+    def solve_concurrently(self, row: pd.Series, topic: str) -> tuple[dict | None, dict | None]:
+        """
+        Runs the symbolic and heuristic paths at the same time. The symbolic solver
+        runs on a background thread while the LLM request is in flight, so the
+        latency of a row is the slower of the two paths rather than their sum.
+
+        Returns:
+            tuple[dict | None, dict | None]: The (symbolic, heuristic) results.
+        """
+        symbolic_future = self._symbolic_executor.submit(self.solve_symbolically, row, topic)
+        heuristic_result = self.solve_heuristically(row, topic)
+
+        try:
+            symbolic_result = symbolic_future.result()
+        except Exception as e:
+            logger.error(f"Symbolic path failed during concurrent solve: {e}", exc_info=True)
+            symbolic_result = None
+
+        return symbolic_result, heuristic_result
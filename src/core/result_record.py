@@ -0,0 +1,46 @@
+# src/core/result_record.py
+
+import math
+
+def build_result_record(predicted_topic: str, topic_confidence: float | None,
+                        symbolic_result: dict | None, heuristic_result: dict | None,
+                        llm_skipped: bool = False) -> dict:
+    """
+    Builds the per-row result dictionary that is joined onto the test data.
+
+    Args:
+        predicted_topic (str): The existing or predicted topic of the row.
+        topic_confidence (float | None): Classifier confidence, or None/NaN when the topic was given.
+        symbolic_result (dict | None): Output of the symbolic reasoner.
+        heuristic_result (dict | None): Output of the heuristic (LLM) reasoner.
+        llm_skipped (bool): True when the cascade accepted the symbolic answer without calling the LLM.
+
+    Returns:
+        dict: A flat record with one column per result field. The `final_*` columns hold
+        the answer that is written to the output files.
+    """
+    if topic_confidence is not None and math.isnan(topic_confidence):
+        topic_confidence = None
+
+    if llm_skipped and symbolic_result:
+        final_answer = symbolic_result['answer']
+        final_solution = "[Answered by the symbolic solver; LLM call skipped by the confidence cascade]"
+        answer_source = 'symbolic'
+    else:
+        final_answer = heuristic_result['answer'] if heuristic_result else None
+        final_solution = heuristic_result['solution'] if heuristic_result else None
+        answer_source = 'heuristic' if heuristic_result else None
+
+    return {
+        'predicted_topic': predicted_topic,
+        'topic_confidence': float(topic_confidence) if topic_confidence is not None else None,
+        'symbolic_answer': symbolic_result['answer'] if symbolic_result else None,
+        'symbolic_confidence': symbolic_result['confidence'] if symbolic_result else None,
+        'heuristic_answer': heuristic_result['answer'] if heuristic_result else None,
+        'heuristic_confidence': heuristic_result['confidence'] if heuristic_result else None,
+        'heuristic_solution': heuristic_result['solution'] if heuristic_result else None,
+        'llm_skipped': llm_skipped,
+        'final_answer': final_answer,
+        'final_solution': final_solution,
+        'answer_source': answer_source
+    }
@@ -0,0 +1,257 @@
+# src/core/staged_pipeline.py
+
+import queue
+import threading
+from typing import Callable, Iterator
+import pandas as pd
+from src.logger import logger
+from src.core.result_record import build_result_record
+
+# Marks the end of a stage's input. Each worker consumes exactly one.
+_SENTINEL = object()
+# How often a blocked thread wakes up to check whether the run was stopped
+_POLL_INTERVAL = 0.1
+
+def _put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    """Puts `item` on a bounded queue, giving up if `stop` is set. Returns True if it was queued."""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _get(source: queue.Queue, stop: threading.Event):
+    """Takes the next item from a queue, or returns `_SENTINEL` once `stop` is set."""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return _SENTINEL
+
+def _drain(*queues: queue.Queue):
+    """Discards whatever is left on the queues."""
+    for pending in queues:
+        while True:
+            try:
+                pending.get_nowait()
+            except queue.Empty:
+                break
+
+class _Stage:
+    """
+    A pool of worker threads that takes items from an input queue, applies a handler,
+    and puts every item the handler returns onto the output queue.
+
+    Once the last worker has seen its sentinel, the stage sends one sentinel per
+    downstream worker so that shutdown propagates along the chain. When `stop` is
+    set, workers exit as soon as they are no longer busy in the handler.
+    """
+    def __init__(self, name: str, handler: Callable, num_workers: int,
+                 input_queue: queue.Queue, output_queue: queue.Queue, downstream_workers: int,
+                 stop: threading.Event):
+        self.name = name
+        self.handler = handler
+        self.num_workers = max(1, num_workers)
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.downstream_workers = downstream_workers
+        self.stop = stop
+        self._active = self.num_workers
+        self._exited = 0
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        logger.info(f"Stage '{self.name}' started with {self.num_workers} worker(s).")
+
+    def crashed(self) -> bool:
+        """True if a worker thread died without returning, so the stage can no longer finish."""
+        with self._lock:
+            exited = self._exited
+        return sum(not thread.is_alive() for thread in self._threads) > exited
+
+    def _work(self):
+        self._consume()
+        with self._lock:
+            self._exited += 1
+
+    def _consume(self):
+        while True:
+            item = _get(self.input_queue, self.stop)
+            if item is _SENTINEL:
+                break
+            for output in self.handler(item):
+                # Blocks when the next stage is saturated (backpressure)
+                if not _put(self.output_queue, output, self.stop):
+                    return
+
+        with self._lock:
+            self._active -= 1
+            is_last = self._active == 0
+        if is_last:
+            for _ in range(self.downstream_workers):
+                if not _put(self.output_queue, _SENTINEL, self.stop):
+                    return
+
+class StagedPipeline:
+    """
+    Runs inference as a chain of stages connected by bounded queues:
+
+        embed + classify (per chunk) -> symbolic (per row) -> heuristic/LLM (per row) -> ordered merge
+
+    Every stage has its own worker pool, so the CPU-bound stages keep working while
+    the LLM workers wait on the network. Queues are bounded and the number of rows
+    in flight is capped, which keeps memory flat no matter how far the fast stages
+    could run ahead of the slow ones. Results are yielded in input order.
+    """
+    def __init__(self, classify_fn: Callable, symbolic_fn: Callable, heuristic_fn: Callable,
+                 chunk_size: int, queue_size: int, max_in_flight: int,
+                 embed_workers: int, symbolic_workers: int, llm_workers: int, cascade_gate=None):
+        """
+        Args:
+            classify_fn (Callable): Takes a DataFrame chunk and returns (topics, topic_confidences).
+            symbolic_fn (Callable): Takes (row, topic) and returns the symbolic result.
+            heuristic_fn (Callable): Takes (row, topic) and returns the heuristic result.
+            chunk_size (int): Rows embedded and classified together.
+            queue_size (int): Capacity of each inter-stage row queue.
+            max_in_flight (int): Maximum rows admitted but not yet yielded.
+            embed_workers (int): Worker threads for the embedding/classification stage.
+            symbolic_workers (int): Worker threads for the symbolic stage.
+            llm_workers (int): Worker threads for the heuristic (LLM) stage.
+            cascade_gate (CascadeGate | None): When set, rows whose symbolic answer is
+                trusted skip the LLM call.
+        """
+        self.classify_fn = classify_fn
+        self.symbolic_fn = symbolic_fn
+        self.heuristic_fn = heuristic_fn
+        self.chunk_size = max(1, chunk_size)
+        self.queue_size = max(1, queue_size)
+        self.max_in_flight = max(max_in_flight, self.chunk_size)
+        self.embed_workers = max(1, embed_workers)
+        self.symbolic_workers = max(1, symbolic_workers)
+        self.llm_workers = max(1, llm_workers)
+        self.cascade_gate = cascade_gate
+
+    def run(self, test_data: pd.DataFrame) -> Iterator[tuple[int, dict]]:
+        """
+        Processes every row of `test_data` and yields (position, result_record) in order.
+
+        If the caller stops iterating early, the worker threads are told to stop
+        and the queues are drained, so no thread stays blocked on a full queue.
+        """
+        chunk_queue = queue.Queue(maxsize=2 * self.embed_workers)
+        symbolic_queue = queue.Queue(maxsize=self.queue_size)
+        llm_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+        window = threading.Semaphore(self.max_in_flight)
+        stop = threading.Event()
+
+        stages = [
+            _Stage("embed", self._embed_stage, self.embed_workers, chunk_queue, symbolic_queue, self.symbolic_workers, stop),
+            _Stage("symbolic", self._symbolic_stage, self.symbolic_workers, symbolic_queue, llm_queue, self.llm_workers, stop),
+            _Stage("llm", self._llm_stage, self.llm_workers, llm_queue, result_queue, 1, stop),
+        ]
+        for stage in stages:
+            stage.start()
+
+        fed = threading.Event()
+
+        def feed():
+            for start in range(0, len(test_data), self.chunk_size):
+                chunk = test_data.iloc[start:start + self.chunk_size]
+                for _ in range(len(chunk)):
+                    while not window.acquire(timeout=_POLL_INTERVAL):
+                        if stop.is_set():
+                            return
+                if not _put(chunk_queue, (start, chunk), stop):
+                    return
+            for _ in range(self.embed_workers):
+                if not _put(chunk_queue, _SENTINEL, stop):
+                    return
+            fed.set()
+
+        feeder = threading.Thread(target=feed, name="staged-feeder", daemon=True)
+        feeder.start()
+        logger.info(f"Staged pipeline running on {len(test_data)} rows.")
+
+        # Ordered merge: buffer out-of-order results until the next expected row arrives
+        pending = {}
+        next_position = 0
+        try:
+            while not stop.is_set():
+                try:
+                    item = result_queue.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    # A dead thread never sends its sentinel, so waiting any longer would hang the run
+                    if any(stage.crashed() for stage in stages) or not (feeder.is_alive() or fed.is_set()):
+                        logger.error("A staged pipeline worker thread died. Stopping the run.")
+                        break
+                    continue
+                if item is _SENTINEL:
+                    break
+                position, record = item
+                pending[position] = record
+                while next_position in pending:
+                    yield next_position, pending.pop(next_position)
+                    next_position += 1
+                    window.release()
+        except GeneratorExit:
+            # Raised at the yield, before the row just handed out is counted
+            logger.warning(f"Staged pipeline stopped early after {next_position + 1} of {len(test_data)} rows.")
+            raise
+        finally:
+            # Unblocks any thread still waiting to put onto a full queue
+            stop.set()
+            _drain(chunk_queue, symbolic_queue, llm_queue, result_queue)
+
+        if pending:
+            logger.error(f"Staged pipeline finished with {len(pending)} rows that could not be merged in order.")
+        logger.info("Staged pipeline run complete.")
+
+    def _embed_stage(self, job: tuple[int, pd.DataFrame]) -> list[dict]:
+        start, chunk = job
+        try:
+            topics, topic_confidences = self.classify_fn(chunk)
+        except Exception as e:
+            logger.error(f"Embedding stage failed for rows {start+1}-{start+len(chunk)}: {e}", exc_info=True)
+            topics = [None] * len(chunk)
+            topic_confidences = [None] * len(chunk)
+
+        return [
+            {'position': start + i, 'row': row, 'topic': topics[i], 'topic_confidence': topic_confidences[i]}
+            for i, (_, row) in enumerate(chunk.iterrows())
+        ]
+
+    def _symbolic_stage(self, item: dict) -> list[dict]:
+        item['symbolic_result'] = None
+        if item['topic'] is not None:
+            try:
+                item['symbolic_result'] = self.symbolic_fn(item['row'], item['topic'])
+            except Exception as e:
+                logger.error(f"Symbolic stage failed for row {item['position']+1}: {e}", exc_info=True)
+        return [item]
+
+    def _llm_stage(self, item: dict) -> list[tuple[int, dict]]:
+        heuristic_result = None
+        llm_skipped = False
+        if item['topic'] is not None and self.cascade_gate is not None:
+            llm_skipped, _ = self.cascade_gate.should_skip_llm(
+                item['topic'], item['topic_confidence'], item['symbolic_result']
+            )
+        if item['topic'] is not None and not llm_skipped:
+            try:
+                heuristic_result = self.heuristic_fn(item['row'], item['topic'])
+            except Exception as e:
+                logger.error(f"Heuristic stage failed for row {item['position']+1}: {e}", exc_info=True)
+
+        record = build_result_record(
+            item['topic'], item['topic_confidence'], item['symbolic_result'], heuristic_result, llm_skipped
+        )
+        return [(item['position'], record)]
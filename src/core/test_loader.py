@@ -3,11 +3,12 @@ import pandas as pd
 import json
 from src.logger import logger
 from src import config as main_config
-from src.data_pipeline.schemas import TestDataRow, ValidationError
+from src.data_pipeline.schemas import TestDataRow
+from src.data_pipeline.validation import validate_frame
 
 def load_test_data():
     
-    test_data_path = os.path.join(main_config.PROCESSED_DATA_DIR, 'test_processed.json')
+    test_data_path = main_config.TEST_PROCESSED_PATH
     logger.info(f"Loading and validating test data from {test_data_path}...")
     
     try:
@@ -20,17 +21,12 @@ def load_test_data():
         logger.error(f"Error decoding JSON from {test_data_path}. The file may be corrupt.")
         return pd.DataFrame()
 
-    valid_records = []
-    invalid_count = 0
-    for i, record in enumerate(data):
-        try:
-            # Validate each record using the Pydantic model
-            validated_record = TestDataRow(**record)
-            valid_records.append(validated_record.model_dump())
-        except ValidationError as e:
-            # Log any data quality issues
-            logger.warning(f"Skipping invalid record #{i+1} in test data. Reason: {e}")
-            invalid_count += 1
+    # Whole columns are checked at once; only the failing records go through the Pydantic model
+    valid_records, errors = validate_frame(pd.DataFrame(data), TestDataRow, rows=data)
+    for i, e in errors:
+        # Log any data quality issues
+        logger.warning(f"Skipping invalid record #{i+1} in test data. Reason: {e}")
+    invalid_count = len(errors)
             
     if invalid_count > 0:
         logger.warning(f"Found and skipped a total of {invalid_count} invalid records.")
@@ -1,12 +1,19 @@
 # src/core_pipeline.py
 
 import os
+from typing import Iterator
+import numpy as np
 import pandas as pd
 from src.logger import logger
 from src import config as main_config
 from src.core.problem_classifier import ProblemClassifier
 from src.core.test_loader import load_test_data
 from src.core.reasoner import Reasoner
+from src.core.batch_embedder import encode_batched
+from src.core.embedding_store import EmbeddingStore
+from src.core.result_record import build_result_record
+from src.core.staged_pipeline import StagedPipeline
+from src.core.cascade_gate import CascadeGate
 from sentence_transformers import SentenceTransformer
 import textwrap
 
@@ -23,6 +30,8 @@ class CorePipeline:
         self.reasoner = None
         self.test_data = None
         self.embedding_model = None
+        self.embedding_store = None
+        self.cascade_gate = None
         
         self._setup_directories()
         
@@ -36,71 +45,271 @@ class CorePipeline:
 
         except Exception as e:
             logger.error(f"Failed to initialize a core component: {e}", exc_info=True)
+
+        if main_config.EMBEDDING_STORE_ENABLED:
+            try:
+                self.embedding_store = EmbeddingStore(main_config.EMBEDDING_STORE_PATH, main_config.EMBEDDING_MODEL_NAME)
+            except Exception as e:
+                logger.warning(f"Could not open the embedding store, every statement will be encoded: {e}")
+        
+        if main_config.CASCADE_ENABLED:
+            try:
+                self.cascade_gate = CascadeGate(
+                    calibrator_path=os.path.join(main_config.MODELS_DIR, "confidence_calibrator.pkl"),
+                    meta_reasoner_path=os.path.join(main_config.MODELS_DIR, "meta_reasoner.pkl"),
+                    threshold=main_config.CASCADE_CONFIDENCE_THRESHOLD
+                )
+            except Exception as e:
+                logger.warning(f"Cascade disabled, every row will be sent to the LLM: {e}")
             
         logger.info("Core reasoning pipeline initialized.")
 
-    def run(self):
+    def run(self, staged: bool | None = None):
         """
         Runs the full inference pipeline on the loaded test data.
+
+        Args:
+            staged (bool | None): Run the stages concurrently with bounded queues and
+                per-stage worker pools. Defaults to `STAGED_PIPELINE_ENABLED` in the config.
         """
+        if not self._is_ready():
+            return None
+
+        indices, results = [], []
+        for index, result in self.iter_results(staged=staged):
+            indices.append(index)
+            results.append(result)
+        if not results:
+            logger.error("No rows were processed. Nothing to return.")
+            return None
+        if len(results) < len(self.test_data):
+            # e.g. a staged run whose stages stopped early; the unfinished rows are left out
+            logger.error(f"Only {len(results)} of {len(self.test_data)} rows were processed. The results cover those rows only.")
+        self.test_data = pd.DataFrame(results, index=pd.Index(indices, name=self.test_data.index.name))
+        
+        print("\n\n" + "="*30 + " FINAL RESULTS PREVIEW " + "="*30)
+        print(self.test_data[[
+            'problem_statement', 'predicted_topic', 'symbolic_answer', 'heuristic_answer', 'heuristic_solution'
+        ]].head())
+        print("="*85)
+        
+        return self.test_data
+
+    def iter_results(self, staged: bool | None = None, skip_rows: set | None = None) -> Iterator[tuple[int, dict]]:
+        """
+        Runs inference and yields each finished row as soon as it is ready, in input order.
+
+        Only one chunk of embeddings is held in memory at a time, so memory stays flat
+        regardless of the size of the test set.
+
+        Args:
+            staged (bool | None): Use the concurrent staged pipeline. Defaults to
+                `STAGED_PIPELINE_ENABLED` in the config.
+            skip_rows (set | None): Row indices that are already done (e.g. from a
+                checkpoint) and should not be processed again.
+
+        Yields:
+            tuple[int, dict]: The row index and the input row merged with its result record.
+        """
+        if not self._is_ready():
+            return
+
+        if staged is None:
+            staged = main_config.STAGED_PIPELINE_ENABLED
+
+        data = self.test_data
+        if skip_rows:
+            data = data[~data.index.isin(list(skip_rows))]
+            logger.info(f"Skipping {len(self.test_data) - len(data)} rows that are already completed.")
+
+        logger.info(f"Starting {'staged' if staged else 'sequential'} inference run on {len(data)} rows...")
+        
+        records = self._iter_staged(data) if staged else self._iter_sequential(data)
+        try:
+            for position, record in records:
+                row = data.iloc[position]
+                yield data.index[position], {**row.to_dict(), **record}
+        finally:
+            # Stops the staged workers right away if the caller abandons this generator
+            records.close()
+        
+        logger.info("Inference run complete.")
+        if self.embedding_store is not None:
+            stats = self.embedding_store.stats()
+            logger.info(f"Embedding store: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), {stats['entries']} embeddings stored.")
+        if self.cascade_gate is not None:
+            stats = self.cascade_gate.summary()
+            logger.info(f"Cascade avoided {stats['llm_calls_avoided']} of {stats['rows_seen']} LLM calls ({stats['avoided_rate']:.1%}).")
+        llm_factory = self.reasoner.heuristic_reasoner.llm_factory
+        if llm_factory is not None and llm_factory.response_cache is not None:
+            stats = llm_factory.response_cache.stats()
+            logger.info(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.1%} hit rate), {stats['entries']} entries stored.")
+        if llm_factory is not None and llm_factory.dispatcher is not None:
+            llm_factory.dispatcher.log_summary()
+        if llm_factory is not None:
+            for name, breaker in llm_factory.breakers.items():
+                stats = breaker.snapshot()
+                logger.info(f"Circuit '{name}': {stats['state']}, opened {stats['times_opened']} times, {stats['rejected']} requests rejected.")
+        if llm_factory is not None and llm_factory.hedge_budget is not None:
+            stats = llm_factory.hedge_budget.summary()
+            logger.info(f"LLM hedging: {stats['hedges']} of {stats['requests']} requests hedged, {stats['hedge_wins']} won by the hedge.")
+        if llm_factory is not None and llm_factory.telemetry is not None:
+            llm_factory.telemetry.write(main_config.TELEMETRY_DIR)
+
+    def _is_ready(self) -> bool:
+        """Checks that every component and the test data were loaded."""
         if self.test_data is None or self.test_data.empty or self.classifier is None or self.reasoner is None:
             logger.error("A required component or data is not available. Aborting run.")
-            return None
+            return False
+        return True
 
-        logger.info("Starting inference run on test data...")
+    def _embed_and_classify(self, data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Embeds a block of rows in batched forward passes and classifies every row
+        that does not already have a topic. Statements found in the embedding
+        store are not encoded again.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: The topic of each row and the classifier
+            confidence (NaN where the topic was already given).
+        """
+        texts = data['problem_statement'].tolist()
+        if self.embedding_store is not None:
+            embeddings = self.embedding_store.encode(texts, lambda missing: self._encode(missing).cpu().numpy())
+        else:
+            embeddings = self._encode(texts)
         
-        results = []
-        for index, row in self.test_data.iterrows():
-            print(f"\n{'='*25} Processing Row {index+1} {'='*25}")
-            
-            print("\n[ PROBLEM STATEMENT ]")
-            print(textwrap.fill(row['problem_statement'], width=80))
-            print("\n[ OPTIONS ]")
-            print(f"  1: {row['answer_option_1']}")
-            print(f"  2: {row['answer_option_2']}")
-            print(f"  3: {row['answer_option_3']}")
-            print(f"  4: {row['answer_option_4']}")
-            print(f"  5: {row['answer_option_5']}")
-            print("-" * 65)
-            
-            embedding = self.embedding_model.encode(row['problem_statement'], convert_to_tensor=True)
+        if 'topic' in data.columns:
+            has_topic = data['topic'].notna().to_numpy()
+            existing_topics = data['topic'].to_numpy(dtype=object)
+        else:
+            has_topic = np.zeros(len(data), dtype=bool)
+            existing_topics = np.full(len(data), None, dtype=object)
+        predicted_topics, topic_confidences = self.classifier.predict_batch(embeddings, has_topic)
+        return np.where(has_topic, existing_topics, predicted_topics), topic_confidences
+
+    def _encode(self, texts: list[str]):
+        return encode_batched(
+            self.embedding_model,
+            texts,
+            batch_size=main_config.EMBEDDING_BATCH_SIZE,
+            chunk_size=main_config.EMBEDDING_CHUNK_SIZE
+        )
+
+    def _iter_sequential(self, data: pd.DataFrame) -> Iterator[tuple[int, dict]]:
+        """Processes the rows one at a time, printing each step."""
+        chunk_size = main_config.EMBEDDING_CHUNK_SIZE
+        for chunk_start in range(0, len(data), chunk_size):
+            chunk = data.iloc[chunk_start:chunk_start + chunk_size]
             
-            # 1. Classify Topic
-            predicted_topic = self.classifier.predict(row=row, embedding=embedding, row_index=index)
+            # 1. Embed and classify the whole chunk up front
+            topics, topic_confidences = self._embed_and_classify(chunk)
+            # Rows of short topics are solved together in packed LLM requests
+            packed = self._solve_packed_chunk(chunk, topics, topic_confidences) if main_config.PACKED_PROMPTS_ENABLED else {}
             
+            for offset, (index, row) in enumerate(chunk.iterrows()):
+                record = self._solve_row(index, row, topics[offset], topic_confidences[offset], packed.get(index))
+                yield chunk_start + offset, record
+
+    def _solve_packed_chunk(self, chunk: pd.DataFrame, topics: np.ndarray, topic_confidences: np.ndarray) -> dict:
+        """
+        Solves the chunk's rows whose topic is in `PACKED_PROMPT_TOPICS`, packing up
+        to `PACKED_PROMPT_SIZE` same-topic rows into each LLM request. Rows the
+        cascade accepts from the symbolic answer are left out of the packs.
+
+        Returns:
+            dict: (symbolic_result, heuristic_result, llm_skipped) keyed by row index.
+        """
+        packable_topics = {topic.lower() for topic in main_config.PACKED_PROMPT_TOPICS}
+        solved = {}
+        groups = {}
+        for offset, (index, row) in enumerate(chunk.iterrows()):
+            topic = topics[offset]
+            if topic is None or str(topic).lower() not in packable_topics:
+                continue
+            symbolic_result = self.reasoner.solve_symbolically(row=row, topic=topic)
+            llm_skipped = False
+            if self.cascade_gate is not None:
+                llm_skipped, _ = self.cascade_gate.should_skip_llm(topic, topic_confidences[offset], symbolic_result)
+            solved[index] = (symbolic_result, None, llm_skipped)
+            if not llm_skipped:
+                groups.setdefault(topic, []).append((index, row))
+
+        pack_size = main_config.PACKED_PROMPT_SIZE
+        for topic, members in groups.items():
+            for start in range(0, len(members), pack_size):
+                pack = members[start:start + pack_size]
+                heuristic_results = self.reasoner.solve_heuristically_packed([row for _, row in pack], topic)
+                for (index, _), heuristic_result in zip(pack, heuristic_results):
+                    symbolic_result, _, llm_skipped = solved[index]
+                    solved[index] = (symbolic_result, heuristic_result, llm_skipped)
+        return solved
+
+    def _solve_row(self, index, row: pd.Series, predicted_topic: str, topic_confidence: float,
+                   precomputed: tuple | None = None) -> dict:
+        """
+        Runs the symbolic and heuristic paths for one row and builds its result record.
+        `precomputed` holds the (symbolic, heuristic, llm_skipped) results of a row
+        that was already solved in a packed request.
+        """
+        print(f"\n{'='*25} Processing Row {index+1} {'='*25}")
+        
+        print("\n[ PROBLEM STATEMENT ]")
+        print(textwrap.fill(row['problem_statement'], width=80))
+        print("\n[ OPTIONS ]")
+        print(f"  1: {row['answer_option_1']}")
+        print(f"  2: {row['answer_option_2']}")
+        print(f"  3: {row['answer_option_3']}")
+        print(f"  4: {row['answer_option_4']}")
+        print(f"  5: {row['answer_option_5']}")
+        print("-" * 65)
+        
+        llm_skipped = False
+        if precomputed is not None:
+            symbolic_result, heuristic_result, llm_skipped = precomputed
+        elif self.cascade_gate is not None:
+            # 2. Get Symbolic Answer, then 3. call the LLM only if it is not trusted
+            symbolic_result = self.reasoner.solve_symbolically(row=row, topic=predicted_topic)
+            llm_skipped, _ = self.cascade_gate.should_skip_llm(predicted_topic, topic_confidence, symbolic_result)
+            heuristic_result = None if llm_skipped else self.reasoner.solve_heuristically(row=row, topic=predicted_topic)
+        elif main_config.CONCURRENT_REASONING_ENABLED:
+            # 2 + 3. Run the symbolic solver while the LLM request is in flight
+            symbolic_result, heuristic_result = self.reasoner.solve_concurrently(row=row, topic=predicted_topic)
+        else:
             # 2. Get Symbolic Answer
             symbolic_result = self.reasoner.solve_symbolically(row=row, topic=predicted_topic)
-            if symbolic_result:
-                print(f"-> Symbolic Output: option number: {symbolic_result['answer']} - confidence: {symbolic_result['confidence']}")
-            
             # 3. Get Heuristic (LLM) Answer
             heuristic_result = self.reasoner.solve_heuristically(row=row, topic=predicted_topic)
-            if heuristic_result:
-                solution_text = textwrap.fill(heuristic_result['solution'], width=70, initial_indent="    ", subsequent_indent="    ")
-                print(f"-> Heuristic Output: option_number: {heuristic_result['answer']}, solution: \n{solution_text}\n     , then confidence: {heuristic_result['confidence']}")
-
-            results.append({
-                'predicted_topic': predicted_topic,
-                'symbolic_answer': symbolic_result['answer'] if symbolic_result else None,
-                'symbolic_confidence': symbolic_result['confidence'] if symbolic_result else None,
-                'heuristic_answer': heuristic_result['answer'] if heuristic_result else None,
-                'heuristic_confidence': heuristic_result['confidence'] if heuristic_result else None,
-                'heuristic_solution': heuristic_result['solution'] if heuristic_result else None
-            })
-
-        result_df = pd.DataFrame(results)
-        self.test_data = pd.concat([self.test_data, result_df], axis=1)
-        
-        logger.info("Inference run complete.")
-        
-        print("\n\n" + "="*30 + " FINAL RESULTS PREVIEW " + "="*30)
-        print(self.test_data[[
-            'problem_statement', 'predicted_topic', 'symbolic_answer', 'heuristic_answer', 'heuristic_solution'
-        ]].head())
-        print("="*85)
         
-        return self.test_data
+        if symbolic_result:
+            print(f"-> Symbolic Output: option number: {symbolic_result['answer']} - confidence: {symbolic_result['confidence']}")
+        if llm_skipped:
+            print("-> Heuristic Output: skipped, symbolic answer accepted by the cascade")
+        if heuristic_result:
+            solution_text = textwrap.fill(heuristic_result['solution'], width=70, initial_indent="    ", subsequent_indent="    ")
+            print(f"-> Heuristic Output: option_number: {heuristic_result['answer']}, solution: \n{solution_text}\n     , then confidence: {heuristic_result['confidence']}")
+
+        return build_result_record(predicted_topic, topic_confidence, symbolic_result, heuristic_result, llm_skipped)
 
+    def _iter_staged(self, data: pd.DataFrame) -> Iterator[tuple[int, dict]]:
+        """Processes the rows through the concurrent staged pipeline."""
+        if main_config.PACKED_PROMPTS_ENABLED:
+            logger.warning("PACKED_PROMPTS_ENABLED has no effect in the staged pipeline; rows are solved one LLM call each.")
+        if main_config.CONCURRENT_REASONING_ENABLED:
+            logger.warning("CONCURRENT_REASONING_ENABLED has no effect in the staged pipeline; use STAGED_LLM_WORKERS to set LLM concurrency.")
+        staged_pipeline = StagedPipeline(
+            classify_fn=self._embed_and_classify,
+            symbolic_fn=self.reasoner.solve_symbolically,
+            heuristic_fn=self.reasoner.solve_heuristically,
+            cascade_gate=self.cascade_gate,
+            chunk_size=main_config.STAGED_CHUNK_SIZE,
+            queue_size=main_config.STAGED_QUEUE_SIZE,
+            max_in_flight=main_config.STAGED_MAX_IN_FLIGHT,
+            embed_workers=main_config.STAGED_EMBED_WORKERS,
+            symbolic_workers=main_config.STAGED_SYMBOLIC_WORKERS,
+            llm_workers=main_config.STAGED_LLM_WORKERS
+        )
+        return staged_pipeline.run(data)
 
     def _display_banner(self):
         """Displays a welcome banner for the application."""
@@ -1,7 +1,7 @@
 # src/data_pipeline/__init__.py
 
-from .loader import load_data
-from .processor import process_data
-from .embedder import create_embeddings
+from .loader import load_data, iter_valid_chunks
+from .processor import process_data, stream_processed_rows, JsonArrayWriter
+from .embedder import create_embeddings, precompute_embeddings, write_embeddings, store_embeddings
 
 print("Data pipeline package initialized.")
\ No newline at end of file
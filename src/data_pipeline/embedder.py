@@ -1,33 +1,189 @@
 # src/data_pipeline/embedder.py
 
-import pandas as pd
-import pickle
 import os
+import time
+from typing import Iterable, Iterator
+import pandas as pd
+import numpy as np
 from sentence_transformers import SentenceTransformer
 from src.logger import logger
+from src.core.embedding_store import EmbeddingStore
+from src.core.embedding_file import EmbeddingFileWriter, quantize, dequantize, measure_recall
+
+# Thread pools are sized from these variables when a worker process imports torch or numpy
+_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+def _start_encoding_pool(model: SentenceTransformer, workers: int, threads_per_worker: int) -> dict:
+    """
+    Starts `workers` CPU encoding processes, each limited to `threads_per_worker`
+    intra-op threads so the processes do not oversubscribe the cores.
+    """
+    previous = {var: os.environ.get(var) for var in _THREAD_ENV_VARS}
+    # Spawned workers inherit the environment at start-up
+    os.environ.update({var: str(threads_per_worker) for var in _THREAD_ENV_VARS})
+    try:
+        logger.info(f"Starting {workers} embedding worker processes with {threads_per_worker} thread(s) each...")
+        return model.start_multi_process_pool(target_devices=['cpu'] * workers)
+    finally:
+        for var, value in previous.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+def iter_embeddings(statement_blocks: Iterable[list[str]], model_name: str, store_path: str | None = None,
+                    workers: int = 1, threads_per_worker: int = 1) -> Iterator[np.ndarray]:
+    """
+    Embeds blocks of problem statements, in order.
+
+    Vectors found in the embedding store (when a `store_path` is given) are
+    reused, and the model is only loaded if a statement is missing. With more
+    than one worker, the missing statements of each block are sharded across a
+    pool of CPU processes. Blocks are consumed lazily, so they can come
+    straight from a chunked reader.
+
+    Args:
+        statement_blocks (Iterable[list[str]]): The statements, one list per block.
+        workers (int): Number of encoding processes; 1 encodes in this process.
+        threads_per_worker (int): Intra-op threads of each worker process.
 
-def create_embeddings(train_df: pd.DataFrame, output_dir: str, model_name: str):
-    """Generates and saves sentence embeddings for the 'problem_statement' column."""
+    Yields:
+        np.ndarray: One (block, dim) array per non-empty block.
+    """
+    model = None
+    pool = None
+    store = EmbeddingStore(store_path, model_name) if store_path is not None else None
+
+    def encode(texts: list[str]) -> np.ndarray:
+        nonlocal model, pool
+        if model is None:
+            logger.info(f"Initializing embedding model '{model_name}'...")
+            model = SentenceTransformer(model_name)
+            if workers > 1:
+                pool = _start_encoding_pool(model, workers, threads_per_worker)
+        logger.info(f"Generating embeddings for {len(texts)} problem statements...")
+        if pool is not None:
+            return model.encode_multi_process(texts, pool)
+        return model.encode(texts, show_progress_bar=True)
+
+    started = time.perf_counter()
+    done = 0
+    try:
+        for block in statement_blocks:
+            if not block:
+                continue
+            vectors = store.encode(block, encode) if store is not None else encode(block)
+            done += len(block)
+            rate = done / max(time.perf_counter() - started, 1e-9)
+            logger.info(f"Embedded {done} statements so far ({rate:.0f} rows/sec).")
+            yield vectors
+    finally:
+        if pool is not None:
+            SentenceTransformer.stop_multi_process_pool(pool)
+
+def _blocks(statements: list[str], block_rows: int) -> Iterator[list[str]]:
+    for start in range(0, len(statements), block_rows):
+        yield statements[start:start + block_rows]
+
+def embed_statements(statements: list[str], model_name: str, store_path: str | None = None, workers: int = 1,
+                     threads_per_worker: int = 1, block_rows: int = 100_000) -> np.ndarray | None:
+    """
+    Embeds problem statements into a single array (see `iter_embeddings`).
+
+    Returns:
+        np.ndarray | None: An (N, dim) array, or None if the model could not be loaded.
+    """
+    try:
+        blocks = list(iter_embeddings(_blocks(statements, block_rows), model_name, store_path, workers, threads_per_worker))
+        return np.concatenate(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+    except Exception as e:
+        logger.error(f"Failed to generate embeddings: {e}")
+        return None
+
+def write_embeddings(statement_blocks: Iterable[list[str]], output_path: str, model_name: str, store_path: str | None = None,
+                     dtype: str = 'float32', recall_k: int = 10, workers: int = 1, threads_per_worker: int = 1) -> str | None:
+    """
+    Embeds blocks of statements and writes them to a memory-mappable embedding
+    file (see src/core/embedding_file.py), in order.
+
+    Each block is appended to the file as soon as it is encoded, so neither the
+    statements nor the full matrix are ever held in memory at once.
+
+    Args:
+        dtype (str): Storage dtype, 'float32', 'float16' or 'int8'. For the
+            quantized dtypes the loss in top-`recall_k` neighbour recall is
+            measured on the first block and recorded in the file header.
+        workers (int): Number of encoding processes; 1 encodes in this process.
+        threads_per_worker (int): Intra-op threads of each worker process.
+
+    Returns:
+        str | None: The path of the saved embeddings, or None on failure.
+    """
+    writer = None
+    metadata = {}
+    started = time.perf_counter()
+    try:
+        for vectors in iter_embeddings(statement_blocks, model_name, store_path, workers, threads_per_worker):
+            if writer is None:
+                writer = EmbeddingFileWriter(output_path, model_name, dim=vectors.shape[1], dtype=dtype)
+                if dtype != 'float32':
+                    recall = measure_recall(vectors, dequantize(*quantize(vectors, dtype)), k=recall_k)
+                    metadata[f'recall_at_{recall_k}'] = round(recall, 4)
+                    logger.info(f"{dtype} quantization keeps {recall:.2%} of the top-{recall_k} cosine neighbours.")
+            writer.append(vectors)
+        if writer is None:
+            logger.warning("No problem statements to embed. Skipping embedding creation.")
+            return None
+        writer.finalize(metadata)
+    except Exception as e:
+        if writer is not None:
+            writer.abort()
+        logger.error(f"Failed to create embeddings at {output_path}: {e}")
+        return None
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Embeddings of {writer.rows} statements saved to {output_path} ({writer.rows / max(elapsed, 1e-9):.0f} rows/sec).")
+    return output_path
+
+def create_embeddings(train_df: pd.DataFrame, output_path: str, model_name: str, store_path: str | None = None,
+                      dtype: str = 'float32', recall_k: int = 10, workers: int = 1, threads_per_worker: int = 1,
+                      block_rows: int = 100_000) -> str | None:
+    """
+    Generates sentence embeddings for the 'problem_statement' column and writes
+    them to an embedding file in blocks of `block_rows` (see `write_embeddings`).
+    With a `store_path`, only statements not already in the embedding store are encoded.
+
+    Returns:
+        str | None: The path of the saved embeddings, or None on failure.
+    """
     if train_df.empty:
         logger.warning("Training DataFrame is empty. Skipping embedding creation.")
-        return
-    
+        return None
+    return write_embeddings(
+        _blocks(train_df['problem_statement'].tolist(), block_rows), output_path, model_name, store_path,
+        dtype, recall_k, workers, threads_per_worker
+    )
+
+def store_embeddings(statement_blocks: Iterable[list[str]], model_name: str, store_path: str, workers: int = 1,
+                     threads_per_worker: int = 1) -> int | None:
+    """
+    Fills the embedding store with blocks of statements without keeping the vectors.
+
+    Returns:
+        int | None: The number of statements embedded, or None on failure.
+    """
+    count = 0
     try:
-        logger.info(f"Initializing embedding model '{model_name}'...")
-        model = SentenceTransformer(model_name)
+        for vectors in iter_embeddings(statement_blocks, model_name, store_path, workers, threads_per_worker):
+            count += len(vectors)
     except Exception as e:
-        logger.error(f"Failed to load SentenceTransformer model: {e}")
-        return
+        logger.error(f"Failed to generate embeddings: {e}")
+        return None
+    logger.info(f"Precomputed embeddings for {count} problem statements in {store_path}.")
+    return count
 
-    logger.info("Generating embeddings for problem statements...")
-    problem_statements = train_df['problem_statement'].tolist()
-    embeddings = model.encode(problem_statements, show_progress_bar=True)
-    
-    output_path = os.path.join(output_dir, 'problem_embeddings.pkl')
-    
-    try:
-        with open(output_path, 'wb') as f:
-            pickle.dump(embeddings, f)
-        logger.info(f"Embeddings saved successfully to {output_path}")
-    except IOError as e:
-        logger.error(f"Failed to save embeddings to disk: {e}")
\ No newline at end of file
+def precompute_embeddings(df: pd.DataFrame, model_name: str, store_path: str, workers: int = 1, threads_per_worker: int = 1):
+    """Fills the embedding store with the statements of `df` (e.g. the test set), so inference can skip encoding them."""
+    if df.empty:
+        return
+    store_embeddings([df['problem_statement'].tolist()], model_name, store_path, workers, threads_per_worker)
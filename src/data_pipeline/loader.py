@@ -1,8 +1,12 @@
 # src/data_pipeline/loader.py
 
+import os
+from typing import Iterator
 import pandas as pd
+from pydantic import BaseModel
 from src.logger import logger
-from .schemas import TrainDataRow, TestDataRow, ValidationError
+from .schemas import TrainDataRow, TestDataRow
+from .validation import validate_frame
 
 def load_data(train_path: str, test_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
@@ -23,24 +27,35 @@ def load_data(train_path: str, test_path: str) -> tuple[pd.DataFrame, pd.DataFra
         logger.error(f"Error parsing CSV file: {e}. Check file for corruption.")
         return pd.DataFrame(), pd.DataFrame()
 
-    # Validate training data
-    valid_train_rows = []
-    for index, row in raw_train_df.iterrows():
-        try:
-            valid_train_rows.append(TrainDataRow(**row.to_dict()).model_dump())
-        except ValidationError as e:
-            logger.warning(f"Skipping invalid row {index+2} in train.csv: {e}")
-    
-    # Validate testing data
-    valid_test_rows = []
-    for index, row in raw_test_df.iterrows():
-        try:
-            valid_test_rows.append(TestDataRow(**row.to_dict()).model_dump())
-        except ValidationError as e:
-            logger.warning(f"Skipping invalid row {index+2} in test.csv: {e}")
+    valid_train_rows = _validate_rows(raw_train_df, TrainDataRow, 'train.csv')
+    valid_test_rows = _validate_rows(raw_test_df, TestDataRow, 'test.csv')
 
     train_df = pd.DataFrame(valid_train_rows)
     test_df = pd.DataFrame(valid_test_rows)
     
     logger.info(f"Data loading complete. Valid train rows: {len(train_df)}, Valid test rows: {len(test_df)}")
-    return train_df, test_df
\ No newline at end of file
+    return train_df, test_df
+
+def iter_valid_chunks(path: str, schema: type[BaseModel], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """
+    Reads a CSV file `chunk_rows` rows at a time and yields the valid rows of
+    each chunk, so memory use does not grow with the size of the file.
+    Rows that fail validation are logged and skipped, as in `load_data`.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        pd.errors.ParserError: If a chunk cannot be parsed.
+    """
+    file_name = os.path.basename(path)
+    # Every column is read as text: inferring types per chunk could give a chunk
+    # of numeric-looking answers an integer dtype that the string fields reject
+    for raw_chunk in pd.read_csv(path, chunksize=chunk_rows, dtype=str):
+        valid_rows = _validate_rows(raw_chunk, schema, file_name)
+        yield pd.DataFrame(valid_rows, columns=list(schema.model_fields))
+
+def _validate_rows(raw_df: pd.DataFrame, schema: type[BaseModel], file_name: str) -> list[dict]:
+    """Validates the rows against `schema` in bulk, logging and skipping the invalid ones."""
+    valid_rows, errors = validate_frame(raw_df, schema)
+    for position, e in errors:
+        logger.warning(f"Skipping invalid row {raw_df.index[position]+2} in {file_name}: {e}")
+    return valid_rows
@@ -3,7 +3,10 @@
 import pandas as pd
 import json
 import os
+from typing import Iterator
+from pydantic import BaseModel
 from src.logger import logger
+from .loader import iter_valid_chunks
 
 def process_data(train_df: pd.DataFrame, test_df: pd.DataFrame, output_dir: str):
     """Processes DataFrames and saves them as structured JSON files."""
@@ -28,4 +31,59 @@ def process_data(train_df: pd.DataFrame, test_df: pd.DataFrame, output_dir: str)
             json.dump(test_records, f, ensure_ascii=False, indent=4)
         logger.info(f"Saved processed testing data to {test_output_path}")
     except IOError as e:
-        logger.error(f"Failed to write JSON files to disk: {e}")
\ No newline at end of file
+        logger.error(f"Failed to write JSON files to disk: {e}")
+class JsonArrayWriter:
+    """
+    Writes records to a JSON array file incrementally, in the same layout as
+    `process_data` (`indent=4`), so the readers of the processed files are
+    unaffected. The file is written under a temporary name and only moved into
+    place by `close`, so an interrupted build never leaves a truncated array.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write('[')
+
+    def write(self, records: list[dict]):
+        """Appends records to the array."""
+        for record in records:
+            encoded = json.dumps(record, ensure_ascii=False, indent=4).replace('\n', '\n    ')
+            self._file.write(f"{',' if self.count else ''}\n    {encoded}")
+            self.count += 1
+
+    def close(self):
+        """Closes the array and moves the file into place."""
+        self._file.write('\n]' if self.count else ']')
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Discards a partially written file."""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+def stream_processed_rows(csv_path: str, schema: type[BaseModel], json_path: str, chunk_rows: int) -> Iterator[list[str]]:
+    """
+    Validates a raw CSV file chunk by chunk, appends the valid rows to a
+    processed JSON file and yields the problem statements of each chunk, so
+    embeddings can be computed while the file is being read.
+
+    The JSON file is only moved into place once the whole CSV has been read;
+    if the caller stops early or an error is raised, it is discarded.
+    """
+    writer = JsonArrayWriter(json_path)
+    completed = False
+    try:
+        for chunk in iter_valid_chunks(csv_path, schema, chunk_rows):
+            writer.write(chunk.to_dict(orient='records'))
+            yield chunk['problem_statement'].tolist()
+        completed = True
+    finally:
+        if completed:
+            writer.close()
+            logger.info(f"Saved {writer.count} processed rows to {json_path}")
+        else:
+            writer.abort()
@@ -0,0 +1,132 @@
+# src/data_pipeline/validation.py
+
+import re
+import types
+import typing
+import annotated_types
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+from .schemas import ValidationError
+
+# Integer strings pydantic is known to accept; anything else goes through the model
+_INT_STRING_PATTERN = re.compile(r'^(0|[1-9]\d*)$')
+
+def validate_frame(df: pd.DataFrame, schema: type[BaseModel], rows: list[dict] | None = None) -> tuple[list[dict], list[tuple[int, ValidationError]]]:
+    """
+    Validates a whole DataFrame against a flat pydantic schema of `str`,
+    `Optional[str]` and `int` fields.
+
+    Column presence, types, missing values and numeric bounds (`gt`, `ge`,
+    `lt`, `le`) are checked on whole columns at once. Only the rows that fail
+    these checks are validated one by one with the pydantic model, so they get
+    the model's error messages while clean rows skip it. A missing value is
+    never accepted in bulk, even in an Optional field: the model accepts None
+    but rejects NaN, so those rows are left for it to decide.
+
+    Args:
+        df (pd.DataFrame): The rows to validate.
+        schema (type[BaseModel]): The pydantic model of one row.
+        rows (list[dict] | None): The original records behind `df`, if any. The
+            per-row fallback validates these instead of the DataFrame rows, so a
+            missing key is reported as missing rather than as NaN.
+
+    Returns:
+        tuple[list[dict], list[tuple[int, ValidationError]]]: The valid rows as
+            `model_dump()` dicts in input order, and the position and error of
+            each invalid row.
+    """
+    num_rows = len(df)
+    valid = np.ones(num_rows, dtype=bool)
+    columns = {}
+    for name, info in schema.model_fields.items():
+        checked = _check_field(df, name, info)
+        if checked is None:
+            # A field this fast path does not understand: validate every row with the model
+            valid[:] = False
+            break
+        ok, values = checked
+        valid &= ok
+        columns[name] = values
+
+    records = [None] * num_rows
+    if valid.any():
+        good = pd.DataFrame({name: values[valid] for name, values in columns.items()})
+        for position, record in zip(np.flatnonzero(valid), good.to_dict(orient='records')):
+            records[position] = record
+
+    errors = []
+    for position in np.flatnonzero(~valid):
+        record = rows[position] if rows is not None else df.iloc[position].to_dict()
+        try:
+            records[position] = schema(**record).model_dump()
+        except ValidationError as e:
+            errors.append((int(position), e))
+
+    return [record for record in records if record is not None], errors
+
+def _check_field(df: pd.DataFrame, name: str, info) -> tuple[np.ndarray, pd.Series] | None:
+    """
+    Checks one field on the whole column.
+
+    Returns:
+        tuple[np.ndarray, pd.Series] | None: A mask of the rows that pass and the
+            values to store for them, or None if the field's type is not supported.
+    """
+    annotation = info.annotation
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None
+        annotation = args[0]
+
+    num_rows = len(df)
+    if name not in df.columns:
+        if info.is_required():
+            return np.zeros(num_rows, dtype=bool), pd.Series([None] * num_rows, dtype=object)
+        return np.ones(num_rows, dtype=bool), pd.Series([info.get_default(call_default_factory=True)] * num_rows, dtype=object)
+
+    column = df[name].reset_index(drop=True)
+    missing = column.isna().to_numpy()
+
+    if annotation is str and not info.metadata:
+        if pd.api.types.is_string_dtype(column.dtype) and not pd.api.types.is_object_dtype(column.dtype):
+            is_text = ~missing
+        elif pd.api.types.is_object_dtype(column.dtype):
+            is_text = column.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        else:
+            is_text = np.zeros(num_rows, dtype=bool)
+        return is_text, column.astype(object)
+
+    if annotation is int:
+        bounds = []
+        for constraint in info.metadata:
+            if not isinstance(constraint, (annotated_types.Gt, annotated_types.Ge, annotated_types.Lt, annotated_types.Le)):
+                return None
+            bounds.append(constraint)
+
+        if pd.api.types.is_integer_dtype(column.dtype) or pd.api.types.is_float_dtype(column.dtype):
+            numbers = column.astype(float).to_numpy()
+            is_int = ~missing & (np.floor(numbers) == numbers)
+        elif pd.api.types.is_string_dtype(column.dtype) or pd.api.types.is_object_dtype(column.dtype):
+            is_int = column.map(lambda value: isinstance(value, str) and bool(_INT_STRING_PATTERN.match(value))).to_numpy(dtype=bool)
+            numbers = pd.to_numeric(column.where(is_int), errors='coerce').to_numpy(dtype=float)
+        else:
+            return None
+
+        ok = is_int.copy()
+        with np.errstate(invalid='ignore'):
+            for constraint in bounds:
+                if isinstance(constraint, annotated_types.Gt):
+                    ok &= numbers > constraint.gt
+                elif isinstance(constraint, annotated_types.Ge):
+                    ok &= numbers >= constraint.ge
+                elif isinstance(constraint, annotated_types.Lt):
+                    ok &= numbers < constraint.lt
+                else:
+                    ok &= numbers <= constraint.le
+        values = pd.Series([None] * num_rows, dtype=object)
+        values[ok] = numbers[ok].astype(np.int64).tolist()
+        return ok, values
+
+    return None
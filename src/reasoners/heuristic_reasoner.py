@@ -1,8 +1,13 @@
 # src/reasoners/heuristic_reasoner.py
 from src.logger import logger
+from src import config as main_config
 from .llm.llm_factory import LLMFactory
 from .llm.llm_router import LLMRouter
-from .llm.response_parser import parse_llm_response
+from .llm.response_parser import (
+    parse_llm_response, parse_packed_response, parse_structured_response, parse_option_digit,
+    extract_reasoning, ANSWER_JSON_SCHEMA, LLM_CONFIDENCE_SCORE
+)
+from .llm.stream_parser import IncrementalAnswerParser
 import pandas as pd
 
 class HeuristicReasoner:
@@ -22,10 +27,111 @@ class HeuristicReasoner:
             logger.error("Heuristic Reasoner is not properly initialized. Cannot solve.")
             return None
         
-        prompt = self.llm_router.get_prompt(topic=topic, row=row)
+        structured = main_config.STRUCTURED_OUTPUT_ENABLED
+        prompt = self.llm_router.get_prompt(topic=topic, row=row, structured=structured)
         if not prompt:
             return None
             
-        raw_response = self.llm_factory.generate_response(prompt)
-        
-        return parse_llm_response(raw_response)
\ No newline at end of file
+        if structured:
+            # No stop sequence: the JSON object has no closing tag to stop at
+            raw_response = self.llm_factory.generate_response(
+                prompt, max_tokens=main_config.LLM_MAX_TOKENS, topic=topic, response_format=ANSWER_JSON_SCHEMA
+            )
+        elif main_config.LLM_STREAMING_ENABLED:
+            raw_response = self._generate_streamed(prompt, topic)
+        else:
+            raw_response = self.llm_factory.generate_response(
+                prompt, stop=main_config.LLM_STOP_SEQUENCES, max_tokens=main_config.LLM_MAX_TOKENS, topic=topic
+            )
+
+        # A failed call returns its error message, whose digits must not be read as an option
+        if raw_response.startswith("Error:"):
+            logger.error(f"LLM call failed: {raw_response}")
+            return None
+
+        result = parse_structured_response(raw_response) if structured else parse_llm_response(raw_response)
+
+        if result is None and main_config.ANSWER_FOLLOW_UP_ENABLED:
+            result = self._ask_for_option(row, topic, raw_response)
+        return result
+
+    def _ask_for_option(self, row: pd.Series, topic: str, raw_response: str) -> dict | None:
+        """
+        Recovers the answer of a reply that could not be parsed with a short
+        follow-up that asks only for the option number its reasoning concluded on.
+        """
+        if not raw_response or raw_response.startswith("Error:"):
+            return None
+        reasoning = extract_reasoning(raw_response)
+        prompt = self.llm_router.get_follow_up_prompt(row, reasoning[-main_config.ANSWER_FOLLOW_UP_MAX_REASONING_CHARS:])
+        if not prompt:
+            return None
+
+        logger.info("Could not parse an answer from the LLM response. Asking for the option number only.")
+        follow_up = self.llm_factory.generate_response(
+            prompt, max_tokens=main_config.ANSWER_FOLLOW_UP_MAX_TOKENS, topic=topic
+        )
+        answer = parse_option_digit(follow_up) if not follow_up.startswith("Error:") else None
+        if answer is None:
+            logger.error(f"Follow-up did not return a valid option number: '{follow_up}'")
+            return None
+        logger.info(f"Follow-up returned option {answer}.")
+        return {'answer': answer, 'solution': reasoning, 'confidence': LLM_CONFIDENCE_SCORE}
+
+    def solve_packed(self, rows: list[pd.Series], topic: str) -> list[dict | None]:
+        """
+        Solves several same-topic problems with a single LLM request. Any problem
+        whose answer cannot be parsed from the packed reply is re-submitted on its own.
+
+        Args:
+            rows (list[pd.Series]): The data rows to solve.
+            topic (str): The shared topic of the rows.
+
+        Returns:
+            list[dict | None]: One result per row, in the order of `rows`.
+        """
+        if len(rows) == 1:
+            return [self.solve(rows[0], topic)]
+        if not self.llm_factory or not self.llm_router:
+            logger.error("Heuristic Reasoner is not properly initialized. Cannot solve.")
+            return [None] * len(rows)
+
+        prompt = self.llm_router.get_packed_prompt(topic=topic, rows=rows)
+        parsed = {}
+        if prompt:
+            # No stop sequence here: the first </answer> would cut off the other problems
+            raw_response = self.llm_factory.generate_response(
+                prompt, max_tokens=main_config.PACKED_PROMPT_MAX_TOKENS, topic=topic
+            )
+            parsed = parse_packed_response(raw_response, list(range(1, len(rows) + 1)))
+
+        missing = [problem_id for problem_id in range(1, len(rows) + 1) if problem_id not in parsed]
+        if missing:
+            logger.info(f"Re-asking packed problems {missing} on their own.")
+        # Problems without a parsed answer are re-asked unpacked rather than reported as failures
+        return [
+            parsed[problem_id] if problem_id in parsed else self.solve(row, topic)
+            for problem_id, row in enumerate(rows, start=1)
+        ]
+
+    def _generate_streamed(self, prompt: str, topic: str | None = None) -> str:
+        """
+        Streams the LLM response through an incremental parser and stops the
+        generation as soon as a valid option number has been closed.
+        """
+        parser = IncrementalAnswerParser()
+        stream = self.llm_factory.generate_response_stream(
+            prompt, stop=main_config.LLM_STOP_SEQUENCES, max_tokens=main_config.LLM_MAX_TOKENS, topic=topic
+        )
+        try:
+            for chunk in stream:
+                if parser.feed(chunk):
+                    logger.info(f"Answer {parser.answer} received. Stopping generation early.")
+                    break
+        except Exception as e:
+            # The partial text is truncated, so it is not passed on as a reply
+            logger.error(f"LLM stream failed after {len(parser.text)} characters: {e}")
+            return f"Error: {e}"
+        finally:
+            stream.close()
+        return parser.text
@@ -0,0 +1,98 @@
+# src/reasoners/llm/backend_dispatcher.py
+import threading
+import time
+from src.logger import logger
+
+class BackendStats:
+    """Running statistics for one LLM backend."""
+    def __init__(self, name: str):
+        self.name = name
+        self.ewma_latency = None
+        self.error_rate = 0.0
+        self.in_flight = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+
+    def snapshot(self) -> dict:
+        return {
+            'requests': self.requests,
+            'successes': self.successes,
+            'failures': self.failures,
+            'in_flight': self.in_flight,
+            'ewma_latency': self.ewma_latency,
+            'error_rate': self.error_rate
+        }
+
+class BackendDispatcher:
+    """
+    Routes each LLM request to the backend with the lowest expected completion time.
+
+    The expected time of a backend is its EWMA latency multiplied by the number of
+    requests that would be in flight on it, divided by its EWMA success rate. A
+    backend without latency samples yet is assumed to be as fast as the fastest
+    known one, so every backend gets tried early in a run.
+    """
+    def __init__(self, backends: list[str], alpha: float = 0.2, min_success_rate: float = 0.1):
+        self.alpha = alpha
+        # Keeps a failing backend reachable so its error rate can recover
+        self.min_success_rate = min_success_rate
+        self.stats = {name: BackendStats(name) for name in backends}
+        self._lock = threading.Lock()
+
+    def choose(self, candidates: list[str]) -> str:
+        """Returns the candidate backend expected to finish a new request soonest."""
+        with self._lock:
+            known = [self.stats[name].ewma_latency for name in candidates if self.stats[name].ewma_latency is not None]
+            default_latency = min(known) if known else 0.0
+
+            def expected_time(name):
+                stats = self.stats[name]
+                latency = stats.ewma_latency if stats.ewma_latency is not None else default_latency
+                success_rate = max(1.0 - stats.error_rate, self.min_success_rate)
+                return (latency * (stats.in_flight + 1) / success_rate, stats.in_flight)
+
+            return min(candidates, key=expected_time)
+
+    def begin(self, backend: str) -> float:
+        """Marks a request as in flight on a backend and returns its start time."""
+        with self._lock:
+            stats = self.stats[backend]
+            stats.in_flight += 1
+            stats.requests += 1
+        return time.monotonic()
+
+    def end(self, backend: str, started: float, success: bool):
+        """Records the outcome of a request started with `begin`."""
+        latency = time.monotonic() - started
+        with self._lock:
+            stats = self.stats[backend]
+            stats.in_flight -= 1
+            stats.error_rate += self.alpha * ((0.0 if success else 1.0) - stats.error_rate)
+            if success:
+                stats.successes += 1
+                # Failures often return quickly and would make a broken backend look fast
+                if stats.ewma_latency is None:
+                    stats.ewma_latency = latency
+                else:
+                    stats.ewma_latency += self.alpha * (latency - stats.ewma_latency)
+            else:
+                stats.failures += 1
+
+    def abandon(self, backend: str):
+        """Releases a request that was cancelled, without counting it as a success or failure."""
+        with self._lock:
+            self.stats[backend].in_flight -= 1
+
+    def summary(self) -> dict:
+        """Returns the counters of every backend."""
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    def log_summary(self):
+        for name, stats in self.summary().items():
+            latency = f"{stats['ewma_latency']:.2f}s" if stats['ewma_latency'] is not None else "n/a"
+            logger.info(
+                f"LLM backend '{name}': {stats['requests']} requests, {stats['failures']} failures, "
+                f"EWMA latency {latency}, error rate {stats['error_rate']:.1%}."
+            )
@@ -0,0 +1,158 @@
+# src/reasoners/llm/circuit_breaker.py
+import threading
+import time
+from typing import Callable
+from src.logger import logger
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because its backend's circuit is open."""
+    pass
+
+class CircuitBreaker:
+    """
+    Per-backend circuit breaker shared by every worker.
+
+    - closed: requests flow normally; `failure_threshold` consecutive failures open it.
+    - open: requests are refused immediately until `recovery_timeout` has passed
+      (or a health probe succeeds), so workers stop spending retries on a dead backend.
+    - half-open: up to `half_open_max_calls` trial requests are let through; a success
+      closes the circuit and a failure opens it again.
+
+    All methods only hold a lock for a few assignments and never wait, so they are
+    safe to call from worker threads and from asyncio code alike.
+    """
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_until = 0.0
+        self._trial_calls = 0
+        self._half_open_since = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def available(self) -> bool:
+        """Returns whether a request would currently be let through, without reserving it."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return time.monotonic() >= self._opened_until
+            return self._trial_calls < self.half_open_max_calls
+
+    def allow_request(self) -> bool:
+        """Reserves a request if the circuit lets it through; counts it as rejected otherwise."""
+        with self._lock:
+            now = time.monotonic()
+            if self._state == OPEN and now >= self._opened_until:
+                self._set_state(HALF_OPEN)
+            elif self._state == HALF_OPEN and now - self._half_open_since > self.recovery_timeout:
+                # A trial request that never reported back must not block the circuit forever
+                self._trial_calls = 0
+                self._half_open_since = now
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trial_calls < self.half_open_max_calls:
+                self._trial_calls += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._open(self.recovery_timeout)
+
+    def trip(self, open_for: float | None = None):
+        """Opens the circuit at once, e.g. when the server asks for a long pause."""
+        with self._lock:
+            self._open(max(self.recovery_timeout, open_for or 0.0))
+
+    def probe_succeeded(self):
+        """Lets trial traffic through straight away after a successful health probe."""
+        with self._lock:
+            if self._state == OPEN:
+                self._set_state(HALF_OPEN)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'state': self._state, 'times_opened': self.times_opened, 'rejected': self.rejected}
+
+    def _open(self, duration: float):
+        self._opened_until = max(self._opened_until, time.monotonic() + duration)
+        if self._state != OPEN:
+            self.times_opened += 1
+            self._set_state(OPEN)
+            logger.warning(f"Circuit for '{self.name}' opened for {duration:.0f}s.")
+
+    def _set_state(self, state: str):
+        self._state = state
+        self._trial_calls = 0
+        if state == CLOSED:
+            self._consecutive_failures = 0
+            logger.info(f"Circuit for '{self.name}' closed.")
+        elif state == HALF_OPEN:
+            self._half_open_since = time.monotonic()
+            logger.info(f"Circuit for '{self.name}' half-open. Sending trial requests.")
+
+class HealthProber:
+    """
+    Background thread that probes every backend at a fixed interval. A failed
+    probe opens the backend's circuit; a successful one lets trial requests
+    through to a backend whose circuit is open. A failure is only logged when
+    it opens the circuit, so a backend that stays down (e.g. no local Ollama in
+    an OpenRouter-only setup) is reported once rather than on every probe.
+    """
+    def __init__(self, checks: dict[str, Callable[[], bool]], breakers: dict[str, CircuitBreaker], interval: float):
+        self.checks = checks
+        self.breakers = breakers
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='llm-health-prober', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def probe_once(self):
+        for name, check in self.checks.items():
+            reason = None
+            try:
+                healthy = check()
+            except Exception as e:
+                healthy, reason = False, e
+            if healthy:
+                self.breakers[name].probe_succeeded()
+                continue
+            if self.breakers[name].state != OPEN:
+                logger.warning(f"Health probe for '{name}' failed{f': {reason}' if reason else ''}.")
+            # Keeps the circuit open for as long as the probes keep failing
+            self.breakers[name].trip()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.probe_once()
+            self._stop.wait(self.interval)
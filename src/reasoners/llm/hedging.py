@@ -0,0 +1,73 @@
+# src/reasoners/llm/hedging.py
+import threading
+from collections import deque
+import numpy as np
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of recent latencies and reports a percentile of them,
+    which is used as the delay before a request is hedged.
+    """
+    def __init__(self, window: int, percentile: float, min_samples: int):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def threshold(self) -> float | None:
+        """Returns the configured percentile, or None until enough samples were seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            return float(np.percentile(self._samples, self.percentile))
+
+class HedgeBudget:
+    """
+    Caps hedged requests at a fraction of all requests, so hedging can never
+    add more than `ratio` extra traffic, however slow the backends become.
+    """
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_spend(self) -> bool:
+        """Returns True and counts a hedge if the budget allows one more."""
+        with self._lock:
+            if self.hedges + 1 > self.ratio * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        """Counts a hedge that answered before the original request."""
+        with self._lock:
+            self.hedge_wins += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {'requests': self.requests, 'hedges': self.hedges, 'hedge_wins': self.hedge_wins}
+
+class HedgeLeg:
+    """One of the racing copies of a hedged request."""
+    def __init__(self, backend: str, model: str, stream, started: float | None, first_chunk: str):
+        self.backend = backend
+        self.model = model
+        # Still open while the winner of a streamed race is being relayed
+        self.stream = stream
+        self.started = started
+        self.chunks = [first_chunk]
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
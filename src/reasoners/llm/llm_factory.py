@@ -1,8 +1,21 @@
 # src/reasoners/llm/llm_factory.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterator
 from dotenv import load_dotenv
 from src.logger import logger
+from src import config as main_config
 from .openrouter_client import OpenRouterClient, RateLimitError
 from .ollama_client import OllamaClient
+from .response_cache import LLMResponseCache
+from .rate_limiter import TokenBucket, AdaptiveConcurrencyLimiter, backoff_delay
+from .backend_dispatcher import BackendDispatcher
+from .hedging import LatencyTracker, HedgeBudget, HedgeLeg
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, HealthProber
+from .telemetry import LLMTelemetry, LLMCallRecord
+from .model_router import ModelRouter
+from .stream_parser import has_closed_answer
 
 class LLMFactory:
     def __init__(self):
@@ -10,6 +23,12 @@ class LLMFactory:
         self.primary_client_type = 'openrouter'
         self.openrouter_client = None
         self.ollama_client = None
+        self.response_cache = None
+        self.dispatcher = None
+        self.hedge_budget = None
+        self.health_prober = None
+        self.telemetry = None
+        self.model_router = None
 
         try:
             self.openrouter_client = OpenRouterClient()
@@ -17,36 +36,577 @@ class LLMFactory:
         except ValueError as e:
             logger.warning(f"LLMFactory: {e}. Falling back to Ollama.")
             self.primary_client_type = 'ollama'
-            self.ollama_client = OllamaClient()
+        # Constructing the Ollama client does not contact the server, so it is always created
+        self.ollama_client = OllamaClient(keep_alive=main_config.OLLAMA_KEEP_ALIVE)
+
+        # One breaker per backend, shared by every worker using this factory
+        self.breakers = {
+            name: CircuitBreaker(
+                name,
+                failure_threshold=main_config.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=main_config.CIRCUIT_BREAKER_RECOVERY_SECONDS,
+                half_open_max_calls=main_config.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+            )
+            for name in ('openrouter', 'ollama')
+        }
+        if main_config.LLM_HEALTH_PROBES_ENABLED:
+            checks = {'ollama': self.ollama_client.health_check}
+            if self.openrouter_client is not None:
+                checks['openrouter'] = self.openrouter_client.health_check
+            self.health_prober = HealthProber(checks, self.breakers, main_config.LLM_HEALTH_PROBE_INTERVAL_SECONDS)
+            self.health_prober.start()
+
+        self.rate_limiter = TokenBucket(
+            rate=main_config.OPENROUTER_REQUESTS_PER_SECOND,
+            capacity=main_config.OPENROUTER_BURST
+        )
+        self.concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial=main_config.AIMD_INITIAL_CONCURRENCY,
+            minimum=main_config.AIMD_MIN_CONCURRENCY,
+            maximum=main_config.AIMD_MAX_CONCURRENCY,
+            latency_target=main_config.AIMD_LATENCY_TARGET_SECONDS
+        )
+
+        if main_config.LLM_LOAD_BALANCING_ENABLED and self.openrouter_client is not None:
+            if self.ollama_client.client is not None:
+                self.dispatcher = BackendDispatcher(['openrouter', 'ollama'], alpha=main_config.LLM_LATENCY_EWMA_ALPHA)
+                logger.info("LLMFactory: Load balancing requests across OpenRouter and Ollama.")
+            else:
+                logger.warning("LLMFactory: Load balancing disabled because the Ollama client could not be created.")
+
+        if main_config.LLM_HEDGING_ENABLED and self.openrouter_client is not None:
+            if self.ollama_client.client is not None:
+                tracker_args = dict(
+                    window=main_config.LLM_HEDGE_WINDOW,
+                    percentile=main_config.LLM_HEDGE_PERCENTILE,
+                    min_samples=main_config.LLM_HEDGE_MIN_SAMPLES
+                )
+                self.hedge_latency = LatencyTracker(**tracker_args)
+                self.hedge_first_chunk_latency = LatencyTracker(**tracker_args)
+                self.hedge_budget = HedgeBudget(main_config.LLM_HEDGE_BUDGET_RATIO)
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=main_config.LLM_HEDGE_MAX_WORKERS, thread_name_prefix='llm-hedge'
+                )
+                logger.info("LLMFactory: Hedging slow requests to the secondary backend.")
+            else:
+                logger.warning("LLMFactory: Hedging disabled because the Ollama client could not be created.")
+
+        if main_config.LLM_CACHE_ENABLED:
+            try:
+                self.response_cache = LLMResponseCache(
+                    db_path=main_config.LLM_CACHE_PATH,
+                    max_entries=main_config.LLM_CACHE_MAX_ENTRIES,
+                    max_age_seconds=main_config.LLM_CACHE_MAX_AGE_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"LLMFactory: Could not open the response cache, continuing without it: {e}")
+
+        if main_config.LLM_TELEMETRY_ENABLED:
+            self.telemetry = LLMTelemetry(
+                cost_per_million_tokens=main_config.LLM_COST_PER_MILLION_TOKENS,
+                latency_buckets=main_config.LLM_LATENCY_HISTOGRAM_BUCKETS,
+                token_buckets=main_config.LLM_TOKEN_HISTOGRAM_BUCKETS
+            )
+
+        if main_config.MODEL_ROUTING_ENABLED:
+            self.model_router = ModelRouter(
+                catalogue=main_config.LLM_MODEL_CATALOGUE,
+                stats_path=main_config.MODEL_ROUTING_STATS_PATH,
+                min_samples=main_config.MODEL_ROUTING_MIN_SAMPLES,
+                accuracy_tolerance=main_config.MODEL_ROUTING_ACCURACY_TOLERANCE
+            )
+            logger.info("LLMFactory: Routing requests to models per topic.")
 
     def get_client(self):
         """Returns the current active client."""
-        if self.primary_client_type == 'openrouter':
+        if self._active_client_type() == 'openrouter':
             return self.openrouter_client
-        else:
-            if not self.ollama_client:
-                self.ollama_client = OllamaClient()
-            return self.ollama_client
+        return self._get_ollama_client()
 
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                          topic: str | None = None, response_format: dict | None = None) -> str:
         """
-        Generates a response using the primary client, with a fallback to Ollama
-        in case of a rate limit error.
+        Generates a response using the primary client, or the backend with the lowest
+        expected completion time when load balancing is enabled. OpenRouter calls are
+        rate limited and retried with backoff; if they fail, Ollama serves the call.
+        A backend whose circuit breaker is open is skipped without being contacted.
+        With model routing enabled, the model of the chosen backend depends on `topic`.
+
+        Args:
+            prompt (str): The prompt to send.
+            stop (list[str] | None): Sequences at which the model stops generating.
+            max_tokens (int | None): Upper bound on the number of generated tokens.
+            topic (str | None): Topic of the problem, used for model routing and to group
+                the call's telemetry.
+            response_format (dict | None): JSON schema the response must conform to.
+        """
+        record = LLMCallRecord(topic=topic, streamed=False)
+        response = self._generate(prompt, self._client_options(stop, max_tokens, response_format), record)
+        if self.telemetry is not None:
+            self.telemetry.finish(record, prompt, response)
+        return response
+
+    def generate_response_stream(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                                 topic: str | None = None, response_format: dict | None = None) -> Iterator[str]:
+        """
+        Streams a response chunk by chunk, with the same rate limiting and fallback
+        as `generate_response`. The caller may close the generator as soon as it has
+        what it needs; the underlying request is then closed as well.
+
+        The fallback only happens before any text has been yielded, so the caller
+        never receives output from two different backends.
         """
+        record = LLMCallRecord(topic=topic, streamed=True)
+        stream = self._stream(prompt, self._client_options(stop, max_tokens, response_format), record)
+        chunks = []
+        try:
+            for chunk in stream:
+                if chunk:
+                    record.mark_first_token()
+                # The last chunk of a finished stream carries the backend's token usage
+                if getattr(chunk, 'usage', None):
+                    record.usage = chunk.usage
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            # Closing the inner stream first lets it cache the text and report its outcome
+            stream.close()
+            if self.telemetry is not None:
+                self.telemetry.finish(record, prompt, "".join(chunks))
+
+    def _generate(self, prompt: str, options: dict, record: LLMCallRecord) -> str:
+        client_type = self._choose_client_type()
         # --- NEW: Log which client is being used for the call ---
-        logger.info(f"Attempting to generate response using '{self.primary_client_type}' client.")
+        logger.info(f"Attempting to generate response using '{client_type}' client.")
+        params = options
 
-        if self.primary_client_type == 'openrouter':
+        if self._hedging_available():
+            return self._generate_hedged(client_type, prompt, params, options, record)
+
+        if client_type == 'openrouter':
+            model = self._model_for('openrouter', record.topic)
+            key, cached = self._cache_lookup('openrouter', model, prompt, params, record)
+            if cached is not None:
+                return cached
+            record.backend, record.model = 'openrouter', model
+            started = self._begin('openrouter')
             try:
-                return self.openrouter_client.generate_response(prompt)
-            except RateLimitError:
-                logger.warning("OpenRouter rate limit hit. Switching to Ollama for this session.")
-                self.primary_client_type = 'ollama'
+                response = self._call_openrouter(
+                    lambda: self.openrouter_client.generate_response(prompt, model=model, **options),
+                    record
+                )
+                self._end('openrouter', started, success=True)
+                self._cache_store(key, 'openrouter', model, response)
+                return response
             except Exception as e:
-                logger.error(f"OpenRouter failed: {e}. Switching to Ollama for this session.")
-                self.primary_client_type = 'ollama'
+                self._end('openrouter', started, success=False)
+                record.fallback = True
+                logger.warning(f"OpenRouter request failed ({e}). Serving it from Ollama.")
+
+        ollama_client = self._get_ollama_client()
+        model = self._model_for('ollama', record.topic)
+        key, cached = self._cache_lookup('ollama', model, prompt, params, record)
+        if cached is not None:
+            return cached
+        record.backend, record.model = 'ollama', model
+        if not self.breakers['ollama'].allow_request():
+            return "Error: Ollama circuit is open."
+        started = self._begin('ollama')
+        response = ollama_client.generate_response(prompt, model=model, **options)
+        self._end('ollama', started, success=not response.startswith("Error:"))
+        self._cache_store(key, 'ollama', model, response)
+        return response
+
+    def _stream(self, prompt: str, options: dict, record: LLMCallRecord) -> Iterator[str]:
+        client_type = self._choose_client_type()
+        logger.info(f"Attempting to stream response using '{client_type}' client.")
+        # Early-stopped text is keyed separately from full responses
+        params = {**options, 'stream': True}
+
+        if self._hedging_available():
+            yield from self._stream_hedged(client_type, prompt, params, options, record)
+            return
+
+        if client_type == 'openrouter':
+            model = self._model_for('openrouter', record.topic)
+            key, cached = self._cache_lookup('openrouter', model, prompt, params, record)
+            if cached is not None:
+                yield cached
+                return
+            record.backend, record.model = 'openrouter', model
+            started = self._begin('openrouter')
+            try:
+                stream, first_chunk = self._call_openrouter(
+                    lambda: self._open_stream(self.openrouter_client, prompt, options, model),
+                    record
+                )
+            except Exception as e:
+                self._end('openrouter', started, success=False)
+                record.fallback = True
+                logger.warning(f"OpenRouter stream failed to start ({e}). Serving it from Ollama.")
+            else:
+                yield from self._relay_stream(key, 'openrouter', model, stream, first_chunk, started)
+                return
+
+        ollama_client = self._get_ollama_client()
+        model = self._model_for('ollama', record.topic)
+        key, cached = self._cache_lookup('ollama', model, prompt, params, record)
+        if cached is not None:
+            yield cached
+            return
+        record.backend, record.model = 'ollama', model
+        if not self.breakers['ollama'].allow_request():
+            yield "Error: Ollama circuit is open."
+            return
+        started = self._begin('ollama')
+        stream, first_chunk = self._open_stream(ollama_client, prompt, options, model)
+        yield from self._relay_stream(key, 'ollama', model, stream, first_chunk, started)
+
+    def _active_client_type(self) -> str:
+        """Returns the primary client type unless its circuit is open."""
+        if self.primary_client_type == 'openrouter' and self.breakers['openrouter'].available():
+            return 'openrouter'
+        return 'ollama'
+
+    def _choose_client_type(self) -> str:
+        """Picks the backend for a new request, letting the dispatcher decide when both are usable."""
+        client_type = self._active_client_type()
+        if self.dispatcher is not None and client_type == 'openrouter' and self.breakers['ollama'].available():
+            client_type = self.dispatcher.choose(['openrouter', 'ollama'])
+        return client_type
+
+    def _begin(self, backend: str) -> float | None:
+        if self.dispatcher is None:
+            return None
+        return self.dispatcher.begin(backend)
+
+    def _end(self, backend: str, started: float | None, success: bool):
+        # OpenRouter outcomes are recorded per attempt in `_call_openrouter`
+        if backend == 'ollama':
+            if success:
+                self.breakers['ollama'].record_success()
+            else:
+                self.breakers['ollama'].record_failure()
+        if self.dispatcher is not None and started is not None:
+            self.dispatcher.end(backend, started, success)
+
+    def _hedging_available(self) -> bool:
+        """Hedging needs both backends, so it is off while either circuit is open."""
+        return (
+            self.hedge_budget is not None
+            and self._active_client_type() == 'openrouter'
+            and self.breakers['ollama'].available()
+        )
+
+    def _generate_hedged(self, client_type: str, prompt: str, params: dict, options: dict,
+                         record: LLMCallRecord) -> str:
+        """Runs a full request as a race between backends and returns the first complete answer."""
+        _, cached = self._cache_lookup(client_type, self._model_for(client_type, record.topic), prompt, params, record)
+        if cached is not None:
+            return cached
+        try:
+            leg = self._race(client_type, prompt, options, self.hedge_latency, consume=True, record=record)
+        except Exception as e:
+            logger.error(f"Hedged request failed on every backend: {e}")
+            return f"Error: {e}"
+        record.backend, record.model = leg.backend, leg.model
+        record.usage = next((chunk.usage for chunk in leg.chunks if getattr(chunk, 'usage', None)), {})
+        self._cache_store(self._cache_key(leg.backend, leg.model, prompt, params), leg.backend, leg.model, leg.text)
+        return leg.text
+
+    def _stream_hedged(self, client_type: str, prompt: str, params: dict, options: dict,
+                       record: LLMCallRecord) -> Iterator[str]:
+        """Races backends to the first chunk, then relays the winning stream alone."""
+        _, cached = self._cache_lookup(client_type, self._model_for(client_type, record.topic), prompt, params, record)
+        if cached is not None:
+            yield cached
+            return
+        try:
+            leg = self._race(client_type, prompt, options, self.hedge_first_chunk_latency, consume=False,
+                             record=record)
+        except Exception as e:
+            logger.error(f"Hedged stream failed on every backend: {e}")
+            yield f"Error: {e}"
+            return
+        record.backend, record.model = leg.backend, leg.model
+        key = self._cache_key(leg.backend, leg.model, prompt, params)
+        yield from self._relay_stream(key, leg.backend, leg.model, leg.stream, leg.chunks[0], leg.started)
+
+    def _race(self, primary: str, prompt: str, options: dict, tracker: LatencyTracker, consume: bool,
+              record: LLMCallRecord | None = None) -> HedgeLeg:
+        """
+        Sends a request to `primary` and, if it has not finished within the tracked
+        latency percentile and the budget allows, a duplicate to the other backend.
+        The first leg to succeed wins and the other one is cancelled.
+
+        If the primary leg fails before a hedge was sent, the request goes to the
+        other backend anyway, like the fallback of the non-hedged path. Only
+        latency hedges are charged to the budget. The tracker only learns the
+        primary leg's latency: when the hedge wins, the time the primary had
+        taken by then is recorded as a lower bound, so slow primaries still
+        raise the threshold.
+
+        Args:
+            consume (bool): If True a leg finishes with the full response; otherwise
+                it finishes with its first chunk and the stream left open.
+        """
+        self.hedge_budget.record_request()
+        topic = record.topic if record is not None else None
+        secondary = 'ollama' if primary == 'openrouter' else 'openrouter'
+        cancelled = threading.Event()
+        started = time.monotonic()
+        futures = {
+            self._hedge_executor.submit(self._run_leg, primary, prompt, options, topic, cancelled, consume): primary
+        }
+
+        hedge_after = tracker.threshold()
+        done, _ = wait(futures, timeout=hedge_after)
+        hedged = False
+        if not done and self.hedge_budget.try_spend():
+            hedged = True
+            if record is not None:
+                record.hedged = True
+            logger.info(f"No response from '{primary}' after {hedge_after:.1f}s. Hedging the request to '{secondary}'.")
+            futures[self._hedge_executor.submit(self._run_leg, secondary, prompt, options, topic, cancelled, consume)] = secondary
+
+        pending = set(futures)
+        last_error = None
+        primary_failed = False
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    leg = future.result()
+                except Exception as e:
+                    last_error = e
+                    primary_failed = primary_failed or futures[future] == primary
+                    if futures[future] == primary and secondary not in futures.values():
+                        logger.warning(f"'{primary}' failed ({e}). Serving the request from '{secondary}'.")
+                        if record is not None:
+                            record.fallback = True
+                        fallback = self._hedge_executor.submit(self._run_leg, secondary, prompt, options, topic, cancelled, consume)
+                        futures[fallback] = secondary
+                        pending.add(fallback)
+                    continue
+
+                cancelled.set()
+                for other in futures:
+                    if other is not future:
+                        other.add_done_callback(self._discard_leg)
+                if not primary_failed:
+                    tracker.record(time.monotonic() - started)
+                if leg.backend != primary and hedged:
+                    self.hedge_budget.record_win()
+                return leg
+        raise last_error
+
+    def _run_leg(self, backend: str, prompt: str, options: dict, topic: str | None, cancelled: threading.Event,
+                 consume: bool) -> HedgeLeg:
+        """Runs one copy of a hedged request, giving up early once another copy has won."""
+        if backend == 'ollama' and not self.breakers['ollama'].allow_request():
+            raise CircuitOpenError("Ollama circuit is open.")
+        model = self._model_for(backend, topic)
+        started = self._begin(backend)
+        try:
+            if backend == 'openrouter':
+                stream, first_chunk = self._call_openrouter(
+                    lambda: self._open_stream(self.openrouter_client, prompt, options, model)
+                )
+            else:
+                stream, first_chunk = self._open_stream(self._get_ollama_client(), prompt, options, model)
+        except Exception:
+            self._end(backend, started, success=False)
+            raise
+
+        # The Ollama client reports failures as "Error: ..." text instead of raising
+        if first_chunk is None or first_chunk.startswith("Error:"):
+            stream.close()
+            self._end(backend, started, success=False)
+            raise RuntimeError(f"'{backend}' returned no usable output: {first_chunk}")
+
+        leg = HedgeLeg(backend, model, stream, started, first_chunk)
+        if not consume:
+            return leg
+
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    break
+                leg.chunks.append(chunk)
+        except Exception:
+            self._end(backend, started, success=False)
+            raise
+        finally:
+            # Closing the stream drops the connection, which cancels the request server-side
+            stream.close()
+            leg.stream = None
+
+        if cancelled.is_set():
+            self._abandon(backend, started)
+        else:
+            self._end(backend, started, success=True)
+        return leg
+
+    def _discard_leg(self, future: Future):
+        """Closes a losing leg that still holds an open stream."""
+        if future.exception() is not None:
+            return
+        leg = future.result()
+        if leg.stream is not None:
+            leg.stream.close()
+            leg.stream = None
+            self._abandon(leg.backend, leg.started)
+
+    def _abandon(self, backend: str, started: float | None):
+        if self.dispatcher is not None and started is not None:
+            self.dispatcher.abandon(backend)
+
+    def _client_options(self, stop: list[str] | None, max_tokens: int | None, response_format: dict | None) -> dict:
+        """
+        Builds the keyword arguments passed to the clients. They also form the
+        cache parameters, so `response_format` is only added when it is set and
+        the keys of plain-text requests stay unchanged.
+        """
+        options = {'stop': stop, 'max_tokens': max_tokens}
+        if response_format is not None:
+            options['response_format'] = response_format
+        return options
+
+    def _model_for(self, backend: str, topic: str | None) -> str:
+        """Returns the model the router picks for a topic, or the backend client's default."""
+        model = self.model_router.choose(backend, topic) if self.model_router is not None else None
+        if model is not None:
+            return model
+        return self.openrouter_client.model if backend == 'openrouter' else self._get_ollama_client().model
+
+    def _get_ollama_client(self) -> OllamaClient:
+        if not self.ollama_client:
+            self.ollama_client = OllamaClient(keep_alive=main_config.OLLAMA_KEEP_ALIVE)
+        return self.ollama_client
+
+    def _call_openrouter(self, call: Callable, record: LLMCallRecord | None = None):
+        """
+        Runs one OpenRouter request under the token bucket and the adaptive
+        concurrency limit, retrying with exponential backoff and jitter.
+
+        Every attempt is reported to the OpenRouter circuit breaker. Once the circuit
+        is open, the remaining retries are skipped, and a Retry-After longer than
+        `OPENROUTER_MAX_RETRY_WAIT_SECONDS` opens it straight away; in both cases the
+        error is raised so the call can go to Ollama instead. For streams, `call`
+        only opens the stream, so the slot and the latency sample cover the request
+        up to its first chunk.
+
+        When a `record` is given, the time spent waiting for a token and a slot and
+        the number of retries are added to it.
+        """
+        breaker = self.breakers['openrouter']
+        last_error = None
+        for attempt in range(main_config.OPENROUTER_MAX_RETRIES):
+            if record is not None:
+                record.retries = attempt
+            queued = time.monotonic()
+            self.rate_limiter.acquire()
+            # Checked after waiting for a token, since the circuit may have opened meanwhile
+            if not breaker.allow_request():
+                raise last_error or CircuitOpenError("OpenRouter circuit is open.")
+            self.concurrency_limiter.acquire()
+            started = time.monotonic()
+            if record is not None:
+                record.queue_wait += started - queued
+            try:
+                result = call()
+            except RateLimitError as e:
+                self.concurrency_limiter.release(rate_limited=True)
+                last_error = e
+                if e.retry_after is not None and e.retry_after > main_config.OPENROUTER_MAX_RETRY_WAIT_SECONDS:
+                    breaker.trip(e.retry_after)
+                    raise
+                breaker.record_failure()
+                # After the last attempt there is nothing to wait for, and pausing the bucket would stall every worker
+                if not breaker.available() or attempt == main_config.OPENROUTER_MAX_RETRIES - 1:
+                    raise
+                delay = backoff_delay(attempt, main_config.LLM_BACKOFF_BASE_SECONDS, main_config.LLM_BACKOFF_MAX_SECONDS, e.retry_after)
+                logger.warning(f"OpenRouter rate limit hit (attempt {attempt + 1}). Backing off all workers for {delay:.1f}s.")
+                # Pausing the bucket makes every worker honour the wait, not just this one
+                self.rate_limiter.pause_until(time.monotonic() + delay)
+                continue
+            except Exception as e:
+                self.concurrency_limiter.release()
+                last_error = e
+                breaker.record_failure()
+                if not breaker.available() or attempt == main_config.OPENROUTER_MAX_RETRIES - 1:
+                    raise
+                delay = backoff_delay(attempt, main_config.LLM_BACKOFF_BASE_SECONDS, main_config.LLM_BACKOFF_MAX_SECONDS)
+                logger.warning(f"OpenRouter call failed (attempt {attempt + 1}): {e}. Retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                continue
+
+            self.concurrency_limiter.release(latency=time.monotonic() - started)
+            breaker.record_success()
+            return result
+
+        raise last_error
+
+    def _open_stream(self, client, prompt: str, options: dict, model: str):
+        """Starts a stream and reads its first chunk, so connection errors surface here."""
+        stream = client.generate_response_stream(prompt, model=model, **options)
+        return stream, next(stream, None)
+
+    def _relay_stream(self, key: str | None, backend: str, model: str, stream, first_chunk: str | None,
+                      started: float | None = None) -> Iterator[str]:
+        """
+        Yields a stream's chunks and caches the text once the stream has finished,
+        or when the caller stopped reading early because it already had a closed
+        answer. A stream that fails in the backend is reported as a failure and
+        never cached, since its text is truncated. The stream's duration is
+        reported to the dispatcher when it finishes.
+        """
+        chunks = []
+        completed = False
+        abandoned = False
+        try:
+            if first_chunk is not None:
+                chunks.append(first_chunk)
+                yield first_chunk
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+            completed = True
+        except GeneratorExit:
+            # The caller closed the stream; only an early stop on a parsed answer counts as complete
+            completed = has_closed_answer("".join(chunks))
+            abandoned = not completed
+            raise
+        finally:
+            stream.close()
+            text = "".join(chunks)
+            if abandoned:
+                # Not the backend's fault, so neither a success nor a failure
+                self._abandon(backend, started)
+            else:
+                self._end(backend, started, success=completed and not text.startswith("Error:"))
+            if completed:
+                self._cache_store(key, backend, model, text)
+
+    def _cache_lookup(self, backend: str, model: str, prompt: str, params: dict,
+                      record: LLMCallRecord | None = None) -> tuple[str | None, str | None]:
+        """Returns (cache key, cached response); both are None when caching is disabled."""
+        key = self._cache_key(backend, model, prompt, params)
+        if key is None:
+            return None, None
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for '{backend}' model '{model}'.")
+            if record is not None:
+                record.backend, record.model, record.cache_hit = backend, model, True
+        return key, cached
+
+    def _cache_key(self, backend: str, model: str, prompt: str, params: dict) -> str | None:
+        if self.response_cache is None:
+            return None
+        return LLMResponseCache.make_key(backend, model, prompt, params)
 
-        if self.primary_client_type == 'ollama':
-            if not self.ollama_client:
-                self.ollama_client = OllamaClient()
-            return self.ollama_client.generate_response(prompt)
\ No newline at end of file
+    def _cache_store(self, key: str | None, backend: str, model: str, response: str):
+        # The Ollama client reports failures as "Error: ..." strings; never cache those
+        if key is not None and response and not response.startswith("Error:"):
+            self.response_cache.put(key, backend, model, response)
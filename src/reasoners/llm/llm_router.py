@@ -1,25 +1,33 @@
 # src/reasoners/llm/llm_router.py
 from src.logger import logger
-from .prompt_templates import PROMPT_TEMPLATES
+from .prompt_templates import (
+    PROMPT_TEMPLATES, PROMPT_PREFIXES, PROMPT_SUFFIXES,
+    PACKED_PROMPT_PREFIX, PACKED_PROMPT_SUFFIX, PACKED_PROBLEM_TEMPLATE,
+    FORMAT_REMINDER, ASSISTANT_HEADER, STRUCTURED_OUTPUT_INSTRUCTION, ANSWER_FOLLOW_UP_TEMPLATE
+)
 import pandas as pd
 
 class LLMRouter:
     """
     Selects and formats the appropriate prompt template for a given problem.
     """
-    def get_prompt(self, topic: str, row: pd.Series) -> str:
+    def get_prompt(self, topic: str, row: pd.Series, structured: bool = False) -> str:
         """
-        Retrieves the best prompt template for the topic and formats it.
+        Retrieves the best prompt template for the topic and formats it. The static
+        prefix of the template is emitted verbatim and only the suffix is formatted,
+        so every prompt of a topic starts with the same bytes.
 
         Args:
             topic (str): The classified topic of the problem.
             row (pd.Series): The data row containing the problem statement and options.
+            structured (bool): If True, ask for a JSON object with "reasoning" and
+                "answer" fields instead of the <scratchpad>/<answer> tags.
 
         Returns:
             str: The fully formatted prompt ready to be sent to the LLM.
         """
         # Select the template for the given topic, or fall back to the base template
-        template = PROMPT_TEMPLATES.get(topic.lower(), PROMPT_TEMPLATES["base"])
+        template_key = self._template_key(topic)
         logger.info(f"Selected '{topic.lower()}' prompt template.")
 
         try:
@@ -32,7 +40,81 @@ class LLMRouter:
                 "answer_option_4": row["answer_option_4"],
                 "answer_option_5": row["answer_option_5"]
             }
-            return template.format(**prompt_data)
+            suffix = PROMPT_SUFFIXES[template_key].format(**prompt_data)
+            if structured:
+                suffix = suffix.replace(FORMAT_REMINDER, STRUCTURED_OUTPUT_INSTRUCTION)
+                suffix = suffix[:suffix.rindex(ASSISTANT_HEADER) + len(ASSISTANT_HEADER)]
+            return PROMPT_PREFIXES[template_key] + suffix
         except KeyError as e:
             logger.error(f"Failed to format prompt. Data key missing: {e}")
-            return "" # Return empty string on formatting failure
\ No newline at end of file
+            return "" # Return empty string on formatting failure
+
+    def get_follow_up_prompt(self, row: pd.Series, reasoning: str) -> str:
+        """
+        Formats the short follow-up that asks only for the option number a previous
+        reply concluded on, for replies whose answer could not be parsed.
+
+        Args:
+            row (pd.Series): The data row containing the problem statement and options.
+            reasoning (str): The text of the reply that could not be parsed.
+
+        Returns:
+            str: The follow-up prompt, or an empty string on formatting failure.
+        """
+        try:
+            return ANSWER_FOLLOW_UP_TEMPLATE.format(
+                problem_statement=row["problem_statement"],
+                answer_option_1=row["answer_option_1"],
+                answer_option_2=row["answer_option_2"],
+                answer_option_3=row["answer_option_3"],
+                answer_option_4=row["answer_option_4"],
+                answer_option_5=row["answer_option_5"],
+                reasoning=reasoning
+            )
+        except KeyError as e:
+            logger.error(f"Failed to format follow-up prompt. Data key missing: {e}")
+            return ""
+
+    def get_packed_prompt(self, topic: str, rows: list[pd.Series]) -> str:
+        """
+        Formats several same-topic problems into one prompt. Problem ids run from 1
+        to len(rows), in the order of `rows`, and each answer is expected in an
+        <answer id=N> block.
+
+        Args:
+            topic (str): The shared topic of the problems.
+            rows (list[pd.Series]): The data rows to pack.
+
+        Returns:
+            str: The packed prompt, or an empty string on formatting failure.
+        """
+        prefix = self.get_packed_prefix(topic)
+        logger.info(f"Packing {len(rows)} problems into one '{topic.lower()}' prompt.")
+
+        try:
+            problems = "\n---\n".join(
+                PACKED_PROBLEM_TEMPLATE.format(
+                    problem_id=problem_id,
+                    problem_statement=row["problem_statement"],
+                    answer_option_1=row["answer_option_1"],
+                    answer_option_2=row["answer_option_2"],
+                    answer_option_3=row["answer_option_3"],
+                    answer_option_4=row["answer_option_4"],
+                    answer_option_5=row["answer_option_5"]
+                )
+                for problem_id, row in enumerate(rows, start=1)
+            )
+            return prefix + PACKED_PROMPT_SUFFIX.format(problems=problems)
+        except KeyError as e:
+            logger.error(f"Failed to format packed prompt. Data key missing: {e}")
+            return ""
+
+    def get_packed_prefix(self, topic: str) -> str:
+        """Returns the static prefix of packed prompts for a topic."""
+        template = PROMPT_TEMPLATES[self._template_key(topic)]
+        # The first line of the system block states the solver's role for the topic
+        role = template.split("<|end_header_id|>\n", 1)[1].split("\n", 1)[0]
+        return PACKED_PROMPT_PREFIX.format(role=role)
+
+    def _template_key(self, topic: str) -> str:
+        return topic.lower() if topic.lower() in PROMPT_TEMPLATES else "base"
@@ -0,0 +1,119 @@
+# src/reasoners/llm/model_router.py
+import json
+import os
+import threading
+import pandas as pd
+from src.logger import logger
+
+class ModelRouter:
+    """
+    Picks the model of each LLM request per backend and topic from a catalogue,
+    using accuracy and latency measured on earlier runs.
+
+    The statistics are measured by scripts/calibrate_model_router.py, which sends
+    labelled training problems of every topic to each catalogued model. Normal runs
+    do not update them, since packed and follow-up requests would skew the
+    latencies. For a topic, the router takes the models with at least
+    `min_samples` graded calls, keeps those whose accuracy is within
+    `accuracy_tolerance` of the best one, and returns the fastest of them (the
+    cheapest on a tie). Without enough data it returns None, so the client's
+    default model is used.
+
+    Statistics are kept in a JSON file of the form
+    {backend: {topic: {model: {calls, latency_sum, cost_sum, graded, correct}}}}.
+    """
+    def __init__(self, catalogue: dict[str, list[str]], stats_path: str, min_samples: int = 20,
+                 accuracy_tolerance: float = 0.02):
+        self.catalogue = catalogue
+        self.stats_path = stats_path
+        self.min_samples = min_samples
+        self.accuracy_tolerance = accuracy_tolerance
+        self._lock = threading.Lock()
+        self.stats = self._load()
+
+    def choose(self, backend: str, topic: str | None) -> str | None:
+        """Returns the model to use for a topic on a backend, or None for the client default."""
+        if topic is None:
+            return None
+        topic = topic.lower()
+        with self._lock:
+            topic_stats = self.stats.get(backend, {}).get(topic, {})
+            graded = {
+                model: entry for model, entry in topic_stats.items()
+                if model in self.catalogue.get(backend, []) and entry['graded'] >= self.min_samples
+            }
+            if not graded:
+                return None
+
+            def accuracy(entry):
+                return entry['correct'] / entry['graded']
+
+            best = max(accuracy(entry) for entry in graded.values())
+            good_enough = [model for model, entry in graded.items() if accuracy(entry) >= best - self.accuracy_tolerance]
+            return min(good_enough, key=lambda model: (
+                graded[model]['latency_sum'] / max(graded[model]['calls'], 1),
+                graded[model]['cost_sum'] / max(graded[model]['calls'], 1)
+            ))
+
+    def record(self, backend: str, topic: str | None, model: str | None, latency: float | None,
+               cost: float = 0.0, correct: bool | None = None):
+        """
+        Adds one call to the statistics.
+
+        Args:
+            correct (bool | None): Whether the answer matched the label, or None
+                for an ungraded call.
+        """
+        if topic is None or model is None or latency is None:
+            return
+        with self._lock:
+            entry = self.stats.setdefault(backend, {}).setdefault(topic.lower(), {}).setdefault(
+                model, {'calls': 0, 'latency_sum': 0.0, 'cost_sum': 0.0, 'graded': 0, 'correct': 0}
+            )
+            entry['calls'] += 1
+            entry['latency_sum'] += latency
+            entry['cost_sum'] += cost
+            if correct is not None:
+                entry['graded'] += 1
+                entry['correct'] += int(correct)
+
+    def summary(self) -> pd.DataFrame:
+        """Returns one row per backend, topic and model with accuracy, mean latency and mean cost."""
+        with self._lock:
+            rows = [
+                {
+                    'backend': backend,
+                    'topic': topic,
+                    'model': model,
+                    'calls': entry['calls'],
+                    'graded': entry['graded'],
+                    'accuracy': entry['correct'] / entry['graded'] if entry['graded'] else None,
+                    'mean_latency_s': entry['latency_sum'] / entry['calls'] if entry['calls'] else None,
+                    'mean_cost_usd': entry['cost_sum'] / entry['calls'] if entry['calls'] else None
+                }
+                for backend, topics in self.stats.items()
+                for topic, models in topics.items()
+                for model, entry in models.items()
+            ]
+        return pd.DataFrame(rows)
+
+    def save(self):
+        """Writes the statistics via a temporary file and an atomic rename."""
+        os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+        with self._lock:
+            content = json.dumps(self.stats, indent=4)
+        tmp_path = f"{self.stats_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, self.stats_path)
+        logger.info(f"Model routing statistics saved to {self.stats_path}.")
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.stats_path):
+            return {}
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read model routing statistics from {self.stats_path}, starting empty: {e}")
+            return {}
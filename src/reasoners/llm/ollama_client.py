@@ -3,70 +3,105 @@
 import ollama
 import time
 from src.logger import logger
+from .rate_limiter import backoff_delay
+from .telemetry import LLMResponse
 
 class OllamaClient:
     """
     A robust client for interacting with a local Llama 3 model via Ollama.
     """
-    def __init__(self, model: str = 'llama3', host: str = None, retries: int = 3, delay: int = 5):
+    def __init__(self, model: str = 'llama3', host: str = None, retries: int = 3, delay: int = 5, max_delay: int = 60,
+                 keep_alive: str | None = None):
         self.model = model
+        # Keeping the model loaded between requests lets Ollama reuse the KV cache
+        # of the prompt prefix shared with the previous request
+        self.keep_alive = keep_alive
         self.retries = retries
+        # Base and cap for exponential backoff with jitter between retries
         self.delay = delay
+        self.max_delay = max_delay
         try:
             self.client = ollama.Client(host=host)
             logger.info(f"Ollama client initialized for model '{self.model}' at host '{host or 'default'}'.")
-            self._verify_connection()
         except Exception as e:
             logger.error(f"Failed to initialize Ollama client: {e}")
             self.client = None
 
-    def _verify_connection(self):
-        """Verifies that the model is available and the client can connect."""
+    def health_check(self) -> bool:
+        """
+        Verifies that the model is available and the client can connect. This is a
+        blocking call, so it is run by the factory's background health prober rather
+        than on construction.
+
+        Raises:
+            RuntimeError: With the reason, if the model is missing or the server cannot be reached.
+                The prober logs it only when the backend's circuit changes state.
+        """
+        if not self.client:
+            return False
         try:
-            logger.info("Verifying connection to Ollama and model availability...")
             self.client.show(self.model)
-            logger.info(f"Successfully connected to Ollama and model '{self.model}' is available.")
+            return True
         except ollama.ResponseError as e:
-            logger.error(f"Model '{self.model}' not found. Please pull it with `ollama pull {self.model}`.")
-            logger.error(f"Ollama server response: {e.error}")
-            self.client = None
+            raise RuntimeError(f"Model '{self.model}' not found. Please pull it with `ollama pull {self.model}`. Ollama server response: {e.error}") from e
         except Exception as e:
-            logger.error(f"Could not connect to Ollama server. Is it running? Error: {e}")
-            self.client = None
+            raise RuntimeError(f"Could not connect to Ollama server. Is it running? Error: {e}") from e
 
-    def generate_response_stream(self, prompt: str):
+    def generate_response_stream(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                                 response_format: dict | None = None, model: str | None = None):
         """
-        Generates a streaming response from the LLM.
+        Generates a streaming response from the LLM. Closing the generator early
+        closes the underlying HTTP stream, which stops the generation.
+        `response_format` is a JSON schema that constrains the output, and `model`
+        overrides the client's default model.
         """
         if not self.client:
             logger.error("Ollama client is not available. Cannot generate response.")
             return
 
         messages = [{'role': 'user', 'content': prompt}]
+        model = model or self.model
         
+        yielded = False
         for attempt in range(self.retries):
             try:
-                logger.info(f"Sending prompt to '{self.model}' (Attempt {attempt + 1}/{self.retries})...")
-                stream = self.client.chat(model=self.model, messages=messages, stream=True)
+                logger.info(f"Sending prompt to '{model}' (Attempt {attempt + 1}/{self.retries})...")
+                stream = self.client.chat(model=model, messages=messages, stream=True, options=self._build_options(stop, max_tokens), format=response_format, keep_alive=self.keep_alive)
                 for chunk in stream:
-                    yield chunk['message']['content']
+                    yielded = True
+                    if chunk.get('done'):
+                        # The final chunk carries the token counts of the whole generation
+                        yield LLMResponse(chunk['message']['content'], usage=self._parse_usage(chunk))
+                    else:
+                        yield chunk['message']['content']
                 return
             except Exception as e:
                 logger.warning(f"Error during streaming generation (Attempt {attempt + 1}): {e}")
+                if yielded:
+                    # Retrying would repeat text the caller has already received, and
+                    # ending normally would pass the truncated text off as a full reply
+                    logger.error("Stream failed after partial output. Not retrying.")
+                    raise
                 if attempt < self.retries - 1:
-                    logger.info(f"Retrying in {self.delay} seconds...")
-                    time.sleep(self.delay)
+                    wait = backoff_delay(attempt, base=self.delay, cap=self.max_delay)
+                    logger.info(f"Retrying in {wait:.1f} seconds...")
+                    time.sleep(wait)
                 else:
                     logger.error("Max retries reached. Failed to generate response.")
                     yield f"Error: Failed to get a response from the model after {self.retries} attempts."
     
     # --- THIS IS THE MISSING METHOD ---
-    def generate_response(self, prompt: str) -> str:
+    def generate_response(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                          response_format: dict | None = None, model: str | None = None) -> str:
         """
         Generates a single, complete response from the LLM (non-streaming).
 
         Args:
             prompt (str): The user prompt to send to the model.
+            stop (list[str] | None): Sequences at which the model stops generating.
+            max_tokens (int | None): Upper bound on the number of generated tokens.
+            response_format (dict | None): JSON schema that constrains the output.
+            model (str | None): Overrides the client's default model.
 
         Returns:
             str: The full response content.
@@ -76,17 +111,31 @@ class OllamaClient:
             return "Error: Client not available."
 
         messages = [{'role': 'user', 'content': prompt}]
+        model = model or self.model
         
         for attempt in range(self.retries):
             try:
-                logger.info(f"Sending prompt to '{self.model}' (Attempt {attempt + 1}/{self.retries})...")
-                response = self.client.chat(model=self.model, messages=messages)
-                return response['message']['content']
+                logger.info(f"Sending prompt to '{model}' (Attempt {attempt + 1}/{self.retries})...")
+                response = self.client.chat(model=model, messages=messages, options=self._build_options(stop, max_tokens), format=response_format, keep_alive=self.keep_alive)
+                return LLMResponse(response['message']['content'], usage=self._parse_usage(response))
             except Exception as e:
                 logger.warning(f"Error during generation (Attempt {attempt + 1}): {e}")
                 if attempt < self.retries - 1:
-                    logger.info(f"Retrying in {self.delay} seconds...")
-                    time.sleep(self.delay)
+                    wait = backoff_delay(attempt, base=self.delay, cap=self.max_delay)
+                    logger.info(f"Retrying in {wait:.1f} seconds...")
+                    time.sleep(wait)
                 else:
                     logger.error("Max retries reached. Failed to generate response.")
-                    return "Error: Max retries reached."
\ No newline at end of file
+                    return "Error: Max retries reached."
+
+    def _parse_usage(self, response) -> dict:
+        return {'prompt_tokens': response.get('prompt_eval_count'), 'completion_tokens': response.get('eval_count')}
+
+    def _build_options(self, stop: list[str] | None, max_tokens: int | None) -> dict:
+        """Maps generation limits onto Ollama's model options."""
+        options = {}
+        if stop:
+            options['stop'] = stop
+        if max_tokens:
+            options['num_predict'] = max_tokens
+        return options
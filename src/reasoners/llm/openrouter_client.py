@@ -1,51 +1,81 @@
 # src/reasoners/llm/openrouter_client.py
+import asyncio
+import json
 import os
+import time
+from email.utils import parsedate_to_datetime
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
 from src.logger import logger
+from .telemetry import LLMResponse
 
 # Custom exception for clarity
 class RateLimitError(Exception):
-    pass
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        # Seconds the server asked us to wait, if it said so
+        self.retry_after = retry_after
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
 class OpenRouterClient:
-    def __init__(self):
+    def __init__(self, pool_size: int = 32, timeout: float = 60):
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         if not self.api_key or self.api_key == "your_api_key_here":
             raise ValueError("OPENROUTER_API_KEY not found or not set in .env file.")
 
-        self.base_url = "https://openrouter.ai/api/v1"
+        # Overridable so the client can be pointed at a local stand-in such as scripts/mock_llm_server.py
+        self.base_url = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1").rstrip("/")
         self.model = "meta-llama/llama-3-8b-instruct"
-        logger.info(f"OpenRouter client initialized for model '{self.model}'.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        # A shared session keeps TCP+TLS connections to openrouter.ai alive between calls
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
-    def generate_response(self, prompt: str) -> str:
+        # The async client is bound to an event loop, so it is created on first use
+        self._async_client = None
+        self._async_client_loop = None
+        logger.info(f"OpenRouter client initialized for model '{self.model}' (connection pool size {pool_size}).")
+
+    def generate_response(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                          response_format: dict | None = None, model: str | None = None) -> str:
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": [{"role": "user", "content": prompt}],
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=60
+                json=self._build_payload(prompt, stop=stop, max_tokens=max_tokens, response_format=response_format, model=model),
+                timeout=self.timeout
             )
             
             # Check for rate limit error (HTTP 429)
             if response.status_code == 429:
-                raise RateLimitError("OpenRouter API rate limit reached.")
+                raise RateLimitError("OpenRouter API rate limit reached.", parse_retry_after(response.headers.get("Retry-After")))
             
             # Raise an exception for other HTTP errors
             response.raise_for_status()
             
             # Parse the response
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+            return self._parse_response(response.json())
             
         except RateLimitError:
             # Re-raise our custom rate limit error
@@ -55,4 +85,148 @@ class OpenRouterClient:
             raise
         except (KeyError, IndexError) as e:
             logger.error(f"Unexpected response format from OpenRouter: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    def generate_response_stream(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                                 response_format: dict | None = None, model: str | None = None):
+        """
+        Streams the response as server-sent events, yielding content deltas as they
+        arrive. Closing the generator early closes the HTTP response, which ends the
+        generation on the server side.
+        """
+        payload = self._build_payload(prompt, stop=stop, max_tokens=max_tokens, response_format=response_format, model=model)
+        payload["stream"] = True
+        try:
+            response = self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=payload,
+                timeout=self.timeout,
+                stream=True
+            )
+            if response.status_code == 429:
+                response.close()
+                raise RateLimitError("OpenRouter API rate limit reached.", parse_retry_after(response.headers.get("Retry-After")))
+            response.raise_for_status()
+        except RateLimitError:
+            raise
+        except requests.exceptions.RequestException as e:
+            logger.error(f"An error occurred with OpenRouter client: {e}")
+            raise
+
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                # Blank lines separate events; lines starting with ':' are keep-alive comments
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise requests.exceptions.RequestException(f"OpenRouter stream error: {event['error']}")
+                choices = event.get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
+                if event.get("usage"):
+                    # Usage arrives with the last event; it is passed on as an empty chunk
+                    yield LLMResponse("", usage=self._parse_usage(event["usage"]))
+        except (KeyError, IndexError, json.JSONDecodeError) as e:
+            logger.error(f"Unexpected stream format from OpenRouter: {e}")
+            raise
+        finally:
+            response.close()
+
+    async def agenerate_response(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                                 response_format: dict | None = None, model: str | None = None) -> str:
+        """
+        Asyncio-native variant of `generate_response`. Many calls can be in flight
+        from a single event loop, sharing one pooled HTTP/1.1 connection set.
+        """
+        try:
+            response = await self._get_async_client().post(
+                f"{self.base_url}/chat/completions",
+                json=self._build_payload(prompt, stop=stop, max_tokens=max_tokens, response_format=response_format, model=model)
+            )
+
+            if response.status_code == 429:
+                raise RateLimitError("OpenRouter API rate limit reached.", parse_retry_after(response.headers.get("Retry-After")))
+
+            response.raise_for_status()
+            return self._parse_response(response.json())
+
+        except RateLimitError:
+            raise
+        except httpx.HTTPError as e:
+            logger.error(f"An error occurred with OpenRouter async client: {e}")
+            raise
+        except (KeyError, IndexError) as e:
+            logger.error(f"Unexpected response format from OpenRouter: {e}")
+            raise
+
+    async def aclose(self):
+        """Closes the async HTTP client, if one was created."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_client_loop = None
+
+    def health_check(self, timeout: float = 5) -> bool:
+        """
+        Checks that the OpenRouter API is reachable by listing its models.
+
+        Raises:
+            requests.exceptions.RequestException: If the API cannot be reached. The
+                prober logs it only when the backend's circuit changes state.
+        """
+        response = self.session.get(f"{self.base_url}/models", timeout=timeout)
+        return response.status_code < 500
+
+    def close(self):
+        """Closes the pooled HTTP session."""
+        self.session.close()
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    def _build_payload(self, prompt: str, stop: list[str] | None = None, max_tokens: int | None = None,
+                       response_format: dict | None = None, model: str | None = None) -> dict:
+        """
+        `response_format` is a JSON schema the reply must conform to (structured
+        outputs), and `model` overrides the client's default model.
+        """
+        payload = {
+            "model": model or self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            # Asks OpenRouter to report token counts and cost, including at the end of a stream
+            "usage": {"include": True},
+        }
+        if stop:
+            payload["stop"] = stop
+        if max_tokens:
+            payload["max_tokens"] = max_tokens
+        if response_format:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "strict": True, "schema": response_format}
+            }
+        return payload
+
+    def _parse_response(self, data: dict) -> str:
+        return LLMResponse(data["choices"][0]["message"]["content"], usage=self._parse_usage(data.get("usage")))
+
+    def _parse_usage(self, usage: dict | None) -> dict:
+        if not usage:
+            return {}
+        parsed = {'prompt_tokens': usage.get("prompt_tokens"), 'completion_tokens': usage.get("completion_tokens")}
+        if usage.get("cost") is not None:
+            parsed['cost'] = usage["cost"]
+        return parsed
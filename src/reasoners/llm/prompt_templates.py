@@ -226,4 +226,75 @@ Options:
 Follow the required format for your response.
 <|eot_id|><|start_header_id|>assistant<|end_header_id|>
 """
-}
\ No newline at end of file
+}
+
+def split_template(template: str) -> tuple[str, str]:
+    """
+    Splits a template into its static prefix (everything before the line holding
+    the first placeholder) and the dynamic suffix that is formatted per problem.
+    """
+    cut = template.rfind("\n", 0, template.index("{")) + 1
+    return template[:cut], template[cut:]
+
+# The prefix of a topic is sent byte-for-byte identically on every request, so a
+# backend can reuse the cached KV state of the instructions and few-shot example.
+# PROMPT_TEMPLATES[topic] == PROMPT_PREFIXES[topic] + PROMPT_SUFFIXES[topic].
+PROMPT_PREFIXES = {topic: split_template(template)[0] for topic, template in PROMPT_TEMPLATES.items()}
+PROMPT_SUFFIXES = {topic: split_template(template)[1] for topic, template in PROMPT_TEMPLATES.items()}
+
+# --- Packed prompts: several same-topic problems answered in one request ---
+# `{role}` is the first system line of the topic's template above. The prefix
+# only depends on the topic, so it is as cacheable as the single-problem ones.
+PACKED_PROMPT_PREFIX = """<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+{role}
+You will be given several independent problems, each marked with an id. For every problem, in order:
+1. First, think step-by-step inside <scratchpad id=N> tags, where N is the id of the problem.
+2. Then, provide your final answer inside <answer id=N> tags. Each answer must be ONLY the single number of the correct option.
+Answer every problem and keep the ids exactly as given.
+<|eot_id|><|start_header_id|>user<|end_header_id|>
+"""
+
+PACKED_PROMPT_SUFFIX = """{problems}
+
+Follow the required format for your response.
+<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+"""
+
+PACKED_PROBLEM_TEMPLATE = """Problem id={problem_id}: "{problem_statement}"
+
+Options:
+1: {answer_option_1}
+2: {answer_option_2}
+3: {answer_option_3}
+4: {answer_option_4}
+5: {answer_option_5}
+"""
+
+# --- Structured output: the model answers with a JSON object instead of tags ---
+# Replaces the closing reminder of a formatted suffix, so the cached prefix is unchanged.
+# Any tag skeleton a template pre-fills after the assistant header is dropped as well.
+FORMAT_REMINDER = "Follow the required format for your response."
+ASSISTANT_HEADER = "<|start_header_id|>assistant<|end_header_id|>\n"
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    'Instead of the tags, respond with ONLY a JSON object of the form '
+    '{"reasoning": "<your step-by-step reasoning>", "answer": <the single number of the correct option>}.'
+)
+
+# Cheap follow-up for a reply whose option number could not be parsed: the model
+# only has to read its own reasoning and name the option it concluded on.
+ANSWER_FOLLOW_UP_TEMPLATE = """<|begin_of_text|><|start_header_id|>system<|end_header_id|>
+You will be given a problem, its options and some reasoning about it. Reply with ONLY the single number of the option the reasoning concludes is correct.
+<|eot_id|><|start_header_id|>user<|end_header_id|>
+Problem: "{problem_statement}"
+
+Options:
+1: {answer_option_1}
+2: {answer_option_2}
+3: {answer_option_3}
+4: {answer_option_4}
+5: {answer_option_5}
+
+Reasoning:
+{reasoning}
+<|eot_id|><|start_header_id|>assistant<|end_header_id|>
+"""
@@ -0,0 +1,88 @@
+# src/reasoners/llm/rate_limiter.py
+import random
+import threading
+import time
+from src.logger import logger
+
+def backoff_delay(attempt: int, base: float, cap: float, retry_after: float | None = None) -> float:
+    """
+    Exponential backoff with full jitter: a random delay in [0, min(cap, base * 2^attempt)].
+    A server-provided Retry-After is treated as a lower bound.
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+class TokenBucket:
+    """
+    A thread-safe token bucket that smooths requests to `rate` per second with
+    bursts of up to `capacity`. `pause_until` stops all callers until a point in
+    time, which is how a server's Retry-After is honoured across workers.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a token is available, then consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause_until(self, resume_at: float):
+        """Holds back every caller until the monotonic time `resume_at`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, resume_at)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps the number of requests in flight and adapts the cap with AIMD:
+    each successful, fast call raises the limit by 1/limit (about +1 per round of
+    requests), while a rate-limit response or a call slower than `latency_target`
+    halves it.
+    """
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_target: float):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Blocks until a slot below the current limit is free."""
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, latency: float | None = None, rate_limited: bool = False):
+        """
+        Frees a slot and adjusts the limit from the outcome of the call.
+
+        Args:
+            latency (float | None): Duration of a successful call, in seconds.
+            rate_limited (bool): True if the call was rejected with HTTP 429.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            previous = int(self.limit)
+            if rate_limited or (latency is not None and latency > self.latency_target):
+                self.limit = max(self.minimum, self.limit / 2)
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) != previous:
+                logger.info(f"Adaptive concurrency limit changed from {previous} to {int(self.limit)}.")
+            self._condition.notify_all()
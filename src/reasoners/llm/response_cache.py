@@ -0,0 +1,131 @@
+# src/reasoners/llm/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from src.logger import logger
+
+class LLMResponseCache:
+    """
+    A persistent SQLite cache of LLM responses, keyed by backend, model, prompt hash
+    and sampling parameters.
+
+    Each thread gets its own connection and the database runs in WAL mode, so
+    concurrent workers (threads or processes) can read and write safely. Entries
+    older than `max_age_seconds` are treated as misses, and the least recently used
+    entries are evicted once the cache grows past `max_entries`.
+    """
+    def __init__(self, db_path: str, max_entries: int, max_age_seconds: float, evict_every: int = 100):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.evict_every = max(1, evict_every)
+        self.hits = 0
+        self.misses = 0
+        self._puts_since_eviction = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    backend TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        logger.info(f"LLM response cache opened at {db_path}.")
+
+    @staticmethod
+    def make_key(backend: str, model: str, prompt: str, params: dict | None = None) -> str:
+        """Builds a stable cache key from everything that influences the response."""
+        payload = json.dumps({
+            'backend': backend,
+            'model': model,
+            'prompt_sha256': hashlib.sha256(prompt.encode('utf-8')).hexdigest(),
+            'params': params or {}
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Returns the cached response for a key, or None on a miss or expired entry."""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+
+        if row is not None and now - row[1] > self.max_age_seconds:
+            with conn:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        with conn:
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, backend: str, model: str, response: str):
+        """Stores a response and periodically evicts old or excess entries."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, backend, model, response, created_at, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, backend, model, response, now, now)
+            )
+
+        with self._lock:
+            self._puts_since_eviction += 1
+            should_evict = self._puts_since_eviction >= self.evict_every
+            if should_evict:
+                self._puts_since_eviction = 0
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        """Removes expired entries, then the least recently used ones above `max_entries`."""
+        conn = self._connection()
+        with conn:
+            expired = conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+            overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+        if expired or overflow > 0:
+            logger.info(f"LLM cache eviction: removed {expired} expired and {max(overflow, 0)} least recently used entries.")
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the number of stored entries."""
+        entries = self._connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries
+            }
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
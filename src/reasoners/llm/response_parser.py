@@ -1,9 +1,29 @@
 # src/reasoners/llm/response_parser.py
+import json
 import re
 from src.logger import logger
 
 LLM_CONFIDENCE_SCORE = 0.85 
 
+# JSON schema of a structured-output response, sent as Ollama's `format` and
+# OpenRouter's `response_format`.
+ANSWER_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "reasoning": {"type": "string"},
+        "answer": {"type": "integer", "enum": [1, 2, 3, 4, 5]}
+    },
+    "required": ["reasoning", "answer"],
+    "additionalProperties": False
+}
+
+# The first option number standing on its own, e.g. "3", "3." or "Option 3"
+_OPTION_DIGIT_PATTERN = re.compile(r'\b([1-5])\b')
+
+# Tags of packed responses carry the problem id, e.g. <answer id=2> or <answer id="2">
+_PACKED_ANSWER_PATTERN = re.compile(r'<answer\s+id\s*=\s*"?(\d+)"?\s*>\s*([1-5])(?!\d)')
+_PACKED_SCRATCHPAD_PATTERN = re.compile(r'<scratchpad\s+id\s*=\s*"?(\d+)"?\s*>(.*?)</scratchpad>', re.DOTALL)
+
 def parse_llm_response(response_text: str) -> dict | None:
     """
     Parses the raw text response from the LLM to extract the answer,
@@ -58,4 +78,86 @@ def parse_llm_response(response_text: str) -> dict | None:
 
     except Exception as e:
         logger.error(f"An unexpected error occurred during response parsing: {e}", exc_info=True)
-        return None
\ No newline at end of file
+        return None
+
+def parse_packed_response(response_text: str, problem_ids: list[int]) -> dict[int, dict]:
+    """
+    Splits the response to a packed prompt into per-problem results.
+
+    Args:
+        response_text (str): The raw LLM response.
+        problem_ids (list[int]): The ids of the problems that were packed.
+
+    Returns:
+        dict[int, dict]: The parsed result of every problem whose <answer id=N>
+        block held a valid option number. Missing ids could not be parsed.
+    """
+    try:
+        solutions = {int(problem_id): text.strip() for problem_id, text in _PACKED_SCRATCHPAD_PATTERN.findall(response_text)}
+        results = {}
+        for problem_id, answer in _PACKED_ANSWER_PATTERN.findall(response_text):
+            problem_id = int(problem_id)
+            # The first answer given for an id wins; unknown ids are ignored
+            if problem_id in problem_ids and problem_id not in results:
+                results[problem_id] = {
+                    'answer': int(answer),
+                    'solution': solutions.get(problem_id, "[No reasoning provided by LLM]"),
+                    'confidence': LLM_CONFIDENCE_SCORE
+                }
+
+        missing = [problem_id for problem_id in problem_ids if problem_id not in results]
+        if missing:
+            logger.warning(f"Packed response had no valid answer for problem ids {missing}.")
+        logger.info(f"Packed response parsed: {len(results)} of {len(problem_ids)} answers found.")
+        return results
+
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during packed response parsing: {e}", exc_info=True)
+        return {}
+
+def parse_structured_response(response_text: str) -> dict | None:
+    """
+    Parses a structured-output response of the form {"reasoning": ..., "answer": N}.
+    Text around the JSON object (such as a Markdown code fence) is ignored.
+
+    Returns:
+        dict | None: The answer, solution and confidence, or None if the response
+        holds no valid option number.
+    """
+    start, end = response_text.find('{'), response_text.rfind('}')
+    if start == -1 or end < start:
+        logger.warning("No JSON object found in structured LLM response.")
+        return None
+    try:
+        data = json.loads(response_text[start:end + 1])
+    except json.JSONDecodeError as e:
+        logger.warning(f"Could not decode structured LLM response: {e}")
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    answer = data.get('answer')
+    if isinstance(answer, str) and answer.strip().isdigit():
+        answer = int(answer.strip())
+    if not isinstance(answer, int) or isinstance(answer, bool) or not 1 <= answer <= 5:
+        logger.warning(f"Structured LLM response has no valid answer: {answer!r}")
+        return None
+
+    reasoning = data.get('reasoning')
+    solution = reasoning.strip() if isinstance(reasoning, str) and reasoning.strip() else "[No reasoning provided by LLM]"
+    logger.info(f"Structured LLM response parsed successfully. Found option: {answer}")
+    return {'answer': answer, 'solution': solution, 'confidence': LLM_CONFIDENCE_SCORE}
+
+def parse_option_digit(response_text: str) -> int | None:
+    """Returns the option number from the reply to a digit-only follow-up, or None."""
+    match = _OPTION_DIGIT_PATTERN.search(response_text or "")
+    return int(match.group(1)) if match else None
+
+def extract_reasoning(response_text: str) -> str:
+    """
+    Returns the reasoning part of a response whose answer could not be parsed:
+    the <scratchpad> content if present, otherwise the whole text.
+    """
+    scratchpad_match = re.search(r'<scratchpad>(.*?)</scratchpad>', response_text, re.DOTALL)
+    reasoning = scratchpad_match.group(1) if scratchpad_match else response_text
+    return reasoning.strip() or "[No reasoning provided by LLM]"
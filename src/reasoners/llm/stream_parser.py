@@ -0,0 +1,47 @@
+# src/reasoners/llm/stream_parser.py
+import re
+
+# A valid option digit right after <answer>, followed by anything that closes it
+# (whitespace, the closing tag, or any other non-digit character).
+_CLOSED_ANSWER_PATTERN = re.compile(r'<answer>\s*([1-5])(?=\D)')
+
+def has_closed_answer(text: str) -> bool:
+    """True if `text` already contains a valid, closed <answer> option number."""
+    return _CLOSED_ANSWER_PATTERN.search(text) is not None
+
+class IncrementalAnswerParser:
+    """
+    Consumes a streamed LLM response chunk by chunk and reports when a valid
+    <answer> option number has been closed, so generation can stop early.
+    """
+    def __init__(self):
+        self._chunks = []
+        self._search_from = 0
+        self.answer = None
+
+    @property
+    def text(self) -> str:
+        """The full text received so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Adds a chunk of streamed text.
+
+        Returns:
+            bool: True once a complete answer has been seen.
+        """
+        if self.answer is not None:
+            return True
+
+        self._chunks.append(chunk)
+        text = self.text
+        match = _CLOSED_ANSWER_PATTERN.search(text, self._search_from)
+        if match:
+            self.answer = int(match.group(1))
+            return True
+
+        # Only the tail can still contain the start of an unfinished answer tag
+        last_tag = text.rfind('<answer>')
+        self._search_from = last_tag if last_tag != -1 else max(0, len(text) - len('<answer>'))
+        return False
@@ -0,0 +1,157 @@
+# src/reasoners/llm/telemetry.py
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+import numpy as np
+import pandas as pd
+from src.logger import logger
+from .token_counter import count_tokens
+
+class LLMResponse(str):
+    """
+    A response string that also carries the token usage reported by the backend,
+    e.g. {'prompt_tokens': 512, 'completion_tokens': 80}. It behaves exactly like
+    the plain text everywhere else.
+    """
+    def __new__(cls, text: str, usage: dict | None = None):
+        response = super().__new__(cls, text)
+        response.usage = usage or {}
+        return response
+
+@dataclass
+class LLMCallRecord:
+    """Everything measured about one `LLMFactory` call. Times are in seconds."""
+    topic: str | None
+    streamed: bool
+    started_at: float = field(default_factory=time.time)
+    backend: str | None = None
+    model: str | None = None
+    queue_wait: float = 0.0
+    time_to_first_token: float | None = None
+    latency: float | None = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    token_source: str = 'estimate'
+    retries: int = 0
+    cache_hit: bool = False
+    fallback: bool = False
+    hedged: bool = False
+    success: bool = False
+    cost_usd: float = 0.0
+    # Bookkeeping that is not exported
+    usage: dict = field(default_factory=dict, repr=False)
+    _clock_start: float = field(default_factory=time.perf_counter, repr=False)
+
+    def mark_first_token(self):
+        if self.time_to_first_token is None:
+            self.time_to_first_token = time.perf_counter() - self._clock_start
+
+    def to_dict(self) -> dict:
+        record = asdict(self)
+        record.pop('usage')
+        record.pop('_clock_start')
+        return record
+
+class LLMTelemetry:
+    """
+    Thread-safe collector of per-call LLM records, with per-topic aggregation.
+
+    Token counts come from the backend's reported usage when available and from
+    the local approximate tokenizer otherwise. Cost uses the backend-reported cost
+    if present, else the per-model price table; cache hits cost nothing.
+    """
+    def __init__(self, cost_per_million_tokens: dict, latency_buckets: list[float], token_buckets: list[int]):
+        self.cost_per_million_tokens = cost_per_million_tokens
+        self.latency_buckets = latency_buckets
+        self.token_buckets = token_buckets
+        self._records = []
+        self._lock = threading.Lock()
+
+    def finish(self, record: LLMCallRecord, prompt: str, response: str):
+        """Completes a record with latency, tokens, outcome and cost, and stores it."""
+        record.latency = time.perf_counter() - record._clock_start
+        record.success = bool(response) and not response.startswith("Error:")
+
+        usage = record.usage or getattr(response, 'usage', None) or {}
+        if usage.get('prompt_tokens') is not None and usage.get('completion_tokens') is not None:
+            record.prompt_tokens = int(usage['prompt_tokens'])
+            record.completion_tokens = int(usage['completion_tokens'])
+            record.token_source = 'usage'
+        else:
+            record.prompt_tokens = count_tokens(prompt)
+            record.completion_tokens = count_tokens(response or "")
+
+        if record.cache_hit:
+            record.cost_usd = 0.0
+        elif usage.get('cost') is not None:
+            record.cost_usd = float(usage['cost'])
+        else:
+            prompt_price, completion_price = self.cost_per_million_tokens.get(record.model, (0.0, 0.0))
+            record.cost_usd = (record.prompt_tokens * prompt_price + record.completion_tokens * completion_price) / 1e6
+
+        with self._lock:
+            self._records.append(record)
+
+    def records(self) -> list[dict]:
+        with self._lock:
+            return [record.to_dict() for record in self._records]
+
+    def summary_by_topic(self) -> pd.DataFrame:
+        """
+        Aggregates the calls per topic: counts, tokens, cost, latency percentiles and
+        histograms of latency and completion tokens (one column per bucket, named
+        after its upper bound).
+        """
+        calls = pd.DataFrame(self.records())
+        if calls.empty:
+            return pd.DataFrame()
+        calls['topic'] = calls['topic'].fillna('unknown')
+
+        latency_edges = [0.0] + list(self.latency_buckets) + [np.inf]
+        token_edges = [0] + list(self.token_buckets) + [np.inf]
+        summary = []
+        for topic, group in calls.groupby('topic'):
+            row = {
+                'topic': topic,
+                'calls': len(group),
+                'failures': int((~group['success']).sum()),
+                'cache_hits': int(group['cache_hit'].sum()),
+                'fallbacks': int(group['fallback'].sum()),
+                'retries': int(group['retries'].sum()),
+                'prompt_tokens': int(group['prompt_tokens'].sum()),
+                'completion_tokens': int(group['completion_tokens'].sum()),
+                'cost_usd': group['cost_usd'].sum(),
+                'queue_wait_mean_s': group['queue_wait'].mean(),
+                'ttft_p50_s': group['time_to_first_token'].median(),
+                'latency_p50_s': group['latency'].quantile(0.5),
+                'latency_p95_s': group['latency'].quantile(0.95),
+                'latency_p99_s': group['latency'].quantile(0.99)
+            }
+            latency_counts, _ = np.histogram(group['latency'], bins=latency_edges)
+            for upper, count in zip(latency_edges[1:], latency_counts):
+                row[f"latency_le_{upper:g}s"] = int(count)
+            token_counts, _ = np.histogram(group['completion_tokens'], bins=token_edges)
+            for upper, count in zip(token_edges[1:], token_counts):
+                row[f"completion_tokens_le_{upper:g}"] = int(count)
+            summary.append(row)
+        return pd.DataFrame(summary).set_index('topic')
+
+    def write(self, output_dir: str):
+        """Writes every call to llm_calls.jsonl and the per-topic summary to llm_telemetry_by_topic.csv."""
+        os.makedirs(output_dir, exist_ok=True)
+        calls_path = os.path.join(output_dir, 'llm_calls.jsonl')
+        with open(calls_path, 'w', encoding='utf-8') as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        summary = self.summary_by_topic()
+        summary_path = os.path.join(output_dir, 'llm_telemetry_by_topic.csv')
+        summary.to_csv(summary_path)
+        if not summary.empty:
+            logger.info(
+                f"LLM telemetry: {int(summary['calls'].sum())} calls, "
+                f"{int(summary['prompt_tokens'].sum() + summary['completion_tokens'].sum())} tokens, "
+                f"${summary['cost_usd'].sum():.4f} estimated cost. Written to {output_dir}."
+            )
@@ -0,0 +1,50 @@
+# src/reasoners/llm/token_counter.py
+import re
+import pandas as pd
+from .prompt_templates import PROMPT_PREFIXES, PROMPT_SUFFIXES
+
+# Approximates a Llama 3 style pre-tokenizer: special tokens, common English
+# contractions, words with their leading space, numbers in groups of up to three
+# digits, runs of punctuation and whitespace. Good enough to compare prompt parts
+# without downloading the model's tokenizer.
+_TOKEN_PATTERN = re.compile(
+    r"<\|[a-z_]+\|>"
+    r"|'(?:s|t|re|ve|m|ll|d)\b"
+    r"| ?[^\W\d_]+"
+    r"| ?\d{1,3}"
+    r"| ?[^\s\w]+"
+    r"|\s+"
+)
+
+def count_tokens(text: str) -> int:
+    """Returns an approximate token count for a piece of text."""
+    return len(_TOKEN_PATTERN.findall(text))
+
+def prompt_token_report(rows: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Reports, per topic, how many prompt tokens are in the static prefix that a
+    backend can serve from its cache and how many are in the per-problem suffix.
+
+    Args:
+        rows (pd.DataFrame | None): Problems used to measure typical suffixes. If
+            omitted, the suffix is measured with its placeholders left in.
+
+    Returns:
+        pd.DataFrame: One row per topic with prefix, suffix and cacheable share.
+    """
+    report = []
+    for topic, prefix in PROMPT_PREFIXES.items():
+        suffix = PROMPT_SUFFIXES[topic]
+        if rows is not None and not rows.empty:
+            fields = ['problem_statement'] + [f'answer_option_{i}' for i in range(1, 6)]
+            suffix_tokens = rows[fields].apply(lambda row: count_tokens(suffix.format(**row)), axis=1).mean()
+        else:
+            suffix_tokens = count_tokens(suffix)
+        prefix_tokens = count_tokens(prefix)
+        report.append({
+            'topic': topic,
+            'prefix_tokens': prefix_tokens,
+            'suffix_tokens': float(suffix_tokens),
+            'cacheable_share': prefix_tokens / (prefix_tokens + suffix_tokens)
+        })
+    return pd.DataFrame(report).set_index('topic')
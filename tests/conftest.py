@@ -0,0 +1,7 @@
+import sys
+import os
+
+# Add project root to path to allow importing from src
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.append(project_root)
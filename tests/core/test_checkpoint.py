@@ -0,0 +1,69 @@
+import json
+import os
+from src.core.checkpoint import InferenceCheckpoint
+
+def _write_input(tmp_path, content="id,problem_statement\n1,a\n"):
+    input_path = tmp_path / "test.csv"
+    input_path.write_text(content, encoding='utf-8')
+    return str(input_path)
+
+def test_resume_returns_recorded_rows(tmp_path):
+    """Rows recorded before a restart are returned by the next open."""
+    input_path = _write_input(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+
+    checkpoint = InferenceCheckpoint(checkpoint_dir, input_path)
+    assert checkpoint.open() == {}
+    checkpoint.record(0, {'answer': 3})
+    checkpoint.record(1, {'answer': 5})
+    checkpoint.close()
+
+    resumed = InferenceCheckpoint(checkpoint_dir, input_path)
+    assert resumed.open() == {0: {'answer': 3}, 1: {'answer': 5}}
+    resumed.close()
+
+def test_torn_last_line_is_dropped(tmp_path):
+    """A partial line left by a crash is ignored and removed from the results file."""
+    input_path = _write_input(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+
+    checkpoint = InferenceCheckpoint(checkpoint_dir, input_path)
+    checkpoint.open()
+    checkpoint.record(0, {'answer': 2})
+    checkpoint.close()
+    with open(checkpoint.results_path, 'a', encoding='utf-8') as f:
+        f.write('{"row_id": 1, "res')
+
+    resumed = InferenceCheckpoint(checkpoint_dir, input_path)
+    assert resumed.open() == {0: {'answer': 2}}
+    resumed.record(1, {'answer': 4})
+    resumed.close()
+
+    with open(resumed.results_path, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'row_id': 0, 'result': {'answer': 2}}, {'row_id': 1, 'result': {'answer': 4}}]
+
+def test_changed_input_archives_checkpoint(tmp_path):
+    """A checkpoint written for different input is archived instead of resumed."""
+    input_path = _write_input(tmp_path)
+    checkpoint_dir = str(tmp_path / "checkpoint")
+
+    checkpoint = InferenceCheckpoint(checkpoint_dir, input_path)
+    checkpoint.open()
+    checkpoint.record(0, {'answer': 1})
+    checkpoint.close()
+
+    _write_input(tmp_path, "id,problem_statement\n1,b\n")
+    fresh = InferenceCheckpoint(checkpoint_dir, input_path)
+    assert fresh.open() == {}
+    fresh.close()
+    assert any(name.startswith('results.jsonl.stale-') for name in os.listdir(checkpoint_dir))
+
+def test_clear_removes_files(tmp_path):
+    """Clearing a checkpoint deletes its results and metadata."""
+    checkpoint = InferenceCheckpoint(str(tmp_path / "checkpoint"), _write_input(tmp_path))
+    checkpoint.open()
+    checkpoint.record(0, {'answer': 1})
+    checkpoint.clear()
+    assert not os.path.exists(checkpoint.results_path)
+    assert not os.path.exists(checkpoint.meta_path)
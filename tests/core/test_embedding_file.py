@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from src.core.embedding_file import (
+    EmbeddingFileWriter, dequantize, load_embeddings, measure_recall, open_embedding_file,
+    quantize, read_header, verify_embedding_file
+)
+
+def _vectors(rows=64, dim=16, seed=0):
+    return np.random.default_rng(seed).standard_normal((rows, dim)).astype(np.float32)
+
+def _write(path, vectors, dtype, batch_rows=10):
+    writer = EmbeddingFileWriter(str(path), 'test-model', dim=vectors.shape[1], dtype=dtype)
+    for start in range(0, len(vectors), batch_rows):
+        writer.append(vectors[start:start + batch_rows])
+    return writer.finalize({'recall_at_10': 1.0})
+
+@pytest.mark.parametrize('dtype', ['float32', 'float16', 'int8'])
+def test_round_trip(tmp_path, dtype):
+    """Vectors written in batches read back in order, within the dtype's precision."""
+    vectors = _vectors()
+    path = tmp_path / "embeddings.emb"
+    _write(path, vectors, dtype)
+
+    header = read_header(str(path))
+    assert (header['rows'], header['dim'], header['dtype']) == (64, 16, dtype)
+    assert header['recall_at_10'] == 1.0
+    assert verify_embedding_file(str(path))
+
+    loaded = np.asarray(load_embeddings(str(path)), dtype=np.float32)
+    assert loaded.shape == vectors.shape
+    tolerance = {'float32': 0.0, 'float16': 1e-2, 'int8': 3e-2}[dtype]
+    np.testing.assert_allclose(loaded, vectors, atol=tolerance)
+
+def test_float_files_are_memory_mapped(tmp_path):
+    """float32 files are returned as a memmap rather than a copy."""
+    path = tmp_path / "embeddings.emb"
+    _write(path, _vectors(), 'float32')
+    assert isinstance(load_embeddings(str(path)), np.memmap)
+
+def test_int8_quantization_matches_reader(tmp_path):
+    """The int8 codes and scales on disk are the ones `quantize` produces."""
+    vectors = _vectors()
+    path = tmp_path / "embeddings.emb"
+    _write(path, vectors, 'int8')
+
+    codes, scales = quantize(vectors, 'int8')
+    _, stored, stored_scales = open_embedding_file(str(path))
+    np.testing.assert_array_equal(stored, codes)
+    np.testing.assert_array_equal(stored_scales, scales)
+    np.testing.assert_array_equal(dequantize(stored, stored_scales), dequantize(codes, scales))
+
+def test_zero_rows_quantize_without_nan():
+    """An all-zero row gets a unit scale instead of dividing by zero."""
+    codes, scales = quantize(np.zeros((2, 4), dtype=np.float32), 'int8')
+    assert not codes.any()
+    np.testing.assert_array_equal(scales, [1.0, 1.0])
+
+def test_corrupted_payload_fails_verification(tmp_path):
+    path = tmp_path / "embeddings.emb"
+    _write(path, _vectors(), 'float32')
+    with open(path, 'r+b') as f:
+        f.seek(-1, 2)
+        f.write(b'\xff')
+    assert not verify_embedding_file(str(path))
+
+def test_abort_leaves_no_file(tmp_path):
+    path = tmp_path / "embeddings.emb"
+    writer = EmbeddingFileWriter(str(path), 'test-model', dim=16)
+    writer.append(_vectors())
+    writer.abort()
+    assert list(tmp_path.iterdir()) == []
+
+def test_rejects_wrong_dimension(tmp_path):
+    writer = EmbeddingFileWriter(str(tmp_path / "embeddings.emb"), 'test-model', dim=8)
+    with pytest.raises(ValueError):
+        writer.append(_vectors(dim=16))
+    writer.abort()
+
+def test_missing_file_returns_none(tmp_path):
+    assert load_embeddings(str(tmp_path / "missing.emb")) is None
+
+def test_recall_of_identical_vectors_is_one():
+    vectors = _vectors()
+    assert measure_recall(vectors, vectors, k=5) == 1.0
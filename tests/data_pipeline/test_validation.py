@@ -0,0 +1,78 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_pipeline import schemas
+from src.data_pipeline.schemas import TrainDataRow, ValidationError
+from src.data_pipeline.validation import validate_frame
+
+_TRAIN_CSV = """topic,problem_statement,solution,answer_option_1,answer_option_2,answer_option_3,answer_option_4,answer_option_5,correct_option_number
+Spatial reasoning,p1,s1,a,b,c,d,e,2
+Spatial reasoning,p2,s2,a,b,c,d,,3
+Spatial reasoning,p3,s3,a,b,c,d,e,6
+Spatial reasoning,p4,s4,a,b,c,d,e,0
+Spatial reasoning,p5,s5,a,b,c,d,e,2.0
+Spatial reasoning,p6,s6,a,b,c,d,e,2.5
+Spatial reasoning,p7,s7,a,b,c,d,e,x
+Spatial reasoning,p8,s8,a,b,c,d,e,
+Spatial reasoning,p9,s9,a,b,c,,e,1
+"""
+
+def _per_row(df, schema, rows=None):
+    """The row-by-row validation that `validate_frame` replaces."""
+    records = rows if rows is not None else [row.to_dict() for _, row in df.iterrows()]
+    valid, errors = [], []
+    for position, record in enumerate(records):
+        try:
+            valid.append(schema(**record).model_dump())
+        except ValidationError:
+            errors.append(position)
+    return valid, errors
+
+def _assert_parity(df, schema, rows=None):
+    valid, errors = validate_frame(df, schema, rows=rows)
+    expected_valid, expected_errors = _per_row(df, schema, rows)
+    assert valid == expected_valid
+    assert [position for position, _ in errors] == expected_errors
+    return valid, errors
+
+@pytest.mark.parametrize('dtype', [str, None])
+def test_train_csv_matches_per_row(dtype):
+    """Blank Optional cells, float and string option numbers and out-of-range numbers."""
+    df = pd.read_csv(io.StringIO(_TRAIN_CSV), dtype=dtype)
+    valid, _ = _assert_parity(df, TrainDataRow)
+    assert [record['problem_statement'] for record in valid] == ['p1', 'p5']
+
+def test_blank_optional_cell_is_rejected_like_the_model():
+    """A blank CSV cell is NaN, which the model rejects even for an Optional field."""
+    df = pd.read_csv(io.StringIO(_TRAIN_CSV), dtype=str).iloc[[1]]
+    valid, errors = _assert_parity(df, TrainDataRow)
+    assert valid == [] and len(errors) == 1
+
+def test_numeric_option_numbers():
+    base = {
+        'topic': 't', 'problem_statement': 'p', 'solution': 's', 'answer_option_1': 'a', 'answer_option_2': 'b',
+        'answer_option_3': 'c', 'answer_option_4': 'd', 'answer_option_5': 'e'
+    }
+    for numbers in ([1, 5, 0, 6], [1.0, 4.0, 2.5, np.nan], ['1', '5', '05', ' 3', '3.0', '-1']):
+        df = pd.DataFrame([{**base, 'correct_option_number': number} for number in numbers])
+        _assert_parity(df, TrainDataRow)
+
+def test_missing_keys_and_none_in_records():
+    """Records with absent or null Optional keys, and absent required keys."""
+    base = {'problem_statement': 'p', 'answer_option_1': 'a', 'answer_option_2': 'b', 'answer_option_3': 'c', 'answer_option_4': 'd'}
+    rows = [
+        {**base, 'topic': 'Lateral thinking', 'answer_option_5': 'e'},
+        dict(base),
+        {**base, 'topic': None, 'answer_option_5': None},
+        {key: value for key, value in base.items() if key != 'answer_option_4'},
+        {**base, 'answer_option_1': 7},
+    ]
+    valid, errors = _assert_parity(pd.DataFrame(rows), schemas.TestDataRow, rows=rows)
+    assert [position for position, _ in errors] == [3, 4]
+    assert valid[1]['topic'] is None and valid[1]['answer_option_5'] is None
+
+def test_missing_required_column():
+    df = pd.read_csv(io.StringIO(_TRAIN_CSV), dtype=str).drop(columns=['solution'])
+    valid, errors = _assert_parity(df, TrainDataRow)
+    assert valid == [] and len(errors) == len(df)
@@ -0,0 +1,74 @@
+import time
+from src.reasoners.llm import circuit_breaker
+from src.reasoners.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, HealthProber
+
+def _wait_for_recovery(breaker):
+    time.sleep(breaker.recovery_timeout + 0.01)
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.snapshot() == {'state': OPEN, 'times_opened': 1, 'rejected': 1}
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker('test', failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_trial_success_closes():
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.available()
+    _wait_for_recovery(breaker)
+
+    assert breaker.available()
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    # Only `half_open_max_calls` trial requests are let through
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+def test_half_open_trial_failure_reopens():
+    breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=0.05)
+    breaker.trip()
+    _wait_for_recovery(breaker)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+def test_probe_success_moves_open_to_half_open():
+    breaker = CircuitBreaker('test', failure_threshold=1, recovery_timeout=60)
+    breaker.trip(open_for=120)
+    breaker.probe_succeeded()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+def test_prober_reports_a_dead_backend_once(monkeypatch):
+    """Repeated failed probes keep the circuit open but only log when it opens."""
+    warnings = []
+    monkeypatch.setattr(circuit_breaker.logger, 'warning', warnings.append)
+
+    def unreachable():
+        raise ConnectionError("Connection refused")
+
+    breaker = CircuitBreaker('ollama', failure_threshold=3, recovery_timeout=60)
+    prober = HealthProber({'ollama': unreachable}, {'ollama': breaker}, interval=30)
+    for _ in range(3):
+        prober.probe_once()
+    assert breaker.state == OPEN and breaker.times_opened == 1
+    assert [message for message in warnings if 'Health probe' in message] == ["Health probe for 'ollama' failed: Connection refused."]
+
+def test_prober_success_lets_trial_requests_through():
+    breaker = CircuitBreaker('ollama', failure_threshold=1, recovery_timeout=60)
+    breaker.trip()
+    HealthProber({'ollama': lambda: True}, {'ollama': breaker}, interval=30).probe_once()
+    assert breaker.state == HALF_OPEN
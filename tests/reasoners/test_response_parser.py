@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+from src import config as main_config
+from src.reasoners.heuristic_reasoner import HeuristicReasoner
+from src.reasoners.llm.response_parser import LLM_CONFIDENCE_SCORE, parse_packed_response
+
+# Failure messages returned by the Ollama client, a stream that broke off and a hedged race
+_BACKEND_ERRORS = [
+    "Error: Failed to get a response from the model after 3 attempts.",
+    "Error: [Errno 111] Connection refused",
+    "Error: 'ollama' returned no usable output: Error: Ollama circuit is open.",
+]
+
+class _Router:
+    def get_prompt(self, topic, row, structured=False):
+        return "prompt"
+
+class _Factory:
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def generate_response(self, prompt, **kwargs):
+        self.calls += 1
+        return self.response
+
+    def generate_response_stream(self, prompt, **kwargs):
+        self.calls += 1
+        raise ConnectionRefusedError(111, "Connection refused")
+        yield
+
+def _reasoner(factory):
+    reasoner = HeuristicReasoner.__new__(HeuristicReasoner)
+    reasoner.llm_factory = factory
+    reasoner.llm_router = _Router()
+    return reasoner
+
+@pytest.mark.parametrize('error', _BACKEND_ERRORS)
+@pytest.mark.parametrize('structured', [False, True])
+def test_error_response_is_not_parsed_as_answer(monkeypatch, error, structured):
+    """The digits of a backend error message are never taken as the option number."""
+    monkeypatch.setattr(main_config, 'STRUCTURED_OUTPUT_ENABLED', structured)
+    monkeypatch.setattr(main_config, 'LLM_STREAMING_ENABLED', False)
+    monkeypatch.setattr(main_config, 'ANSWER_FOLLOW_UP_ENABLED', True)
+    factory = _Factory(error)
+    assert _reasoner(factory).solve(pd.Series({'problem_statement': 'x'}), 'topic') is None
+    # No follow-up request is sent for a failed call
+    assert factory.calls == 1
+
+def test_failed_stream_is_not_parsed_as_answer(monkeypatch):
+    monkeypatch.setattr(main_config, 'STRUCTURED_OUTPUT_ENABLED', False)
+    monkeypatch.setattr(main_config, 'LLM_STREAMING_ENABLED', True)
+    factory = _Factory(None)
+    assert _reasoner(factory).solve(pd.Series({'problem_statement': 'x'}), 'topic') is None
+
+def test_parses_every_problem():
+    """Each <answer id=N> is matched with the scratchpad of the same id."""
+    response = (
+        "<scratchpad id=1>First reasoning.</scratchpad>\n<answer id=1>3</answer>\n"
+        '<scratchpad id="2">Second reasoning.</scratchpad>\n<answer id="2"> 5 </answer>'
+    )
+    results = parse_packed_response(response, [1, 2])
+    assert results == {
+        1: {'answer': 3, 'solution': 'First reasoning.', 'confidence': LLM_CONFIDENCE_SCORE},
+        2: {'answer': 5, 'solution': 'Second reasoning.', 'confidence': LLM_CONFIDENCE_SCORE},
+    }
+
+def test_missing_and_invalid_answers_are_left_out():
+    """Ids without a valid option number are absent so the caller can re-ask them."""
+    response = "<answer id=1>2</answer><answer id=2>7</answer><answer id=3>12</answer>"
+    assert set(parse_packed_response(response, [1, 2, 3, 4])) == {1}
+
+def test_unknown_ids_are_ignored_and_first_answer_wins():
+    response = "<answer id=1>4</answer><answer id=1>2</answer><answer id=9>1</answer>"
+    results = parse_packed_response(response, [1])
+    assert list(results) == [1]
+    assert results[1]['answer'] == 4
+    assert results[1]['solution'] == "[No reasoning provided by LLM]"
+
+def test_empty_response():
+    assert parse_packed_response("", [1, 2]) == {}
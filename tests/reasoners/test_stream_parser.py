@@ -0,0 +1,31 @@
+from src.reasoners.llm.stream_parser import IncrementalAnswerParser, has_closed_answer
+
+def _feed_all(parser, chunks):
+    return [parser.feed(chunk) for chunk in chunks]
+
+def test_answer_split_across_chunks():
+    """The answer is only reported once the digit after <answer> is closed."""
+    parser = IncrementalAnswerParser()
+    assert _feed_all(parser, ["<scratch", "pad>work</scratchpad><ans", "wer>", " 4", "</answer>"]) == [False, False, False, False, True]
+    assert parser.answer == 4
+    assert parser.text == "<scratchpad>work</scratchpad><answer> 4</answer>"
+
+def test_unclosed_digit_is_not_an_answer():
+    """A digit at the end of the text may still grow into an invalid number."""
+    parser = IncrementalAnswerParser()
+    assert not parser.feed("<answer>1")
+    assert not parser.feed("2")
+    assert not parser.feed("</answer>")
+    assert parser.answer is None
+
+def test_feed_after_answer_keeps_first_answer():
+    parser = IncrementalAnswerParser()
+    assert parser.feed("<answer>2</answer>")
+    assert parser.feed("<answer>5</answer>")
+    assert parser.answer == 2
+    assert parser.text == "<answer>2</answer>"
+
+def test_has_closed_answer():
+    assert has_closed_answer("reasoning <answer>3</answer>")
+    assert not has_closed_answer("reasoning <answer>3")
+    assert not has_closed_answer("reasoning <answer>6</answer>")
@@ -1,15 +1,13 @@
-import pickle
 from sklearn.neighbors import NearestNeighbors
 from src.logger import logger
+from src.core.embedding_file import load_embeddings
 from . import config
 
 def build_search_index():
     
     logger.info("Loading embeddings to build the search index...")
-    try:
-        with open(config.EMBEDDINGS_PATH, 'rb') as f:
-            embeddings = pickle.load(f)
-    except FileNotFoundError:
+    embeddings = load_embeddings(config.EMBEDDINGS_PATH)
+    if embeddings is None:
         logger.error(f"Embeddings file not found at {config.EMBEDDINGS_PATH}. Cannot build index.")
         return None, None
 
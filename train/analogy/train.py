@@ -21,7 +21,8 @@ def run_training():
     artifact = {
         'search_index': search_index,
         'index_to_data_map': index_to_data_map,
-        'embeddings': embeddings # Include embeddings for potential future use
+        # The vectors stay in the shared embedding file instead of being copied into the artifact
+        'embeddings_path': config.EMBEDDINGS_PATH
     }
 
     os.makedirs(config.MODEL_OUTPUT_DIR, exist_ok=True)
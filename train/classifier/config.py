@@ -11,7 +11,7 @@ sys.path.append(project_root)
 from src import config as main_config
 
 PROCESSED_TRAIN_DATA_PATH = os.path.join(main_config.PROCESSED_DATA_DIR, 'train_processed.json')
-EMBEDDINGS_PATH = os.path.join(main_config.PROCESSED_DATA_DIR, 'problem_embeddings.pkl')
+EMBEDDINGS_PATH = main_config.EMBEDDINGS_PATH
 
 MODEL_OUTPUT_DIR = main_config.MODELS_DIR
 MODEL_NAME = "problem_classifier.pkl"
\ No newline at end of file
@@ -1,28 +1,36 @@
+import numpy as np
 import pandas as pd
-import pickle
 import torch
 from torch.utils.data import Dataset, DataLoader
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder
 from src.logger import logger
+from src.core.embedding_file import load_embeddings
 from . import config
 
 class ProblemTopicDataset(Dataset):
-    def __init__(self, embeddings, labels):
-        self.embeddings = torch.tensor(embeddings, dtype=torch.float32)
+    """
+    The rows of `embeddings` listed in `indices`. Rows are read on access, so a
+    memory-mapped embedding file is never copied into memory as a whole.
+    """
+    def __init__(self, embeddings, indices, labels):
+        self.embeddings = embeddings
+        self.indices = indices
         self.labels = torch.tensor(labels, dtype=torch.long)
 
     def __len__(self):
         return len(self.labels)
 
     def __getitem__(self, idx):
-        return self.embeddings[idx], self.labels[idx]
+        return torch.tensor(self.embeddings[self.indices[idx]], dtype=torch.float32), self.labels[idx]
 
 def get_dataloaders():
     logger.info("Loading data for classifier training...")
     
-    with open(config.EMBEDDINGS_PATH, 'rb') as f:
-        embeddings = pickle.load(f)
+    # A read-only memmap for float32/float16 files; int8 files are dequantized into memory
+    embeddings = load_embeddings(config.EMBEDDINGS_PATH)
+    if embeddings is None:
+        raise FileNotFoundError(f"Embeddings file not found at {config.EMBEDDINGS_PATH}.")
     
     df = pd.read_json(config.PROCESSED_TRAIN_DATA_PATH)
     
@@ -32,16 +40,17 @@ def get_dataloaders():
     le = LabelEncoder()
     labels = le.fit_transform(df['topic'])
     
-    X_train, X_val, y_train, y_val = train_test_split(
-        embeddings, labels, test_size=0.2, random_state=42, stratify=labels
+    # Splitting row indices rather than the vectors keeps the memmap uncopied
+    train_idx, val_idx, y_train, y_val = train_test_split(
+        np.arange(len(embeddings)), labels, test_size=0.2, random_state=42, stratify=labels
     )
     
-    train_dataset = ProblemTopicDataset(X_train, y_train)
-    val_dataset = ProblemTopicDataset(X_val, y_val)
+    train_dataset = ProblemTopicDataset(embeddings, train_idx, y_train)
+    val_dataset = ProblemTopicDataset(embeddings, val_idx, y_val)
     
     train_loader = DataLoader(train_dataset, batch_size=config.BATCH_SIZE, shuffle=True)
     val_loader = DataLoader(val_dataset, batch_size=config.BATCH_SIZE, shuffle=False)
     
-    logger.info(f"Data loading complete. Train size: {len(X_train)}, Val size: {len(X_val)}")
+    logger.info(f"Data loading complete. Train size: {len(train_idx)}, Val size: {len(val_idx)}")
     
     return train_loader, val_loader, le
\ No newline at end of file